@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+
+"""
+Snake Arcade benchmarks.
+
+Time the simulation & geometry hot paths in repeatable scenarios, save
+the results as JSON & compare them against a stored baseline. Exit with
+a non-zero status when any scenario is slower than the baseline by more
+than the threshold.
+
+Scenarios that draw need an OpenGL context. They are skipped when no
+window can be opened, e.g. on a headless CI machine.
+"""
+
+import argparse
+import collections
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(benchmarks_dir),
+                                'snake_arcade'))
+
+import arena  # noqa: E402
+import autopilot  # noqa: E402
+import batch_engine  # noqa: E402
+import board  # noqa: E402
+import engine  # noqa: E402
+import free_cells  # noqa: E402
+import settings  # noqa: E402
+import states  # noqa: E402
+import tournament  # noqa: E402
+
+BASELINE = os.path.join(benchmarks_dir, 'baseline.json')
+
+# Benchmarks use a larger board than the game, so the longest snakes fit.
+BOARD_WIDTH = 64
+BOARD_HEIGHT = 64
+BENCH_BOARD = board.Board(BOARD_WIDTH, BOARD_HEIGHT)
+# A huge board, for scenarios that must not depend on the board size.
+HUGE_BOARD = board.Board(1000, 1000)
+# The smallest square board with a sampled free cell index.
+SAMPLED_BOARD = board.Board(300, 300)
+
+SNAKE_LENGTHS = (3, 100, 500, 2000)
+BOARD_FILLS = (0, 25, 50, 75, 90, 99)
+
+
+def get_cycle_directions(cycle):
+    """Get the direction to travel from each cell of a cycle to the next."""
+    directions = {vector: name for name, vector in states.DIRECTIONS.items()}
+    return [directions[(cycle[(i + 1) % len(cycle)][0] - cycle[i][0],
+                        cycle[(i + 1) % len(cycle)][1] - cycle[i][1])]
+            for i in range(len(cycle))]
+
+
+def create_engine(length, cycle, directions):
+    """
+    Create a game engine with a snake of a length laid along a cycle.
+
+    Remove the food, so the snake keeps its length.
+    """
+    game_engine = engine.GameEngine(seed=0, game_board=BENCH_BOARD)
+    body = [cycle[i] for i in reversed(range(length))]
+    game_engine.body = collections.deque(body)
+    game_engine.occupied = collections.Counter(body)
+    game_engine.free_cells = free_cells.create_index(BENCH_BOARD)
+    for position in body:
+        game_engine.free_cells.remove(position)
+    game_engine.direction = directions[length - 2]
+    game_engine.food_pos = None
+    return game_engine
+
+
+def measure(setup, number, repeat):
+    """
+    Time a scenario.
+
+    Call setup() to get a fresh function to time for each repeat, then
+    call it number times.
+
+    Return the time per call for each repeat, in microseconds.
+    """
+    timings = []
+    for i in range(repeat):
+        function = setup()
+        start = time.perf_counter()
+        for j in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number * 1000000)
+    return timings
+
+
+def bench_engine_step(length, cycle, directions):
+    """Step a game engine with a snake of a given length around the board."""
+    def setup():
+        game_engine = create_engine(length, cycle, directions)
+        position = [length - 1]
+
+        def step():
+            game_engine.step(directions[position[0]])
+            position[0] = (position[0] + 1) % len(cycle)
+        return step
+    return setup
+
+
+def bench_clone(length, cycle, directions):
+    """Clone a game engine with a snake of a given length."""
+    def setup():
+        return create_engine(length, cycle, directions).clone
+    return setup
+
+
+def bench_snapshot(length, cycle, directions):
+    """Snapshot & restore a game engine with a snake of a given length."""
+    def setup():
+        game_engine = create_engine(length, cycle, directions)
+
+        def snapshot():
+            game_engine.restore(game_engine.snapshot())
+        return snapshot
+    return setup
+
+
+def bench_spawn_food(fill, game_board=BENCH_BOARD):
+    """Spawn food on a board with a percentage of the cells covered."""
+    def setup():
+        game_engine = engine.GameEngine(seed=0, game_board=game_board)
+        cells = [(x, y)
+                 for x in range(game_board.left, game_board.right + 1)
+                 for y in range(game_board.bottom, game_board.top + 1)]
+        game_engine.rng.shuffle(cells)
+        for cell in cells[:len(cells) * fill // 100]:
+            game_engine.free_cells.remove(cell)
+        return game_engine.spawn_food
+    return setup
+
+
+def bench_huge_board(length):
+    """Start & step a game on a huge board with a long snake."""
+    def setup():
+        game_engine = engine.GameEngine(seed=0, game_board=HUGE_BOARD)
+        game_engine.reset(head_pos=(500, 500))
+        game_engine.growing = length
+
+        def step():
+            # Circle a square, so the snake never hits itself.
+            side = length // 4 + 2
+            game_engine.step(('UP', 'RIGHT', 'DOWN', 'LEFT')[
+                game_engine.ticks // side % 4])
+        return step
+    return setup
+
+
+def bench_arena_step(num_snakes, length):
+    """Step an arena of computer steered snakes grown to a length."""
+    def setup():
+        game_arena = arena.ArenaEngine(num_snakes, seed=0,
+                                       game_board=board.Board(200, 200))
+        for arena_snake in game_arena.snakes:
+            arena_snake.growing = length - 3
+        for i in range(length):
+            game_arena.step(game_arena.get_greedy_actions())
+
+        def step():
+            game_arena.step(game_arena.get_greedy_actions())
+        return step
+    return setup
+
+
+def bench_autopilot(size):
+    """
+    Plan every move of a game on a square board with the autopilot.
+
+    Planning is given all the time it needs, to time the whole search.
+    """
+    def setup():
+        game_engine = engine.GameEngine(seed=0,
+                                        game_board=board.Board(size, size))
+        pilot = autopilot.Autopilot(game_engine)
+
+        def step():
+            game_engine.step(pilot.decide(float('inf')))
+            if game_engine.dead or game_engine.won:
+                game_engine.reset()
+        return step
+    return setup
+
+
+def bench_batch_step(num_games):
+    """Step a batch of games with random actions."""
+    def setup():
+        batch = batch_engine.BatchEngine(num_games, seed=0,
+                                         game_board=BENCH_BOARD)
+        actions = [batch.rng.integers(-1, 4, num_games) for i in range(64)]
+        position = [0]
+
+        def step():
+            batch.step(actions[position[0] % len(actions)])
+            position[0] += 1
+        return step
+    return setup
+
+
+def bench_scripted_game(mode, seed):
+    """
+    Play whole games of a game mode with a scripted player.
+
+    The player turns towards the food, avoiding walls & its own body
+    where it can.
+    """
+    def play():
+        game_engine = engine.GameEngine(mode, seed, BENCH_BOARD)
+        while not (game_engine.dead or game_engine.won):
+            game_engine.step(tournament.get_greedy_action(game_engine))
+    return lambda: play
+
+
+def open_window():
+    """
+    Open a hidden window for the drawing scenarios.
+
+    Return None when no OpenGL context is available.
+    """
+    try:
+        import arcade
+        window = arcade.Window(settings.WINDOW_WIDTH, settings.WINDOW_HEIGHT,
+                               'Snake Arcade benchmarks')
+        window.set_visible(False)
+        return window
+    except Exception as error:
+        print('Skipping drawing scenarios: {}'.format(error))
+        return None
+
+
+def bench_snake_step(length, cycle, directions):
+    """Step a drawable snake of a given length around the board."""
+    def setup():
+        snake_p1 = create_snake(length, cycle, directions)
+        position = [length - 1]
+
+        def step():
+            # Snakes turn after each step, towards the following cell.
+            position[0] = (position[0] + 1) % len(cycle)
+            snake_p1.change_direction = directions[position[0]]
+            snake_p1.step()
+        return step
+    return setup
+
+
+def bench_create_snake(length, cycle, directions):
+    """Upload a whole drawable snake of a given length."""
+    def setup():
+        return create_snake(length, cycle, directions).create_snake
+    return setup
+
+
+def bench_create_food():
+    """Build the food shapes."""
+    import colours
+    import food
+    import snake
+
+    def setup():
+        snake_p1 = snake.Snake(colours.jungle)
+        return food.Food(colours.jungle, settings.CELL,
+                         snake_p1).create_food
+    return setup
+
+
+def create_snake(length, cycle, directions):
+    """Create a drawable snake of a length laid along a cycle."""
+    import colours
+    import snake
+    snake_p1 = snake.Snake(colours.jungle, head_pos=list(cycle[length - 1]),
+                           direction=directions[length - 1])
+    snake_p1.body_segment_list = collections.deque(
+        [list(cycle[i]) for i in reversed(range(length))])
+    snake_p1.create_snake()
+    return snake_p1
+
+
+def get_scenarios(quick):
+    """
+    Get every scenario as (name, setup, number of calls, repeats).
+
+    Quick runs make fewer calls, for a smoke test.
+    """
+    scale = 10 if quick else 1
+    cycle = autopilot.get_board_cycle(BENCH_BOARD)
+    directions = get_cycle_directions(cycle)
+    scenarios = []
+    for length in SNAKE_LENGTHS:
+        scenarios.append(('engine_step/length={}'.format(length),
+                          bench_engine_step(length, cycle, directions),
+                          20000 // scale, 5))
+    for length in (3, 2000):
+        scenarios.append(('engine_clone/length={}'.format(length),
+                          bench_clone(length, cycle, directions),
+                          5000 // scale, 5))
+        scenarios.append(('engine_snapshot/length={}'.format(length),
+                          bench_snapshot(length, cycle, directions),
+                          2000 // scale, 5))
+    for fill in BOARD_FILLS:
+        scenarios.append(('spawn_food/fill={}%'.format(fill),
+                          bench_spawn_food(fill), 20000 // scale, 5))
+    for fill in (0, 99):
+        scenarios.append(('spawn_food/board=300x300/fill={}%'.format(fill),
+                          bench_spawn_food(fill, SAMPLED_BOARD),
+                          20000 // scale, 5))
+    scenarios.append(('huge_board_step/board=1000x1000',
+                      bench_huge_board(500), 20000 // scale, 5))
+    scenarios.append(('arena_step/snakes=200', bench_arena_step(200, 50),
+                      200 // scale, 5))
+    scenarios.append(('autopilot_step/board=100x100', bench_autopilot(100),
+                      2000 // scale, 5))
+    scenarios.append(('batch_step/games=1024', bench_batch_step(1024),
+                      200 // scale, 5))
+    for mode in states.GAME_MODES.values():
+        scenarios.append(('scripted_game/mode={}'.format(mode),
+                          bench_scripted_game(mode, 1), 20 // scale, 5))
+    if open_window() is not None:
+        for length in SNAKE_LENGTHS:
+            scenarios.append(('snake_step/length={}'.format(length),
+                              bench_snake_step(length, cycle, directions),
+                              5000 // scale, 5))
+            scenarios.append(('create_snake/length={}'.format(length),
+                              bench_create_snake(length, cycle, directions),
+                              50 // scale, 5))
+        scenarios.append(('create_food', bench_create_food(),
+                          500 // scale, 5))
+    return scenarios
+
+
+def run(scenarios, name_filter=None):
+    """Run scenarios & return their results by name."""
+    results = {}
+    for name, setup, number, repeat in scenarios:
+        if name_filter and name_filter not in name:
+            continue
+        timings = measure(setup, number, repeat)
+        results[name] = {
+            'median_us': round(statistics.median(timings), 3),
+            'min_us': round(min(timings), 3),
+            'calls': number,
+            'repeats': repeat
+        }
+        print('{:32} {:12.3f} us/call'.format(
+            name, results[name]['median_us']))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline.
+
+    Return the names of scenarios slower than the baseline by more than
+    the threshold (a fraction, e.g. 0.15 for 15%).
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = result['median_us'] / baseline[name]['median_us']
+        status = 'ok'
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        print('{:32} {:7.2f}x baseline  {}'.format(name, ratio, status))
+    return regressions
+
+
+def main():
+    """Run the benchmarks & check for regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', help='save the results to a JSON file')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='baseline JSON file (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed slowdown as a fraction '
+                             '(default: %(default)s)')
+    parser.add_argument('--filter', help='only run matching scenarios')
+    parser.add_argument('--quick', action='store_true',
+                        help='make fewer calls, for a smoke test')
+    args = parser.parse_args()
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': run(get_scenarios(args.quick), args.filter)
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2, sort_keys=True)
+        return 0
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}, nothing to compare.'.format(args.baseline))
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    regressions = compare(report['results'], baseline, args.threshold)
+    if regressions:
+        print('{} scenario(s) regressed by more than {:.0%}.'.format(
+            len(regressions), args.threshold))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
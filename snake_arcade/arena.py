@@ -0,0 +1,290 @@
+"""Snake Arcade headless many-snake arena engine."""
+
+import collections
+import random
+
+import board
+import free_cells
+import modes
+import settings
+import states
+
+
+class ArenaSnake():
+    """
+    One snake in an arena.
+
+    Holds the state the ArenaEngine keeps for each snake. Cells are
+    tracked by the engine, in its shared occupancy grid.
+    """
+
+    def __init__(self, index, body, direction, score):
+        """Initialize a snake with a body, head first."""
+        self.index = index
+        self.body = collections.deque(body)
+        self.direction = direction
+        self.change_direction = ''
+        # Number of steps left where the tail is kept to grow the body.
+        self.growing = 0
+        # Health status.
+        self.dead = False
+        self.death_cause = None
+        self.score = score
+        # Food the snake is heading for, when steered by the arena.
+        self.target = None
+
+    @property
+    def head_pos(self):
+        """Get the position of the snake head."""
+        return self.body[0]
+
+    def set_direction(self):
+        """
+        Set the snake direction to the desired direction.
+
+        Disable opposing movements so that the snake cannot turn back on
+        itself.
+        """
+        if self.change_direction in states.DIRECTIONS and \
+                self.direction != \
+                states.OPPOSITE_DIRECTIONS[self.change_direction]:
+            self.direction = self.change_direction
+
+
+class ArenaEngine():
+    """
+    Headless rules for many snakes sharing one board.
+
+    Every snake steps at the same time. Collisions are found with one
+    occupancy grid shared by all snakes, a Counter of body segments in
+    each cell, so checking a head costs the same however many snakes
+    there are & however long they grow. Heads that meet in the same
+    cell are found by counting the new heads in the same way.
+
+    Dead snakes are removed from the board. Food is kept topped up, with
+    several pieces on the board at once.
+    """
+
+    def __init__(self, num_snakes, mode=states.GAME_MODES['normal'],
+                 seed=None, game_board=None, num_food=None):
+        """
+        Initialize the arena.
+
+        Play on the default game board unless a Board is given. Keep one
+        piece of food on the board for every two snakes unless a number
+        of pieces is given.
+        """
+        self.num_snakes = num_snakes
+        self.mode = mode
+        self.board = game_board if game_board is not None else board.Board()
+        if seed is None:
+            seed = random.randrange(2 ** 64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if num_food is None:
+            num_food = max(1, num_snakes // 2)
+        self.num_food = num_food
+        self.reset()
+
+    def reset(self):
+        """Start a new arena, placing every snake in a random position."""
+        # Number of body segments in each occupied position, all snakes.
+        self.occupied = collections.Counter()
+        # Game board cells not covered by a snake or food.
+        self.free_cells = free_cells.create_index(self.board)
+        self.food = set()
+        self.snakes = []
+        rules = modes.MODE_RULES[self.mode]
+        for index in range(self.num_snakes):
+            body, direction = self.get_spawn()
+            snake = ArenaSnake(index, body or [], direction or 'UP',
+                               rules.create_score())
+            self.snakes.append(snake)
+            if body is None:
+                snake.dead = True
+                snake.death_cause = 'spawn'
+            for position in snake.body:
+                self.cover(position)
+        # Movement (in game "cells" per second) by the rules of the game
+        # mode, shared by every snake.
+        self.speed = rules.start_speed
+        self.min_speed = rules.min_speed
+        self.max_speed = settings.MAX_SPEED
+        self.ticks = 0
+        self.food_eaten = 0
+        self.spawn_food()
+
+    def get_spawn(self):
+        """
+        Get a free body & direction for a new three segment snake.
+
+        Try random free cells. Return (None, None) when the board is too
+        full to place the snake.
+        """
+        for attempt in range(100):
+            head_pos = self.free_cells.choice(self.rng)
+            if head_pos is None:
+                break
+            direction = self.rng.choice(tuple(states.DIRECTIONS))
+            dx, dy = states.DIRECTIONS[direction]
+            body = [(head_pos[0] - dx * i, head_pos[1] - dy * i)
+                    for i in range(3)]
+            ahead = (head_pos[0] + dx, head_pos[1] + dy)
+            if all(position in self.free_cells for position in body) and \
+                    ahead in self.free_cells:
+                return body, direction
+        return None, None
+
+    @property
+    def alive(self):
+        """Get the number of snakes still alive."""
+        return sum(not snake.dead for snake in self.snakes)
+
+    def cover(self, position):
+        """Add a body segment to the occupancy grid."""
+        self.occupied[position] += 1
+        self.free_cells.remove(position)
+
+    def uncover(self, position):
+        """Remove a body segment from the occupancy grid."""
+        self.occupied[position] -= 1
+        if not self.occupied[position]:
+            del self.occupied[position]
+            if position not in self.food:
+                self.free_cells.add(position)
+
+    def check_wall_collisions(self, position):
+        """Check if a position is outside of the game board walls."""
+        return (position[0] < self.board.left or
+                position[0] > self.board.right or
+                position[1] > self.board.top or
+                position[1] < self.board.bottom)
+
+    def is_safe(self, position):
+        """Check if a position is inside the walls & free of snakes."""
+        return not (self.check_wall_collisions(position) or
+                    self.occupied[position])
+
+    def step(self, actions=None):
+        """
+        Advance every snake by one game grid "cell" at the same time.
+
+        Optionally take new desired directions, one per snake, where None
+        keeps a snake's current direction. Tails move out of the way
+        first, then heads that hit a wall, a body or another head die.
+
+        Return the outcome of the step for each snake (see
+        states.STEP_OUTCOMES).
+        """
+        self.ticks += 1
+        moving = [snake for snake in self.snakes if not snake.dead]
+        heads = {}
+        for snake in moving:
+            if actions is not None and actions[snake.index] is not None:
+                snake.change_direction = actions[snake.index]
+            snake.set_direction()
+            dx, dy = states.DIRECTIONS[snake.direction]
+            heads[snake] = (snake.body[0][0] + dx, snake.body[0][1] + dy)
+            if snake.growing:
+                snake.growing -= 1
+            else:
+                # Stop growth by removing the last body segment (the "tail").
+                self.uncover(snake.body.pop())
+        # Count the new heads in each cell, for head to head collisions.
+        head_counts = collections.Counter(heads.values())
+        for snake in moving:
+            head_pos = heads[snake]
+            if self.check_wall_collisions(head_pos):
+                snake.death_cause = 'wall'
+            elif head_counts[head_pos] > 1:
+                snake.death_cause = 'head'
+            elif self.occupied[head_pos]:
+                snake.death_cause = 'body'
+        # Move the survivors & take the dead off the board.
+        outcomes = [states.STEP_OUTCOMES['dead']] * len(self.snakes)
+        for snake in moving:
+            if snake.death_cause is None:
+                snake.body.appendleft(heads[snake])
+                self.cover(heads[snake])
+                outcomes[snake.index] = states.STEP_OUTCOMES['moved']
+        for snake in moving:
+            if snake.death_cause is not None:
+                snake.dead = True
+                for position in snake.body:
+                    self.uncover(position)
+                snake.body.clear()
+        # Grow the snakes that found food.
+        for snake in moving:
+            if not snake.dead and snake.head_pos in self.food:
+                self.eat(snake)
+                outcomes[snake.index] = states.STEP_OUTCOMES['ate']
+        return outcomes
+
+    def eat(self, snake):
+        """Eat the food under a snake head & spawn more food."""
+        self.food.remove(snake.head_pos)
+        snake.growing += 1
+        snake.score.add_food_points()
+        self.food_eaten += 1
+        self.spawn_food()
+
+    def spawn_food(self):
+        """Top up the food on the board, in random free positions."""
+        while len(self.food) < self.num_food:
+            position = self.free_cells.choice(self.rng)
+            if position is None:
+                break
+            self.food.add(position)
+            self.free_cells.remove(position)
+
+    def get_greedy_action(self, snake):
+        """
+        Choose a direction for a computer controlled snake.
+
+        Head for the nearest food, avoiding walls, bodies & cells other
+        heads could move into where possible. Only look at the four
+        cells around the head, so steering costs the same on any board.
+        """
+        if snake.target not in self.food:
+            head = snake.head_pos
+            snake.target = min(
+                self.food, default=None,
+                key=lambda food: (abs(food[0] - head[0]) +
+                                  abs(food[1] - head[1])))
+        head = snake.head_pos
+        choices = []
+        for direction, (dx, dy) in states.DIRECTIONS.items():
+            if direction == states.OPPOSITE_DIRECTIONS[snake.direction]:
+                continue
+            position = (head[0] + dx, head[1] + dy)
+            distance = 0
+            if snake.target is not None:
+                distance = (abs(snake.target[0] - position[0]) +
+                            abs(snake.target[1] - position[1]))
+            choices.append((not self.is_safe(position),
+                            self.count_free_neighbours(position) < 2,
+                            distance, direction))
+        return min(choices)[3]
+
+    def count_free_neighbours(self, position):
+        """Count the safe cells around a position."""
+        return sum(self.is_safe((position[0] + dx, position[1] + dy))
+                   for dx, dy in states.DIRECTIONS.values())
+
+    def get_greedy_actions(self, skip=()):
+        """
+        Choose directions for every live snake.
+
+        Leave out the snakes indexed in skip, e.g. human players.
+        """
+        return [None if snake.dead or snake.index in skip
+                else self.get_greedy_action(snake)
+                for snake in self.snakes]
+
+    def increase_speed(self, increment):
+        """Increase the speed of the snakes up to a maximum."""
+        self.speed = min(self.speed + increment, self.max_speed)
+
+    def decrease_speed(self, increment):
+        """Decrease the speed of the snakes down to a minimum."""
+        self.speed = max(self.speed - increment, self.min_speed)
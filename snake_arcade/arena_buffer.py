@@ -0,0 +1,221 @@
+"""Snake Arcade batched vertex buffer for drawing arena snakes."""
+
+import arcade
+from arcade import shader
+import numpy as np
+import pyglet.gl as gl
+
+import snake_buffer
+
+# Template vertex layout: fill position (x, y), then border position.
+# Borders take 24 vertices & fills 6, so the rest of the fill collapses.
+TEMPLATE_FORMAT = '2f 2f'
+TEMPLATE_ATTRIBUTES = ('in_fill', 'in_border')
+# Instance layout: segment centre (x, y), then colour index.
+INSTANCE_FORMAT = '2f 1f'
+INSTANCE_ATTRIBUTES = ('in_center', 'in_colour')
+INSTANCE_SIZE = 3 * 4
+
+# Colour indexes: heads of the player & of other snakes, the three body
+# colours & food, then the borders of snakes & food.
+PLAYER_HEAD = 0
+HEAD = 1
+BODY = 2
+FOOD = 5
+BORDER = 6
+FOOD_BORDER = 7
+
+VERTEX_SHADER = '''
+    #version 330
+    #define BORDER 6
+    uniform mat4 Projection;
+    uniform vec2 Offset;
+    uniform vec4 PlayerHeadColour;
+    uniform vec4 HeadColour;
+    uniform vec4 BodyColour1;
+    uniform vec4 BodyColour2;
+    uniform vec4 BodyColour3;
+    uniform vec4 FoodColour;
+    uniform vec4 BorderColour;
+    uniform vec4 FoodBorderColour;
+    in vec2 in_fill;
+    in vec2 in_border;
+    in vec2 in_center;
+    in float in_colour;
+    out vec4 v_color;
+    void main() {
+        int colour = int(in_colour);
+        vec2 position = in_center - Offset;
+        if (colour >= BORDER) {
+            position += in_border;
+            v_color = colour == BORDER ? BorderColour : FoodBorderColour;
+        } else {
+            position += in_fill;
+            if (colour == 0) {
+                v_color = PlayerHeadColour;
+            } else if (colour == 1) {
+                v_color = HeadColour;
+            } else if (colour == 2) {
+                v_color = BodyColour1;
+            } else if (colour == 3) {
+                v_color = BodyColour2;
+            } else if (colour == 4) {
+                v_color = BodyColour3;
+            } else {
+                v_color = FoodColour;
+            }
+        }
+        gl_Position = Projection * vec4(position, 0.0, 1.0);
+    }
+'''
+
+# Compiled once & shared by every arena buffer.
+_program = None
+
+
+def get_program():
+    """Get the shader program used to draw arena snakes."""
+    global _program
+    if _program is None:
+        _program = shader.program(vertex_shader=VERTEX_SHADER,
+                                  fragment_shader=snake_buffer.FRAGMENT_SHADER)
+    return _program
+
+
+def get_template(size):
+    """
+    Get the vertices of one body segment centred on (0, 0).
+
+    Match the shapes drawn by SnakeBuffer. Pair each border vertex with
+    a fill vertex, padding the fill with vertices at the centre.
+    """
+    border = snake_buffer.get_outline_triangles(0, 0, size, size, 2)
+    fill = snake_buffer.get_rectangle_triangles(0, 0, size, size)
+    fill += [(0, 0)] * (len(border) - len(fill))
+    return np.array([fill_point + border_point
+                     for fill_point, border_point in zip(fill, border)],
+                    dtype='f4')
+
+
+class ArenaBuffer():
+    """
+    One instanced vertex buffer holding every snake & food in an arena.
+
+    Each body segment or piece of food in view is one instance: a centre
+    & a colour index, packed with NumPy whenever the arena steps or the
+    view moves. The shader places a shared square template at each
+    instance, so the whole arena is drawn in one draw call however many
+    snakes there are. Fills are laid out before borders, as with
+    SnakeBuffer.
+    """
+
+    def __init__(self, size):
+        """Initialize an empty buffer for segments of a size in pixels."""
+        self.size = size
+        self.program = get_program()
+        self.template = get_template(size)
+        self.template_vbo = shader.Buffer(self.template.tobytes())
+        self.colours = {}
+        self.instances = 0
+        # Arena, tick & view the buffer was last packed for.
+        self.packed = None
+        self.create_buffers(1024)
+
+    def create_buffers(self, capacity):
+        """Allocate a GPU buffer for up to capacity segments."""
+        self.capacity = capacity
+        # Every segment has a fill & a border instance.
+        self.instance_vbo = shader.Buffer.create_with_size(
+            capacity * 2 * INSTANCE_SIZE, usage='stream')
+        self.vao = shader.vertex_array(
+            self.program,
+            [shader.BufferDescription(self.template_vbo, TEMPLATE_FORMAT,
+                                      TEMPLATE_ATTRIBUTES),
+             shader.BufferDescription(self.instance_vbo, INSTANCE_FORMAT,
+                                      INSTANCE_ATTRIBUTES, instanced=True)])
+
+    def set_colours(self, theme):
+        """
+        Load a colour theme. Only shader uniforms change.
+
+        Heads of snakes other than the player are drawn in the border
+        colour, to tell them apart.
+        """
+        self.colours = {
+            'PlayerHeadColour': theme['head'],
+            'HeadColour': theme['snake_border'],
+            'BodyColour1': theme['snake_body_1'],
+            'BodyColour2': theme['snake_body_2'],
+            'BodyColour3': theme['snake_body_3'],
+            'FoodColour': theme['food'],
+            'BorderColour': theme['snake_border'],
+            'FoodBorderColour': theme['food_border']
+        }
+
+    def pack(self, game_arena, view, player=0):
+        """
+        Pack every live snake segment & piece of food in view.
+
+        The view is (left, bottom, right, top) in board pixels. The
+        player's head is coloured apart from the other snakes.
+        """
+        live = [arena_snake for arena_snake in game_arena.snakes
+                if not arena_snake.dead]
+        lengths = np.array([len(arena_snake.body) for arena_snake in live] +
+                           [len(game_arena.food)], dtype=np.int64)
+        total = int(lengths.sum())
+        positions = np.fromiter(
+            (value for cells in ([arena_snake.body for arena_snake in live] +
+                                 [game_arena.food])
+             for position in cells for value in position),
+            dtype='f4', count=total * 2).reshape(total, 2)
+        # Number each segment from its own snake's head.
+        starts = np.cumsum(lengths) - lengths
+        indexes = np.arange(total) - np.repeat(starts, lengths)
+        colours = BODY + (indexes - 1) % 3
+        for i, arena_snake in enumerate(live):
+            colours[starts[i]] = (PLAYER_HEAD if arena_snake.index == player
+                                  else HEAD)
+        # Food comes last.
+        colours[starts[-1]:] = FOOD
+        borders = np.full(total, BORDER, dtype='f4')
+        borders[starts[-1]:] = FOOD_BORDER
+        centres = positions * self.size - self.size / 2
+        # Cull segments centred out of view.
+        visible = ((centres[:, 0] >= view[0]) & (centres[:, 1] >= view[1]) &
+                   (centres[:, 0] <= view[2]) & (centres[:, 1] <= view[3]))
+        count = int(visible.sum())
+        if count > self.capacity:
+            self.create_buffers(max(count, self.capacity * 2))
+        instances = np.empty((2, count, 3), dtype='f4')
+        instances[:, :, :2] = centres[visible]
+        instances[0, :, 2] = colours[visible]
+        instances[1, :, 2] = borders[visible]
+        self.instance_vbo.write(instances.tobytes())
+        self.instances = count * 2
+
+    def draw(self, game_arena, offset=(0, 0),
+             view=snake_buffer.NO_VIEW, player=0):
+        """
+        Draw every snake & piece of food in an arena in one draw call.
+
+        Only repack the snakes after the arena steps or the view moves.
+        Shift the snakes by an offset in pixels, e.g. to scroll a large
+        board.
+        """
+        packed = (id(game_arena), game_arena.ticks, tuple(view))
+        if packed != self.packed:
+            self.pack(game_arena, view, player)
+            self.packed = packed
+        if not self.instances:
+            return
+        with self.program:
+            self.program['Projection'] = arcade.get_projection().flatten()
+            self.program['Offset'] = offset
+            for name, colour in self.colours.items():
+                self.program[name] = arcade.get_four_float_color(colour)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        with self.vao:
+            gl.glDrawArraysInstanced(gl.GL_TRIANGLES, 0, len(self.template),
+                                     self.instances)
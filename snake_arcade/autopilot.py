@@ -0,0 +1,535 @@
+"""Snake Arcade autopilot player."""
+
+import collections
+import time
+
+import settings
+import states
+
+# Cells searched between checks of the time budget.
+CHUNK = 64
+
+
+def get_board_cycle(game_board):
+    """
+    Get a cycle that visits every board cell once.
+
+    Snakes following the cycle never collide, however long they are.
+    Go up & down the columns above the bottom row, then return along
+    the bottom row. Boards with an odd width use rows instead.
+
+    Boards with both sides odd have no such cycle, so the last column
+    is visited in pairs of cells, by detours from the column beside it,
+    & its bottom cell is left out (see get_cycle_gap).
+    """
+    width, height = game_board.width, game_board.height
+    transpose = width % 2 and not height % 2
+    if transpose:
+        width, height = height, width
+    columns = width - width % 2
+    cycle = []
+    for x in range(columns):
+        rows = range(1, height)
+        if x % 2:
+            rows = reversed(rows)
+        if x == columns - 1 and width % 2:
+            rows = list(rows)
+            for y in range(0, len(rows), 2):
+                cycle.extend([(x, rows[y]), (x + 1, rows[y]),
+                              (x + 1, rows[y + 1]), (x, rows[y + 1])])
+        else:
+            cycle.extend((x, y) for y in rows)
+    cycle.extend((x, 0) for x in reversed(range(columns)))
+    if transpose:
+        cycle = [(y, x) for x, y in cycle]
+    return [(x + game_board.left, y + game_board.bottom) for x, y in cycle]
+
+
+def get_cycle_gap(game_board, cycle):
+    """
+    Get a detour through the cell a board cycle leaves out.
+
+    The left out cell is next to two cells two apart on the cycle, so
+    it can be visited in place of the cell between them. Return the
+    direction to travel from the cell before the detour into the left
+    out cell & from there back onto the cycle, or an empty dict when the
+    cycle visits every cell.
+    """
+    if len(cycle) == game_board.size:
+        return {}
+    cycled = set(cycle)
+    gap = next((x, y)
+               for x in range(game_board.left, game_board.right + 1)
+               for y in range(game_board.bottom, game_board.top + 1)
+               if (x, y) not in cycled)
+    directions = {vector: name for name, vector in states.DIRECTIONS.items()}
+    for i, cell in enumerate(cycle):
+        after = cycle[(i + 2) % len(cycle)]
+        into = (gap[0] - cell[0], gap[1] - cell[1])
+        out = (after[0] - gap[0], after[1] - gap[1])
+        if into in directions and out in directions:
+            return {cell: directions[into], gap: directions[out]}
+
+
+def get_cycle_directions(cycle):
+    """Get the direction to travel from each cell of a cycle to the next."""
+    directions = {vector: name for name, vector in states.DIRECTIONS.items()}
+    return {cell: directions[(cycle[(i + 1) % len(cycle)][0] - cell[0],
+                              cycle[(i + 1) % len(cycle)][1] - cell[1])]
+            for i, cell in enumerate(cycle)}
+
+
+def run(task, deadline):
+    """
+    Run a planning task until it finishes or the deadline passes.
+
+    Tasks are generators that yield after every CHUNK cells searched.
+    Return (True, result) when the task finishes, else (False, None).
+    """
+    try:
+        while time.perf_counter() < deadline:
+            next(task)
+    except StopIteration as stop:
+        return True, stop.value
+    return False, None
+
+
+class Autopilot():
+    """
+    A computer player for a game engine.
+
+    Follows a Hamiltonian cycle of the board, which visits every cell.
+    Once the body lies in cycle order, the snake cuts across the cycle
+    towards the food only where that keeps it in order, so it is never
+    cut off & eats every piece of food until the board is full.
+
+    Until then, e.g. when taking over a long snake from the player, the
+    snake follows the cycle whenever that is safe, which lays the body
+    along it. Otherwise it plans with a breadth first search of
+    distances to the food, made once per piece of food. The shortest
+    path to the food is only taken when a search from the end of the
+    path shows the snake, grown by eating, can still reach its tail.
+    Otherwise the snake takes one move at a time towards its tail,
+    checked with a flood fill.
+
+    Boards with both sides odd have no Hamiltonian cycle, so the cycle
+    leaves out one cell, visited by a detour when the food is there.
+    Snakes fill these boards but for their last cell, which they can't
+    reach without running into their own body.
+
+    Planning is split into small tasks run within a time budget each
+    frame & resumed on the next, so even large boards never stall a
+    frame. A cheap move is made when a step is due before planning has
+    finished.
+
+    Searches only read the engine, so the autopilot can drive any game,
+    including one being recorded.
+    """
+
+    def __init__(self, game_engine, budget=settings.AUTOPILOT_BUDGET):
+        """
+        Initialize the autopilot for a game engine.
+
+        The budget is the planning time allowed each frame, in seconds.
+        """
+        self.engine = game_engine
+        self.budget = budget
+        # Directions around the Hamiltonian cycle & through any cell it
+        # leaves out.
+        cycle = get_board_cycle(game_engine.board)
+        self.cycle = get_cycle_directions(cycle)
+        self.gap = get_cycle_gap(game_engine.board, cycle)
+        # Place of each cell on the cycle. The cell it leaves out is
+        # entered from the cell before the one it is visited in place of,
+        # & shares that cell's place.
+        self.places = {cell: i for i, cell in enumerate(cycle)}
+        self.gap_entry = None
+        for cell in self.gap:
+            if cell in self.places:
+                self.gap_entry = cell
+            else:
+                gap_cell = cell
+        if self.gap:
+            self.places[gap_cell] = self.places[self.gap_entry] + 1
+        # Set while the body lies in cycle order, & the engine tick it
+        # was last known to.
+        self.locked = False
+        self.locked_ticks = None
+        # Distances from each cell to the food & the search building them.
+        self.field = None
+        self.field_food = None
+        self.field_task = None
+        # Steps since the food last moved. Snakes out of cycle order that
+        # have gone round the board without eating try moves along the
+        # cycle first.
+        self.hungry = 0
+        # Safe path to the food, as directions, & where it carries on from.
+        self.path = collections.deque()
+        self.path_head = None
+        # Planning task for a head position & the move it chose.
+        self.task = None
+        self.task_head = None
+        self.choice = None
+
+    def think(self, deadline=None):
+        """
+        Plan the next move until done or the deadline passes.
+
+        Default to one frame's budget from now.
+        """
+        if deadline is None:
+            deadline = time.perf_counter() + self.budget
+        game_engine = self.engine
+        if game_engine.food_pos != self.field_food:
+            self.field_food = game_engine.food_pos
+            self.field = None
+            self.field_task = self.search_food(game_engine.food_pos)
+            self.hungry = 0
+            self.path.clear()
+            self.task_head = None
+        if self.field is None:
+            done, field = run(self.field_task, deadline)
+            if not done:
+                return
+            self.field = field
+        head = game_engine.head_pos
+        if self.path and self.path_head == head:
+            return
+        if self.task_head != head:
+            self.task_head = head
+            self.task = self.plan()
+            self.choice = None
+        if self.choice is None:
+            done, choice = run(self.task, deadline)
+            if done:
+                self.choice = choice
+
+    def decide(self, deadline=None):
+        """
+        Get the direction to move in on the next step.
+
+        Follow the safe path to the food when there is one, else use the
+        planned move if planning has finished in time, or a cheap
+        fallback move otherwise.
+        """
+        self.think(deadline)
+        self.hungry += 1
+        head = self.engine.head_pos
+        if self.path and self.path_head == head:
+            direction = self.path.popleft()
+            dx, dy = states.DIRECTIONS[direction]
+            self.path_head = (head[0] + dx, head[1] + dy)
+            return direction
+        if self.choice is not None and self.task_head == head:
+            return self.choice
+        return self.get_fallback()
+
+    def get_moves(self):
+        """
+        Get the cells the head can move into, with their directions.
+
+        Leave out walls, the body & the way back. The tail moves out of
+        the way unless the snake is growing.
+        """
+        game_engine = self.engine
+        head = game_engine.head_pos
+        tail = game_engine.body[-1] if not game_engine.growing else None
+        moves = []
+        for direction, (dx, dy) in states.DIRECTIONS.items():
+            if direction == states.OPPOSITE_DIRECTIONS[game_engine.direction]:
+                continue
+            cell = (head[0] + dx, head[1] + dy)
+            if not game_engine.check_wall_collisions(cell) and \
+                    (not game_engine.occupied[cell] or cell == tail):
+                moves.append((cell, direction))
+        return moves
+
+    def is_free(self, cell):
+        """Check if a cell is inside the walls & not covered by the body."""
+        return not (self.engine.check_wall_collisions(cell) or
+                    self.engine.occupied[cell])
+
+    def get_fallback(self):
+        """
+        Get a move without searching.
+
+        Follow the Hamiltonian cycle where it is free, else move to the
+        cell with the most free cells around it. Bodies in cycle order
+        are kept in order.
+        """
+        if self.locked:
+            return self.get_shortcut()
+        moves = self.get_moves()
+        if not moves:
+            return self.engine.direction
+        cycle_direction = self.get_cycle_direction()
+        for cell, direction in moves:
+            if direction == cycle_direction:
+                return direction
+        return max(moves, key=lambda move: sum(
+            self.is_free((move[0][0] + dx, move[0][1] + dy))
+            for dx, dy in states.DIRECTIONS.values()))[1]
+
+    def get_cycle_direction(self):
+        """
+        Get the direction along the Hamiltonian cycle from the head.
+
+        Detour through the cell the cycle leaves out when the food is
+        there, so a snake following the cycle eats wherever the food is.
+        """
+        head = self.engine.head_pos
+        if head in self.gap and (self.engine.food_pos in self.gap or
+                                 head not in self.cycle):
+            return self.gap[head]
+        return self.cycle.get(head)
+
+    def search_food(self, food_pos):
+        """
+        Search outward from the food over free cells.
+
+        Return the distance from each reachable cell to the food. Cells
+        covered now only free up as the snake moves on, so the distances
+        stay usable while the snake follows them.
+        """
+        field = {}
+        if food_pos is None:
+            return field
+        field[food_pos] = 0
+        queue = collections.deque([food_pos])
+        searched = 0
+        while queue:
+            cell = queue.popleft()
+            distance = field[cell] + 1
+            for dx, dy in states.DIRECTIONS.values():
+                neighbour = (cell[0] + dx, cell[1] + dy)
+                if neighbour not in field and self.is_free(neighbour):
+                    field[neighbour] = distance
+                    queue.append(neighbour)
+            searched += 1
+            if searched % CHUNK == 0:
+                yield
+        return field
+
+    def get_food_path(self):
+        """
+        Get the shortest path to the food, following the distances down.
+
+        Return the cells & directions of the path, or empty lists when
+        the food cannot be reached through free cells.
+        """
+        moves = [move for move in self.get_moves() if move[0] in self.field]
+        if not moves:
+            return [], []
+        cell, direction = min(moves, key=lambda move: self.field[move[0]])
+        cells = [cell]
+        directions = [direction]
+        while self.field[cell]:
+            for direction, (dx, dy) in states.DIRECTIONS.items():
+                neighbour = (cell[0] + dx, cell[1] + dy)
+                if self.field.get(neighbour) == self.field[cell] - 1 and \
+                        self.is_free(neighbour):
+                    break
+            else:
+                return [], []
+            cell = neighbour
+            cells.append(cell)
+            directions.append(direction)
+        return cells, directions
+
+    def plan(self):
+        """
+        Plan the next move from the current head position.
+
+        Once the body lies in cycle order, take a move along the cycle or
+        a shortcut across it (see get_shortcut). Until then, follow the
+        cycle whenever that is safe, which lays the body along it. Else
+        take the shortest path to the food when it is safe, keeping the
+        rest of the path for the following steps, or choose one move
+        towards the tail.
+        """
+        game_engine = self.engine
+        if self.locked and game_engine.ticks != self.locked_ticks + 1:
+            # The engine was stepped or reset without a planned move.
+            self.locked = False
+        if not self.locked:
+            self.locked = yield from self.is_ordered()
+        if self.locked:
+            self.locked_ticks = game_engine.ticks
+            return self.get_shortcut()
+        safe = yield from self.follows_cycle(game_engine.body,
+                                             game_engine.growing)
+        if safe:
+            return self.get_cycle_direction()
+        if self.hungry > game_engine.board.size:
+            return (yield from self.choose())
+        cells, directions = self.get_food_path()
+        if cells:
+            # The body once the snake has followed the path & eaten.
+            body = list(reversed(cells)) + list(self.engine.body)
+            body = body[:len(self.engine.body) + self.engine.growing + 1]
+            safe = yield from self.reaches_tail(body)
+            if safe:
+                self.path = collections.deque(directions[1:])
+                self.path_head = cells[0]
+                return directions[0]
+        return (yield from self.choose())
+
+    def reaches_tail(self, body):
+        """Check if the head of a body, head first, can reach its tail."""
+        head = body[0]
+        tail = body[-1]
+        covered = set(body)
+        seen = {head}
+        queue = collections.deque([head])
+        searched = 0
+        while queue:
+            cell = queue.popleft()
+            for dx, dy in states.DIRECTIONS.values():
+                neighbour = (cell[0] + dx, cell[1] + dy)
+                if neighbour == tail:
+                    return True
+                if neighbour not in seen and neighbour not in covered and \
+                        not self.engine.check_wall_collisions(neighbour):
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+            searched += 1
+            if searched % CHUNK == 0:
+                yield
+        return False
+
+    def is_ordered(self):
+        """
+        Check if the body lies in cycle order.
+
+        Going from the tail to the head, each segment must be further
+        round the cycle than the one before, so the cells ahead of the
+        head on the cycle are free up to the tail.
+        """
+        places = self.places
+        size = len(self.cycle)
+        body = self.engine.body
+        if body[-1] not in places:
+            return False
+        tail_place = places[body[-1]]
+        last = -1
+        for i, cell in enumerate(reversed(body)):
+            if cell not in places:
+                return False
+            place = (places[cell] - tail_place) % size
+            if place <= last:
+                return False
+            last = place
+            if i % CHUNK == CHUNK - 1:
+                yield
+        return True
+
+    def get_shortcut(self):
+        """
+        Get a move along the cycle, cutting across it towards the food.
+
+        The body lies in cycle order, so moves further round the cycle
+        than the head & short of the tail keep it in order. Skip as far
+        round as the food, leaving room before the tail for the snake to
+        grow. Snakes kept in order are not cut off, & going round the
+        cycle they reach every cell, so the food is always eaten.
+        """
+        game_engine = self.engine
+        places = self.places
+        size = len(self.cycle)
+        head_place = places[game_engine.head_pos]
+        food = game_engine.food_pos
+        # Food in the cell the cycle leaves out is reached from the cell
+        # before it.
+        target = self.gap_entry if food in self.gap and \
+            food != self.gap_entry else food
+        to_food = (places[target] - head_place) % size if target else 0
+        room = ((places[game_engine.body[-1]] - head_place) % size -
+                game_engine.growing - 3)
+        # Stop cutting across once half the board is covered, so the
+        # cells skipped over are filled before the board runs out.
+        if (len(game_engine.body) + game_engine.growing) * 2 > size:
+            room = 0
+        moves = []
+        for cell, direction in self.get_moves():
+            distance = (places[cell] - head_place) % size
+            if distance == 1 or 1 < distance <= room:
+                moves.append((distance <= to_food,
+                              distance if distance <= to_food else -distance,
+                              cell == food, direction))
+        if not moves:
+            return game_engine.direction
+        return max(moves)[3]
+
+    def follows_cycle(self, body, growing):
+        """
+        Check if a body, head first, can follow the cycle without eating.
+
+        Each body segment must have moved on before the head reaches it.
+        Once the head has gone the length of the body, the body lies
+        along the cycle & can follow it for good.
+        """
+        places = {cell: i for i, cell in enumerate(body)}
+        cell = body[0]
+        for distance in range(1, len(body) + growing):
+            if cell in self.cycle:
+                dx, dy = states.DIRECTIONS[self.cycle[cell]]
+            else:
+                dx, dy = states.DIRECTIONS[self.gap[cell]]
+            cell = (cell[0] + dx, cell[1] + dy)
+            # Segments move on as the tail is removed, after growing.
+            if cell in places and \
+                    distance < len(body) - places[cell] + growing:
+                return False
+            if distance % CHUNK == 0:
+                yield
+        return True
+
+    def choose(self):
+        """
+        Choose one move that keeps the tail in reach.
+
+        Try moves nearest the food first, then along the Hamiltonian
+        cycle. Once the snake is going round without eating, try moves
+        along the cycle first, so it gets back onto the cycle. When no
+        move reaches the tail, take the one with the most room around it.
+        """
+        cycle_direction = self.get_cycle_direction()
+        hungry = self.hungry > self.engine.board.size
+        moves = sorted(self.get_moves(), key=lambda move: (
+            hungry and move[1] != cycle_direction,
+            self.field.get(move[0], float('inf')),
+            move[1] != cycle_direction))
+        best = (-1, self.get_fallback())
+        for cell, direction in moves:
+            room = yield from self.flood(cell)
+            if room is None:
+                return direction
+            best = max(best, (room, direction))
+        return best[1]
+
+    def flood(self, start):
+        """
+        Flood fill the free cells reachable from a cell.
+
+        Return None as soon as the tail is reached, as following the
+        tail always leaves a way out, else the number of cells reached.
+        """
+        tail = self.engine.body[-1]
+        if start == tail:
+            return None
+        seen = {start}
+        queue = collections.deque([start])
+        searched = 0
+        while queue:
+            cell = queue.popleft()
+            for dx, dy in states.DIRECTIONS.values():
+                neighbour = (cell[0] + dx, cell[1] + dy)
+                if neighbour == tail:
+                    return None
+                if neighbour not in seen and self.is_free(neighbour):
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+            searched += 1
+            if searched % CHUNK == 0:
+                yield
+        return len(seen)
@@ -0,0 +1,243 @@
+"""Snake Arcade vectorized batch game engine."""
+
+import numpy as np
+
+import board
+import modes
+import settings
+import states
+
+# Direction codes used for batched actions. Opposite directions differ in
+# their lowest bit, so the opposite of a code is found with "code ^ 1".
+ACTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+ACTION_VECTORS = np.array([states.DIRECTIONS[action] for action in ACTIONS],
+                          dtype=np.int16)
+# Action code meaning "keep the current direction".
+NO_ACTION = -1
+
+# Outcome codes returned for each game by BatchEngine.step().
+OUTCOMES = (states.STEP_OUTCOMES['moved'],
+            states.STEP_OUTCOMES['ate'],
+            states.STEP_OUTCOMES['dead'],
+            states.STEP_OUTCOMES['won'])
+MOVED, ATE, DEAD, WON = range(len(OUTCOMES))
+
+# Death cause codes.
+DEATH_CAUSES = (None, 'wall', 'body')
+
+
+class BatchEngine():
+    """
+    Many headless games of snake advanced together.
+
+    Hold N independent games in NumPy arrays & step them all at once
+    with the same rules as the GameEngine. Finished (dead or won) games
+    are reset automatically, so the batch always contains N running
+    games.
+
+    Body segments are kept in a ring buffer per game. The head lives
+    at head_index & the rest of the body follows it around the ring.
+    Occupancy grids count the body segments in each cell, as a head
+    may move onto its own tail.
+    """
+
+    def __init__(self, num_games, mode=states.GAME_MODES['normal'],
+                 seed=None, game_board=None):
+        """
+        Initialize the batch engine.
+
+        Play on the default game board unless a Board is given. Allocate
+        every array up front, sized for the largest snake the game board
+        can hold.
+        """
+        self.num_games = num_games
+        self.board = game_board if game_board is not None else board.Board()
+        self.mode = mode
+        self.rng = np.random.default_rng(seed)
+        self.rules = modes.MODE_RULES[mode]
+        self.food_points = self.rules.food_points
+        self.milestone_amount = self.rules.milestone_amount
+        # Game board size in game grid "cells".
+        self.width = self.board.width
+        self.height = self.board.height
+        # Every board cell, plus a head that has moved into a wall.
+        self.capacity = self.width * self.height + 1
+        self.games = np.arange(num_games)
+        # Snake body ring buffers & occupancy grids.
+        self.body = np.zeros((num_games, self.capacity, 2), dtype=np.int16)
+        self.head_index = np.zeros(num_games, dtype=np.int64)
+        self.length = np.zeros(num_games, dtype=np.int64)
+        self.growing = np.zeros(num_games, dtype=np.int64)
+        self.grid = np.zeros((num_games, self.width, self.height),
+                             dtype=np.uint8)
+        self.direction = np.zeros(num_games, dtype=np.int8)
+        # Food, score & speed.
+        self.food = np.zeros((num_games, 2), dtype=np.int16)
+        self.score = np.zeros(num_games, dtype=np.int64)
+        self.milestone_checkpoint = np.zeros(num_games, dtype=np.int64)
+        self.speed = np.zeros(num_games, dtype=np.int64)
+        self.min_speed = np.zeros(num_games, dtype=np.int64)
+        self.max_speed = settings.MAX_SPEED
+        # Status.
+        self.ticks = np.zeros(num_games, dtype=np.int64)
+        self.death_cause = np.zeros(num_games, dtype=np.int8)
+        # Results of the last finished game in each slot.
+        self.games_finished = 0
+        self.final_score = np.zeros(num_games, dtype=np.int64)
+        self.final_length = np.zeros(num_games, dtype=np.int64)
+        self.final_ticks = np.zeros(num_games, dtype=np.int64)
+        self.reset(self.games)
+
+    @property
+    def head(self):
+        """Get the head position of every snake."""
+        return self.body[self.games, self.head_index]
+
+    def reset(self, games):
+        """
+        Start new games in the given game slots.
+
+        Place each snake in a random position facing up, then spawn
+        the first piece of food.
+        """
+        games = np.asarray(games, dtype=np.int64)
+        count = len(games)
+        if not count:
+            return
+        head_x = self.rng.integers(self.board.left + 2,
+                                   self.board.right - 2, count,
+                                   endpoint=True)
+        head_y = self.rng.integers(self.board.bottom + 5,
+                                   self.board.top - 14, count,
+                                   endpoint=True)
+        self.grid[games] = 0
+        self.head_index[games] = 0
+        self.length[games] = 3
+        self.growing[games] = 0
+        self.direction[games] = ACTIONS.index('UP')
+        # Align the body to follow the direction of the head.
+        for segment in range(3):
+            self.body[games, segment, 0] = head_x
+            self.body[games, segment, 1] = head_y - segment
+            self.grid[games, head_x - self.board.left,
+                      head_y - segment - self.board.bottom] = 1
+        self.score[games] = 0
+        self.milestone_checkpoint[games] = 0
+        self.speed[games] = self.rules.start_speed
+        self.min_speed[games] = self.rules.min_speed
+        self.ticks[games] = 0
+        self.spawn_food(games)
+
+    def spawn_food(self, games):
+        """
+        Spawn food in a random free cell for each of the given games.
+
+        Give every free cell a random priority & take the highest, which
+        picks uniformly among the cells the snake does not occupy.
+
+        Return a Boolean array marking the games with a full board, which
+        are left without food.
+        """
+        priority = self.rng.random((len(games), self.width * self.height))
+        priority[self.grid[games].reshape(len(games), -1) > 0] = -1
+        cell = priority.argmax(axis=1)
+        full = priority[np.arange(len(games)), cell] < 0
+        self.food[games, 0] = np.where(
+            full, -1, (cell // self.height) + self.board.left)
+        self.food[games, 1] = np.where(
+            full, -1, (cell % self.height) + self.board.bottom)
+        return full
+
+    def step(self, actions=None):
+        """
+        Advance every game by one game grid "cell".
+
+        Take an array of action codes (indexes into ACTIONS, or
+        NO_ACTION), one per game. Opposing movements are ignored.
+
+        Return an array of outcome codes (indexes into OUTCOMES). Games
+        that died are reset before returning.
+        """
+        games = self.games
+        # Set each snake direction to the player's desired direction.
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int8)
+            turn = (actions != NO_ACTION) & (actions != (self.direction ^ 1))
+            self.direction = np.where(turn, actions, self.direction)
+        self.ticks += 1
+        # Stop growth by removing the tail, unless the snake is growing.
+        grow = self.growing > 0
+        self.growing -= grow
+        tail_index = (self.head_index + self.length - 1) % self.capacity
+        shrink = games[~grow]
+        tail = self.body[shrink, tail_index[shrink]]
+        self.grid[shrink, tail[:, 0] - self.board.left,
+                  tail[:, 1] - self.board.bottom] -= 1
+        self.length += grow
+        # Move the head.
+        head = self.head + ACTION_VECTORS[self.direction]
+        self.head_index = (self.head_index - 1) % self.capacity
+        self.body[games, self.head_index] = head
+        board_x = head[:, 0] - self.board.left
+        board_y = head[:, 1] - self.board.bottom
+        # Check for collisions with border walls.
+        hit_wall = ((board_x < 0) | (board_x >= self.width) |
+                    (board_y < 0) | (board_y >= self.height))
+        inside = games[~hit_wall]
+        # Check for collisions with the body, ignoring the tail segment.
+        tail_index = (self.head_index + self.length - 1) % self.capacity
+        tail = self.body[games, tail_index]
+        hit_body = np.zeros(self.num_games, dtype=np.bool_)
+        hit_body[inside] = (
+            (self.grid[inside, board_x[inside], board_y[inside]] > 0) &
+            np.any(head[inside] != tail[inside], axis=1))
+        self.grid[inside, board_x[inside], board_y[inside]] += 1
+        dead = hit_wall | hit_body
+        # Grow the snake & advance the game state when food is eaten.
+        ate = ~dead & np.all(head == self.food, axis=1)
+        eaters = games[ate]
+        won = np.zeros(self.num_games, dtype=np.bool_)
+        if len(eaters):
+            won[eaters] = self.eat(eaters)
+        outcomes = np.full(self.num_games, MOVED, dtype=np.int8)
+        outcomes[ate] = ATE
+        outcomes[dead] = DEAD
+        outcomes[won] = WON
+        # Keep the batch full by starting a new game for every death or win.
+        self.death_cause = np.where(hit_wall, 1,
+                                    np.where(hit_body, 2, 0)).astype(np.int8)
+        finished = games[dead | won]
+        if len(finished):
+            self.games_finished += len(finished)
+            self.final_score[finished] = self.score[finished]
+            self.final_length[finished] = self.length[finished]
+            self.final_ticks[finished] = self.ticks[finished]
+            self.reset(finished)
+        return outcomes
+
+    def eat(self, games):
+        """
+        Eat the food under the snake heads of the given games.
+
+        Grow the snakes, update the scores, speed up on milestone
+        scores & spawn the next pieces of food.
+
+        Return a Boolean array marking the games won by filling the board.
+        """
+        self.growing[games] += 1
+        self.score[games] += self.food_points
+        if self.milestone_amount is not None:
+            milestone = (self.score[games] - self.milestone_amount ==
+                         self.milestone_checkpoint[games])
+            reached = games[milestone]
+            self.milestone_checkpoint[reached] += self.milestone_amount
+            # Increase snake speed (if below max) & raise the minimum speed.
+            increment = self.rules.milestone_speed
+            self.speed[reached] = np.where(
+                self.speed[reached] < self.max_speed,
+                np.minimum(self.speed[reached] + increment, self.max_speed),
+                self.speed[reached])
+            raise_min = reached[self.min_speed[reached] + increment <=
+                                self.max_speed]
+            self.min_speed[raise_min] += increment
+        return self.spawn_food(games)
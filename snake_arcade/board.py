@@ -0,0 +1,87 @@
+"""Snake Arcade game board."""
+
+import settings
+
+# Longest board side, in "cells", so that cell coordinates (even just
+# outside the walls) fit in 16 bits, e.g. in game engine snapshots.
+MAX_SIDE = 0xFFFF - max(settings.BOARD_LEFT, settings.BOARD_BOTTOM)
+
+
+class Board():
+    """
+    The game board size & position.
+
+    Edges are inclusive & in game grid "cells". The default board fits
+    the game window, but boards can be set to any size at runtime, e.g.
+    arenas of 1000 x 1000 cells or more seen through a Camera.
+    """
+
+    def __init__(self, width=None, height=None, cell=settings.CELL):
+        """
+        Initialize the board.
+
+        Width & height are in "cells", cell size in pixels.
+        """
+        self.left = settings.BOARD_LEFT
+        self.bottom = settings.BOARD_BOTTOM
+        if width is None:
+            width = settings.BOARD_RIGHT - settings.BOARD_LEFT + 1
+        if height is None:
+            height = settings.BOARD_TOP - settings.BOARD_BOTTOM + 1
+        self.right = self.left + width - 1
+        self.top = self.bottom + height - 1
+        self.cell = cell
+
+    @property
+    def width(self):
+        """Get the board width in "cells"."""
+        return self.right - self.left + 1
+
+    @property
+    def height(self):
+        """Get the board height in "cells"."""
+        return self.top - self.bottom + 1
+
+    @property
+    def size(self):
+        """Get the number of cells on the board."""
+        return self.width * self.height
+
+    def contains(self, position):
+        """Check if a position is inside the board walls."""
+        return (self.left <= position[0] <= self.right and
+                self.bottom <= position[1] <= self.top)
+
+    def get_pixel_rect(self):
+        """
+        Get the board edges in pixels.
+
+        Return (left, bottom, right, top) in the same coordinates that
+        snake & food objects are drawn in.
+        """
+        return ((self.left - 1) * self.cell, (self.bottom - 1) * self.cell,
+                self.right * self.cell, self.top * self.cell)
+
+
+def parse_size(text):
+    """
+    Parse a board size, e.g. '1000x1000'.
+
+    Return (width, height) in "cells".
+    """
+    try:
+        width, height = (int(value) for value in text.lower().split('x'))
+    except ValueError:
+        raise ValueError('Board size should look like 1000x1000, not '
+                         '{!r}'.format(text))
+    check_size(width, height)
+    return width, height
+
+
+def check_size(width, height):
+    """Raise ValueError unless a board size in "cells" can be played."""
+    if width < 5 or height < 20:
+        raise ValueError('Boards must be at least 5x20 cells')
+    if width > MAX_SIDE or height > MAX_SIDE:
+        raise ValueError('Boards must be at most {0}x{0} cells'.format(
+            MAX_SIDE))
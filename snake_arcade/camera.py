@@ -0,0 +1,96 @@
+"""Snake Arcade camera for scrolling large game boards."""
+
+import pyglet.gl as gl
+
+import settings
+
+
+class Camera():
+    """
+    A view of the game board that follows the snake head.
+
+    Boards that fit the board area of the window are centred in it, so
+    the default board is drawn exactly where it always was. Larger
+    boards scroll to keep the head in the middle of the view, stopping
+    at the board edges.
+
+    Offsets are in pixels & are subtracted from board coordinates to get
+    screen coordinates.
+    """
+
+    def __init__(self, game_board, view=None):
+        """
+        Initialize the camera.
+
+        The view is the area of the window the board is drawn in, as
+        (left, bottom, right, top) in pixels.
+        """
+        self.board = game_board
+        if view is None:
+            view = (settings.CELL, settings.CELL,
+                    settings.WINDOW_WIDTH - settings.CELL,
+                    settings.WINDOW_HEIGHT - settings.CELL * 6)
+        self.view = view
+        world = game_board.get_pixel_rect()
+        # Scroll along an axis only when the board is larger than the view.
+        self.scrolls = (world[2] - world[0] > view[2] - view[0] or
+                        world[3] - world[1] > view[3] - view[1])
+        self.offset = (0, 0)
+        self.follow((game_board.left, game_board.bottom))
+
+    def get_axis_offset(self, head, world_min, world_max, view_min,
+                        view_max):
+        """Get the offset along one axis, in pixels."""
+        view_size = view_max - view_min
+        if world_max - world_min <= view_size:
+            return (world_min + world_max - view_min - view_max) // 2
+        # Centre the head in the view, without showing past the walls.
+        start = head - view_size // 2
+        start = max(world_min, min(start, world_max - view_size))
+        return round(start - view_min)
+
+    def follow(self, head_pos):
+        """Move the view to follow a snake head position in "cells"."""
+        cell = self.board.cell
+        world = self.board.get_pixel_rect()
+        self.offset = (
+            self.get_axis_offset((head_pos[0] - 0.5) * cell, world[0],
+                                 world[2], self.view[0], self.view[2]),
+            self.get_axis_offset((head_pos[1] - 0.5) * cell, world[1],
+                                 world[3], self.view[1], self.view[3]))
+
+    def get_view_rect(self, margin=0):
+        """
+        Get the part of the board in view, in board pixels.
+
+        Return (left, bottom, right, top), widened by a margin.
+        """
+        return (self.view[0] + self.offset[0] - margin,
+                self.view[1] + self.offset[1] - margin,
+                self.view[2] + self.offset[0] + margin,
+                self.view[3] + self.offset[1] + margin)
+
+    def is_visible(self, position):
+        """Check if any of a cell position in "cells" is in view."""
+        cell = self.board.cell
+        left, bottom, right, top = self.get_view_rect(cell / 2)
+        x = (position[0] - 0.5) * cell
+        y = (position[1] - 0.5) * cell
+        return left <= x <= right and bottom <= y <= top
+
+    def use(self):
+        """
+        Clip drawing to the view.
+
+        Only needed when the board scrolls, as objects near the view
+        edges would otherwise be drawn over the level walls.
+        """
+        if self.scrolls:
+            left, bottom, right, top = (int(edge) for edge in self.view)
+            gl.glEnable(gl.GL_SCISSOR_TEST)
+            gl.glScissor(left, bottom, right - left, top - bottom)
+
+    def release(self):
+        """Stop clipping drawing to the view."""
+        if self.scrolls:
+            gl.glDisable(gl.GL_SCISSOR_TEST)
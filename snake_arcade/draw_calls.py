@@ -0,0 +1,55 @@
+"""Snake Arcade draw call counter."""
+
+import pyglet.gl as gl
+
+# OpenGL functions that issue a draw call.
+DRAW_FUNCTIONS = ('glDrawArrays', 'glDrawArraysInstanced',
+                  'glDrawElements', 'glDrawElementsInstanced')
+
+
+class DrawCallCounter():
+    """
+    Count OpenGL draw calls made each frame.
+
+    Wrap the pyglet draw functions, which arcade & Snake Arcade look up
+    at call time, so every draw call is counted whatever issued it.
+    """
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.count = 0
+        self.last_frame = 0
+        self.originals = {}
+
+    def install(self):
+        """Start counting draw calls."""
+        for name in DRAW_FUNCTIONS:
+            if name not in self.originals and hasattr(gl, name):
+                self.originals[name] = getattr(gl, name)
+                setattr(gl, name, self.wrap(self.originals[name]))
+
+    def uninstall(self):
+        """Stop counting draw calls & restore the pyglet functions."""
+        for name, function in self.originals.items():
+            setattr(gl, name, function)
+        self.originals = {}
+
+    def wrap(self, function):
+        """Wrap a draw function so that each call is counted."""
+        def counted(*args):
+            self.count += 1
+            return function(*args)
+        return counted
+
+    def end_frame(self):
+        """
+        Finish counting draw calls for a frame.
+
+        Return the number of draw calls made during the frame.
+        """
+        self.last_frame = self.count
+        self.count = 0
+        return self.last_frame
+
+
+counter = DrawCallCounter()
@@ -0,0 +1,327 @@
+"""Snake Arcade headless game engine."""
+
+import collections
+import copy
+import itertools
+import random
+import struct
+
+import board
+import free_cells
+import modes
+import settings
+import states
+
+# Snapshot layout: a header, the random number generator state, the
+# body (head first) & the free cell index state as arrays of cells, then
+# the seed as a signed number of any size.
+# Header: mode, direction & desired direction, dead, won & death cause
+# codes, whether the free cell index state lists free cells, speed & its
+# bounds, board width, height & cell size, food position, growing,
+# ticks, food spawned & eaten, score & milestone checkpoint, then the
+# number of seed bytes, body & free cell index cells.
+SNAPSHOT = struct.Struct('<7B8H4I2q3I')
+# Mersenne Twister state: 624 words & the position in them.
+RNG_STATE = struct.Struct('<625I')
+MODES = tuple(states.GAME_MODES.values())
+DIRECTION_CODES = ('',) + tuple(states.DIRECTIONS)
+DEATH_CAUSES = (None, 'wall', 'body')
+# Food position when there is no food.
+NO_FOOD = (0xFFFF, 0xFFFF)
+
+
+class GameEngine():
+    """
+    Headless game rules.
+
+    Simulates one game of snake in whole game grid "cell" steps. Nothing
+    here draws or imports arcade, so games can run without a window or
+    an OpenGL context. The game window drives an engine & mirrors its
+    state with drawable snake & food objects.
+    """
+
+    def __init__(self, mode=states.GAME_MODES['normal'], seed=None,
+                 game_board=None):
+        """
+        Initialize the game engine.
+
+        Play on the default game board unless a Board is given.
+
+        Use a private random number generator so that engines never
+        share (or disturb) each other's food placement. Pick a seed when
+        none is given, so that every game can be replayed.
+        """
+        self.mode = mode
+        self.board = game_board if game_board is not None else board.Board()
+        if seed is None:
+            seed = random.randrange(2 ** 64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self, head_pos=None, direction='UP', speed=None):
+        """
+        Start a new game.
+
+        Place the snake in a random position unless a head position is
+        given, then spawn the first piece of food. The snake starts at
+        the speed set by the rules of the game mode unless one is given.
+        """
+        rules = modes.MODE_RULES[self.mode]
+        if head_pos is None:
+            head_pos = (self.get_random_board_coords(pad_left=2,
+                                                     pad_right=2)[0],
+                        self.get_random_board_coords(pad_bottom=5,
+                                                     pad_top=14)[1])
+        # Direction.
+        self.direction = direction
+        self.change_direction = ''
+        # Body segment positions (head first), in game grid "cells".
+        self.body = collections.deque(self.align(head_pos, direction))
+        # Number of body segments in each occupied position.
+        self.occupied = collections.Counter(self.body)
+        # Game board cells not covered by the snake, for spawning food.
+        self.free_cells = free_cells.create_index(self.board)
+        for position in self.body:
+            self.free_cells.remove(position)
+        # Number of steps left where the tail is kept to grow the body.
+        self.growing = 0
+        # Movement (in game "cells" per second).
+        self.speed = rules.start_speed if speed is None else speed
+        self.min_speed = rules.min_speed
+        self.max_speed = settings.MAX_SPEED
+        # Health status.
+        self.dead = False
+        self.death_cause = None
+        # Set once the snake covers the whole game board.
+        self.won = False
+        # Counters.
+        self.ticks = 0
+        self.food_spawned = 0
+        self.food_eaten = 0
+        self.score = rules.create_score()
+        # Eat food by the rules of the game mode.
+        self.eat_food = rules.compile_eat()
+        self.food_pos = None
+        self.spawn_food()
+
+    def snapshot(self):
+        """
+        Get the whole game state as compact bytes.
+
+        Everything that decides how the game plays on is kept, including
+        the random number generator & the order of the free cell index,
+        so a restored game spawns the same food. Cells are packed as
+        16 bit coordinates, which fit every board up to board.MAX_SIDE,
+        a few kilobytes on the default board.
+        """
+        listed_free, free = self.free_cells.get_state()
+        seed = self.seed.to_bytes(self.seed.bit_length() // 8 + 1,
+                                  'little', signed=True)
+        header = SNAPSHOT.pack(
+            MODES.index(self.mode), DIRECTION_CODES.index(self.direction),
+            DIRECTION_CODES.index(self.change_direction), self.dead,
+            self.won, DEATH_CAUSES.index(self.death_cause), listed_free,
+            self.speed, self.min_speed, self.max_speed, self.board.width,
+            self.board.height, self.board.cell,
+            *(self.food_pos or NO_FOOD), self.growing, self.ticks,
+            self.food_spawned, self.food_eaten, self.score.score,
+            self.score.milestone_checkpoint, len(seed), len(self.body),
+            len(free))
+        cells = struct.pack(
+            '<{}H'.format((len(self.body) + len(free)) * 2),
+            *itertools.chain.from_iterable(self.body),
+            *itertools.chain.from_iterable(free))
+        return b''.join((header, RNG_STATE.pack(*self.rng.getstate()[1]),
+                         cells, seed))
+
+    def restore(self, data):
+        """Replace the whole game state with a snapshot."""
+        (mode, direction, change_direction, dead, won, death_cause,
+         listed_free, self.speed, self.min_speed, self.max_speed, width,
+         height, cell, food_x, food_y, self.growing, self.ticks,
+         self.food_spawned, self.food_eaten, score, milestone_checkpoint,
+         seed_length, body_length, free_length) = SNAPSHOT.unpack_from(data)
+        self.mode = MODES[mode]
+        self.direction = DIRECTION_CODES[direction]
+        self.change_direction = DIRECTION_CODES[change_direction]
+        self.dead = bool(dead)
+        self.won = bool(won)
+        self.death_cause = DEATH_CAUSES[death_cause]
+        self.food_pos = (food_x, food_y) if (food_x, food_y) != NO_FOOD \
+            else None
+        if (self.board.width, self.board.height, self.board.cell) != \
+                (width, height, cell):
+            self.board = board.Board(width, height, cell)
+            self.free_cells = free_cells.create_index(self.board)
+        self.rng = random.Random()
+        self.rng.setstate((3, RNG_STATE.unpack_from(data, SNAPSHOT.size),
+                           None))
+        cells_format = '<{}H'.format((body_length + free_length) * 2)
+        cells = struct.unpack_from(cells_format, data,
+                                   SNAPSHOT.size + RNG_STATE.size)
+        cells = list(zip(cells[::2], cells[1::2]))
+        seed_start = (SNAPSHOT.size + RNG_STATE.size +
+                      struct.calcsize(cells_format))
+        self.seed = int.from_bytes(
+            data[seed_start:seed_start + seed_length], 'little', signed=True)
+        self.body = collections.deque(cells[:body_length])
+        self.occupied = collections.Counter(self.body)
+        self.free_cells.set_state(listed_free, cells[body_length:])
+        self.score = modes.MODE_RULES[self.mode].create_score()
+        self.eat_food = modes.MODE_RULES[self.mode].compile_eat()
+        self.score.score = score
+        self.score.milestone_checkpoint = milestone_checkpoint
+
+    def clone(self):
+        """
+        Get an independent copy of the game, e.g. to search ahead.
+
+        Copy the state in memory rather than through a snapshot, which
+        is many times faster. The copy shares only the board, which
+        never changes, & immutable values such as cells.
+        """
+        game_engine = copy.copy(self)
+        game_engine.body = self.body.copy()
+        game_engine.occupied = self.occupied.copy()
+        game_engine.free_cells = self.free_cells.copy()
+        game_engine.score = copy.copy(self.score)
+        game_engine.rng = random.Random(0)
+        game_engine.rng.setstate(self.rng.getstate())
+        return game_engine
+
+    def align(self, head_pos, direction):
+        """
+        Align a three segment snake along the axis it will travel.
+
+        Set the body to follow the direction of the head.
+        """
+        # '' indicates the snake is stationary, aligned as if moving left.
+        dx, dy = states.DIRECTIONS.get(direction, (-1, 0))
+        return [(head_pos[0] - (dx * i), head_pos[1] - (dy * i))
+                for i in range(3)]
+
+    @property
+    def head_pos(self):
+        """Get the position of the snake head."""
+        return self.body[0]
+
+    def set_direction(self):
+        """
+        Set the snake direction to the player's desired direction.
+
+        Disable opposing movements so that the snake cannot collide
+        with itself.
+        """
+        if self.change_direction in states.DIRECTIONS and \
+                self.direction != \
+                states.OPPOSITE_DIRECTIONS[self.change_direction]:
+            self.direction = self.change_direction
+
+    def step(self, action=None):
+        """
+        Advance the game by one game grid "cell".
+
+        Optionally take a new desired direction for the snake. Move the
+        snake, then check for collisions with walls, the snake's own
+        body & food in that order.
+
+        Return the outcome of the step (see states.STEP_OUTCOMES).
+        """
+        if self.dead:
+            return states.STEP_OUTCOMES['dead']
+        if self.won:
+            return states.STEP_OUTCOMES['won']
+        if action is not None:
+            self.change_direction = action
+        self.set_direction()
+        self.ticks += 1
+        # Move the head & let the body follow.
+        dx, dy = states.DIRECTIONS[self.direction]
+        head_pos = (self.body[0][0] + dx, self.body[0][1] + dy)
+        if self.growing:
+            self.growing -= 1
+        else:
+            # Stop growth by removing the last body segment (the "tail").
+            tail_pos = self.body.pop()
+            self.occupied[tail_pos] -= 1
+            if not self.occupied[tail_pos]:
+                del self.occupied[tail_pos]
+                self.free_cells.add(tail_pos)
+        # Check for collisions with border walls & the snake's own body.
+        # The head may safely move onto the tail.
+        if self.check_wall_collisions(head_pos):
+            self.dead = True
+            self.death_cause = 'wall'
+        elif self.occupied[head_pos] > (head_pos == self.body[-1]):
+            self.dead = True
+            self.death_cause = 'body'
+        self.body.appendleft(head_pos)
+        self.occupied[head_pos] += 1
+        self.free_cells.remove(head_pos)
+        if self.dead:
+            return states.STEP_OUTCOMES['dead']
+        # Grow the snake & advance the game state when food is eaten.
+        if head_pos == self.food_pos:
+            self.eat_food(self)
+            if self.won:
+                return states.STEP_OUTCOMES['won']
+            return states.STEP_OUTCOMES['ate']
+        return states.STEP_OUTCOMES['moved']
+
+    def check_wall_collisions(self, position):
+        """Check if a position is outside of the game board walls."""
+        return (position[0] < self.board.left or
+                position[0] > self.board.right or
+                position[1] > self.board.top or
+                position[1] < self.board.bottom)
+
+    def get_random_board_coords(self, pad_left=0, pad_right=0,
+                                pad_bottom=0, pad_top=0):
+        """
+        Get random coordinates on the game board.
+
+        Allow for padding from the game board edges.
+        """
+        x = self.rng.randint((self.board.left + pad_left),
+                             (self.board.right - pad_right))
+        y = self.rng.randint((self.board.bottom + pad_bottom),
+                             (self.board.top - pad_top))
+        return x, y
+
+    def spawn_food(self):
+        """
+        Spawn food on the game board in a random free position.
+
+        The game is won when the snake leaves no free position, in which
+        case no food is spawned & None is returned.
+        """
+        new_pos_xy = self.free_cells.choice(self.rng)
+        self.food_pos = new_pos_xy
+        if new_pos_xy is None:
+            self.won = True
+        else:
+            self.food_spawned += 1
+        return new_pos_xy
+
+    def increase_speed(self, increment):
+        """Increase the speed of the snake up to a maximum."""
+        if self.speed < self.max_speed:
+            if not self.speed + increment > self.max_speed:
+                self.speed = self.speed + increment
+            elif self.speed + increment > self.max_speed:
+                self.speed = self.max_speed
+
+    def decrease_speed(self, increment):
+        """Decrease the speed of the snake down to a minimum."""
+        if self.speed > self.min_speed:
+            if not self.speed - increment < self.min_speed:
+                self.speed = self.speed - increment
+            elif self.speed - increment < self.min_speed:
+                self.speed = self.min_speed
+
+    def raise_min_speed(self, increment):
+        """Raise the minimum speed of the snake."""
+        if self.min_speed < self.max_speed:
+            if not self.min_speed + increment > self.max_speed:
+                self.min_speed += increment
@@ -0,0 +1,180 @@
+"""Snake Arcade gameplay event stream."""
+
+import json
+import struct
+import threading
+import time
+
+import settings
+
+# Values recorded for each kind of event, in order. Theme events give the
+# theme's place in colours.themes & death events the cause's place in
+# engine.DEATH_CAUSES.
+EVENTS = {
+    'spawn': ('x', 'y'),
+    'eat': ('score', 'x', 'y'),
+    'milestone': ('score',),
+    'speed': ('speed', 'min_speed'),
+    'theme': ('theme',),
+    'pause': ('paused',),
+    'death': ('score', 'ticks', 'cause'),
+    'won': ('score', 'ticks')
+}
+
+# Event kinds, by event code.
+KINDS = tuple(EVENTS)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# Fixed size event record: time, event code & up to three values.
+RECORD = struct.Struct('<dBqqq')
+
+# Binary log header: magic bytes & format version.
+HEADER = struct.Struct('<4sB')
+MAGIC = b'SNEV'
+VERSION = 1
+
+
+def decode(batch):
+    """
+    Decode a batch of event records.
+
+    Return a list of dicts, each with the event time & kind followed by
+    its values.
+    """
+    decoded = []
+    for recorded, code, *values in RECORD.iter_unpack(batch):
+        kind = KINDS[code]
+        event = {'time': recorded, 'event': kind}
+        event.update(zip(EVENTS[kind], values))
+        decoded.append(event)
+    return decoded
+
+
+class EventLog():
+    """
+    Event stream subscriber saving events to a file.
+
+    Write JSON Lines for .jsonl files, otherwise a binary log of the raw
+    records after a short header.
+    """
+
+    def __init__(self, path):
+        """Open the log file, replacing any file at the path."""
+        self.binary = not path.endswith('.jsonl')
+        self.log_file = open(path, 'wb' if self.binary else 'w')
+        if self.binary:
+            self.log_file.write(HEADER.pack(MAGIC, VERSION))
+
+    def write(self, batch):
+        """Save a batch of event records."""
+        if self.binary:
+            self.log_file.write(batch)
+        else:
+            self.log_file.writelines(json.dumps(event) + '\n'
+                                     for event in decode(batch))
+
+    def close(self):
+        """Close the log file."""
+        self.log_file.close()
+
+
+class EventStream():
+    """
+    Stream of gameplay events to subscribers.
+
+    Events are packed into a ring buffer of fixed size records, allocated
+    up front, & a background thread hands them to the subscribers in
+    batches, so the game never waits on a file. While no subscriber is
+    attached, emitting an event only checks the subscriber list, cheap
+    enough to leave on all the time.
+
+    Events are emitted from one thread, the game's, for the game shown
+    in the window only: engines never emit events themselves, so replays
+    played back, computer players & the main menu snake stay out of the
+    stream. Events emitted while the buffer is full are dropped &
+    counted, rather than holding up a frame.
+    """
+
+    def __init__(self, capacity=settings.EVENT_BUFFER_SIZE):
+        """Initialize the stream with no subscribers."""
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        # Events emitted & events handed to subscribers, since the start.
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.subscribers = []
+        # Set to flush a batch before the flush interval is up.
+        self.ready = threading.Event()
+        self.stopping = False
+        self.thread = None
+
+    def subscribe(self, subscriber):
+        """
+        Attach a subscriber, starting the background writer if needed.
+
+        Subscribers have write(batch) & close() methods. Batches are
+        bytes of event records, see decode().
+        """
+        self.subscribers.append(subscriber)
+        if self.thread is None:
+            self.stopping = False
+            self.thread = threading.Thread(target=self.run, daemon=True,
+                                           name='events')
+            self.thread.start()
+
+    def emit(self, kind, *values):
+        """Record an event, if any subscriber is attached."""
+        if not self.subscribers:
+            return
+        pending = self.head - self.tail
+        if pending >= self.capacity:
+            self.dropped += 1
+            return
+        values += (0,) * (3 - len(values))
+        RECORD.pack_into(self.buffer,
+                         self.head % self.capacity * RECORD.size,
+                         time.time(), KIND_CODES[kind], *values)
+        # The record is written before the writer thread can see it.
+        self.head += 1
+        if pending + 1 == settings.EVENT_BATCH:
+            self.ready.set()
+
+    def run(self):
+        """Flush batches of events until the stream is closed."""
+        while not self.stopping:
+            self.ready.wait(settings.EVENT_FLUSH_INTERVAL)
+            self.ready.clear()
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Hand every event emitted so far to the subscribers."""
+        head = self.head
+        if head == self.tail:
+            return
+        start = self.tail % self.capacity * RECORD.size
+        end = head % self.capacity * RECORD.size
+        if start < end:
+            batch = bytes(self.buffer[start:end])
+        else:
+            # The events wrap around the end of the buffer.
+            batch = bytes(self.buffer[start:] + self.buffer[:end])
+        self.tail = head
+        for subscriber in self.subscribers:
+            subscriber.write(batch)
+
+    def close(self):
+        """Flush the remaining events & detach every subscriber."""
+        if self.thread is not None:
+            self.stopping = True
+            self.ready.set()
+            self.thread.join()
+            self.thread = None
+        for subscriber in self.subscribers:
+            subscriber.close()
+        self.subscribers = []
+
+
+# Shared by every part of the game raising events.
+stream = EventStream()
@@ -2,7 +2,7 @@
 
 import arcade
 
-import settings
+import perf
 
 
 class Food():
@@ -24,7 +24,7 @@ class Food():
         # Position. Coordinates/units are in game grid "cells".
         self.position = pos
         # Offset amount required to align food objects to the game grid.
-        self.offset = settings.CELL / 2
+        self.offset = self.size / 2
         # Prepare food for drawing.
         self.shape_list = self.create_food()
 
@@ -53,9 +53,14 @@ class Food():
 
     # *** BUFFERED DRAWING METHODS *** #
 
-    def get_food_points(self, position, width=settings.CELL,
-                        height=settings.CELL):
-        """Get a list of four vertices for a piece of food."""
+    def get_food_points(self, position, width=None, height=None):
+        """
+        Get a list of four vertices for a piece of food.
+
+        Default to the size of the food.
+        """
+        width = width or self.size
+        height = height or self.size
         food_points = arcade.get_rectangle_points(
             position[0],
             position[1],
@@ -64,9 +69,15 @@ class Food():
             )
         return food_points
 
-    def create_food_border(self, position, colour, width=settings.CELL,
-                           height=settings.CELL):
-        """Create the colour border for a piece of food."""
+    def create_food_border(self, position, colour, width=None,
+                           height=None):
+        """
+        Create the colour border for a piece of food.
+
+        Default to the size of the food.
+        """
+        width = width or self.size
+        height = height or self.size
         food_border = arcade.create_rectangle_outline(
             position[0],
             position[1],
@@ -98,6 +109,7 @@ class Food():
             )
         return food_fill
 
+    @perf.timed('Food.create_food')
     def create_food(self):
         """
         Create buffered shapes for the food objects.
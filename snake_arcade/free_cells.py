@@ -0,0 +1,244 @@
+"""Snake Arcade free game board cell index."""
+
+import copy
+
+# Largest board (in cells) indexed cell by cell. Larger boards are sampled.
+MAX_INDEXED_CELLS = 1 << 16
+
+# Random cells tried before falling back to the free cell list.
+MAX_SAMPLES = 64
+
+# Share of a large board covered before its free cells are listed, & the
+# share it must drop below before the list is dropped again. Sampling
+# rarely misses below DENSE_FILL.
+DENSE_FILL = 0.9
+SPARSE_FILL = 0.8
+
+
+def create_index(game_board):
+    """
+    Create an index of free cells suited to the size of a game board.
+
+    Every cell is indexed on boards up to MAX_INDEXED_CELLS, so food
+    spawns in constant time however full the board is. Larger boards
+    only store the covered cells, so memory follows the snake length
+    rather than the board size, until they are mostly covered.
+    """
+    edges = (game_board.left, game_board.bottom, game_board.right,
+             game_board.top)
+    if game_board.size <= MAX_INDEXED_CELLS:
+        return FreeCellIndex(*edges)
+    return SampledFreeCells(*edges)
+
+
+class FreeCellIndex():
+    """
+    Index of the game board cells not covered by a snake.
+
+    Free cells are kept in a list with a map from each cell to its place
+    in the list. Removing a cell swaps the last cell into its place, so
+    adding, removing & picking a random free cell all take constant time
+    however full the board is.
+    """
+
+    def __init__(self, left, bottom, right, top, covered=()):
+        """
+        Initialize the index with every cell on the game board free.
+
+        Board edges are inclusive & in game grid "cells". Any covered
+        cells given are left out.
+        """
+        self.cells = [(x, y) for x in range(left, right + 1)
+                      for y in range(bottom, top + 1)
+                      if (x, y) not in covered]
+        self.positions = {cell: i for i, cell in enumerate(self.cells)}
+
+    def __len__(self):
+        """Get the number of free cells."""
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        """Check if a cell is free."""
+        return cell in self.positions
+
+    def add(self, cell):
+        """Mark a cell as free."""
+        if cell not in self.positions:
+            self.positions[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def remove(self, cell):
+        """
+        Mark a cell as covered.
+
+        Ignore cells that are not free, such as cells outside the walls.
+        """
+        i = self.positions.pop(cell, None)
+        if i is not None:
+            last_cell = self.cells.pop()
+            if last_cell != cell:
+                self.cells[i] = last_cell
+                self.positions[last_cell] = i
+
+    def get_state(self):
+        """
+        Get the free cells, in index order.
+
+        The order decides which cell a random choice picks, so it is
+        kept to spawn the same food after a restore.
+
+        Return (True, cells), as the cells are free cells.
+        """
+        return True, self.cells
+
+    def set_state(self, listed_free, cells):
+        """Replace the free cells with cells from get_state."""
+        self.cells = list(cells)
+        self.positions = dict(zip(self.cells, range(len(self.cells))))
+
+    def copy(self):
+        """Get an independent copy of the index."""
+        index = copy.copy(self)
+        index.cells = self.cells.copy()
+        index.positions = self.positions.copy()
+        return index
+
+    def choice(self, rng):
+        """
+        Choose a random free cell.
+
+        Return None when the board is full.
+        """
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class SampledFreeCells():
+    """
+    Free cells of a large game board, found by random sampling.
+
+    The covered cells are stored, so memory follows the snake length
+    rather than the board size. Random cells are tried until a free one
+    is found, which takes a few tries while most of the board is free.
+    Once DENSE_FILL of the board is covered, the few free cells left are
+    listed in a FreeCellIndex, so food still spawns in constant time on
+    a nearly full board.
+
+    Has the same interface as FreeCellIndex.
+    """
+
+    def __init__(self, left, bottom, right, top):
+        """
+        Initialize with every cell on the game board free.
+
+        Board edges are inclusive & in game grid "cells".
+        """
+        self.left = left
+        self.bottom = bottom
+        self.right = right
+        self.top = top
+        self.size = (right - left + 1) * (top - bottom + 1)
+        self.covered = set()
+        # Free cells, listed only while the board is mostly covered.
+        self.free = None
+        self.dense_cells = int(self.size * DENSE_FILL)
+        self.sparse_cells = int(self.size * SPARSE_FILL)
+
+    def __len__(self):
+        """Get the number of free cells."""
+        return self.size - len(self.covered)
+
+    def __contains__(self, cell):
+        """Check if a cell is free."""
+        return self.is_on_board(cell) and cell not in self.covered
+
+    def is_on_board(self, cell):
+        """Check if a cell is inside the board edges."""
+        return (self.left <= cell[0] <= self.right and
+                self.bottom <= cell[1] <= self.top)
+
+    def add(self, cell):
+        """Mark a cell as free."""
+        if cell in self.covered:
+            self.covered.remove(cell)
+            if self.free is not None:
+                if len(self.covered) < self.sparse_cells:
+                    self.free = None
+                else:
+                    self.free.add(cell)
+
+    def remove(self, cell):
+        """
+        Mark a cell as covered.
+
+        Ignore cells outside the walls.
+        """
+        if self.is_on_board(cell) and cell not in self.covered:
+            self.covered.add(cell)
+            if self.free is not None:
+                self.free.remove(cell)
+            elif len(self.covered) >= self.dense_cells:
+                self.list_free_cells()
+
+    def list_free_cells(self):
+        """
+        List the free cells in a FreeCellIndex.
+
+        Search the whole board once, when it becomes mostly covered.
+        """
+        self.free = FreeCellIndex(self.left, self.bottom, self.right,
+                                  self.top, self.covered)
+
+    def get_state(self):
+        """
+        Get the state of the index.
+
+        Return (False, covered cells), sorted so equal states look the
+        same, or (True, free cells) in index order while the free cells
+        are listed, as their order decides which cell a random choice
+        picks.
+        """
+        if self.free is not None:
+            return self.free.get_state()
+        return False, sorted(self.covered)
+
+    def set_state(self, listed_free, cells):
+        """Replace the state of the index with a state from get_state."""
+        if listed_free:
+            free = set(cells)
+            self.covered = {(x, y) for x in range(self.left, self.right + 1)
+                            for y in range(self.bottom, self.top + 1)
+                            if (x, y) not in free}
+            self.list_free_cells()
+            self.free.set_state(True, cells)
+        else:
+            self.free = None
+            self.covered = set(cells)
+
+    def copy(self):
+        """Get an independent copy of the index."""
+        index = copy.copy(self)
+        index.covered = self.covered.copy()
+        if self.free is not None:
+            index.free = self.free.copy()
+        return index
+
+    def choice(self, rng):
+        """
+        Choose a random free cell.
+
+        Return None when the board is full.
+        """
+        if self.free is not None:
+            return self.free.choice(rng)
+        if not len(self):
+            return None
+        for attempt in range(MAX_SAMPLES):
+            cell = (rng.randint(self.left, self.right),
+                    rng.randint(self.bottom, self.top))
+            if cell not in self.covered:
+                return cell
+        # Sampling missed on a board just short of DENSE_FILL.
+        self.list_free_cells()
+        return self.free.choice(rng)
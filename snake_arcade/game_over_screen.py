@@ -4,6 +4,7 @@ import arcade
 
 import level_screen
 import settings
+import text_cache
 
 
 class GameOverScreen(level_screen.LevelScreen):
@@ -30,7 +31,7 @@ class GameOverScreen(level_screen.LevelScreen):
         self.fg_col = theme['fg']
         self.game_over_text_col = theme['game_over']
         self.small_text_col = theme['food']
-        self.shape_list = self.create_shapes()
+        self.background = self.create_background(theme)
 
     def create_message_box(self, colour):
         """
@@ -106,18 +107,24 @@ class GameOverScreen(level_screen.LevelScreen):
 
     def draw_game_over(self, colour):
         """Draw text for the game over message."""
-        arcade.draw_text('GAME', 100, 350, colour,
-                         96, font_name=self.font)
-        arcade.draw_text('OVER', 111, 287, colour,
-                         96, font_name=self.font)
+        text_cache.draw_text('GAME', 100, 350, colour,
+                             96, font_name=self.font)
+        text_cache.draw_text('OVER', 111, 287, colour,
+                             96, font_name=self.font)
 
     def draw_restart(self, colour):
         """Draw text for the restart option."""
-        arcade.draw_text('RESTART Y/N?', 118, 255, colour,
-                         32, font_name=self.font)
+        text_cache.draw_text('RESTART Y/N?', 118, 255, colour,
+                             32, font_name=self.font)
 
-    def draw(self):
+    def draw_best_score(self, colour, best_score):
+        """Draw text for the best score of the game mode."""
+        text_cache.draw_text('BEST ' + str(best_score).zfill(6), 136, 196,
+                             colour, 24, font_name=self.font)
+
+    def draw(self, best_score=0):
         """Draw all the game over screen objects."""
-        self.shape_list.draw()
+        self.background.draw()
         self.draw_game_over(self.game_over_text_col)
         self.draw_restart(self.small_text_col)
+        self.draw_best_score(self.small_text_col, best_score)
@@ -0,0 +1,78 @@
+"""Snake Arcade buffered player input."""
+
+import collections
+import time
+
+import perf
+import settings
+import states
+
+
+class InputQueue():
+    """
+    Buffered turns for one player.
+
+    Turns are queued as they arrive & taken one per engine step, so two
+    quick turns between steps both happen, on consecutive steps, rather
+    than the second replacing the first. Turns that would not change
+    the direction left by the turns already queued are dropped as they
+    arrive, & at most max_turns are kept, so held or mashed keys don't
+    queue moves far ahead.
+
+    Each turn is timed from arriving to the step that takes it, for
+    input to move latency percentiles.
+    """
+
+    def __init__(self, max_turns=settings.MAX_QUEUED_TURNS):
+        """Initialize an empty queue."""
+        self.max_turns = max_turns
+        # Directions & the times they arrived, oldest first.
+        self.turns = collections.deque()
+        # Recent input to move latencies, in seconds.
+        self.latencies = collections.deque(maxlen=perf.HISTORY)
+
+    def __len__(self):
+        """Get the number of turns queued."""
+        return len(self.turns)
+
+    def clear(self):
+        """Drop every queued turn, e.g. for a new game."""
+        self.turns.clear()
+
+    def push(self, direction, current_direction, now=None):
+        """
+        Queue a turn, given the direction the snake is travelling.
+
+        Return True if the turn was queued.
+        """
+        last = self.turns[-1][0] if self.turns else current_direction
+        if direction == last or \
+                direction == states.OPPOSITE_DIRECTIONS.get(last) or \
+                len(self.turns) >= self.max_turns:
+            return False
+        if now is None:
+            now = time.perf_counter()
+        self.turns.append((direction, now))
+        return True
+
+    def pop(self, now=None):
+        """
+        Take the next turn for the coming step.
+
+        Return its direction, or None when no turn is queued.
+        """
+        if not self.turns:
+            return None
+        direction, arrived = self.turns.popleft()
+        if now is None:
+            now = time.perf_counter()
+        self.latencies.append(now - arrived)
+        return direction
+
+    def get_summary(self):
+        """Get a line of text summarising recent input latencies."""
+        ordered = sorted(self.latencies)
+        return 'Input p50 {:.1f} p95 {:.1f} p99 {:.1f} ms'.format(
+            perf.get_percentile(ordered, 50) * 1000,
+            perf.get_percentile(ordered, 95) * 1000,
+            perf.get_percentile(ordered, 99) * 1000)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+"""Snake Arcade high score leaderboards."""
+
+import heapq
+import os
+import struct
+import sys
+import time
+
+import settings
+import states
+
+# File of the leaderboards kept by the game, next to the replays directory.
+LEADERBOARD_FILE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'leaderboard.dat')
+
+# File header: magic bytes & format version.
+HEADER = struct.Struct('<4sB')
+MAGIC = b'SNLB'
+VERSION = 1
+
+# Fixed size score record: game mode, player name, score, ticks survived,
+# game seed & time played.
+RECORD = struct.Struct('<B12sqIQd')
+
+# Game modes, by their number in records.
+MODES = tuple(states.GAME_MODES.values())
+
+# Records the file may hold, as a multiple of the scores kept, before it
+# is compacted down to the scores kept.
+COMPACT_FACTOR = 4
+
+
+class Leaderboard():
+    """
+    Top scores for each game mode, kept in a file of fixed size records.
+
+    Only the best size scores of each mode are kept, in a min-heap per
+    mode, so a new score is checked against the lowest kept score in
+    constant time & added in O(log K). Scores that make a leaderboard are
+    queued as they are added & appended to the file by save(). Once the
+    file holds COMPACT_FACTOR times the records kept it is rewritten with
+    just the kept scores, oldest first, to a temporary file that then
+    replaces it, so the file stays small however many games are recorded
+    & is never left half written. Given an executor, e.g. a one thread
+    concurrent.futures.ThreadPoolExecutor, the file is written by it from
+    a copy of the records, so the game never waits on the disk. Records
+    cut short by a crash part way through an append are ignored when
+    loading, & a file that is not a leaderboard is moved aside so the
+    game starts with empty leaderboards.
+
+    Sorted leaderboards are cached until they change, so drawing them
+    each frame never sorts or touches the file.
+    """
+
+    def __init__(self, path=None, size=settings.LEADERBOARD_SIZE,
+                 executor=None):
+        """
+        Initialize the leaderboards, loading them from a file if given.
+
+        Without a file the leaderboards are only kept in memory. Without
+        an executor the file is written straight away.
+        """
+        self.path = path
+        self.size = size
+        self.executor = executor
+        # Min-heaps of (score, order, record), lowest score first. Earlier
+        # records rank above later ones with the same score.
+        self.heaps = {mode: [] for mode in MODES}
+        # Sorted leaderboards by game mode, built when first read.
+        self.tops = {}
+        # Records added so far, & records in the file.
+        self.order = 0
+        self.records = 0
+        # Packed records waiting to be appended to the file.
+        self.pending = []
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """
+        Load the leaderboards from the file.
+
+        Compact the file when it holds more records than needed. Move a
+        file with a bad header or records aside, to the same path ending
+        in .bad, & start with empty leaderboards.
+        """
+        with open(self.path, 'rb') as leaderboard_file:
+            data = leaderboard_file.read()
+        # Leave out a record cut short by an interrupted append.
+        count = max(0, len(data) - HEADER.size) // RECORD.size
+        end = HEADER.size + count * RECORD.size
+        records = list(RECORD.iter_unpack(
+            memoryview(data)[HEADER.size:end])) if count else []
+        if len(data) < HEADER.size or \
+                HEADER.unpack_from(data) != (MAGIC, VERSION) or \
+                any(record[0] >= len(MODES) for record in records):
+            os.replace(self.path, self.path + '.bad')
+            print('{} is not a leaderboard file, moved to {}.bad'.format(
+                self.path, self.path), file=sys.stderr)
+            return
+        for record in records:
+            self.push(record)
+        self.records = count
+        if end < len(data) or count > self.get_file_capacity():
+            self.compact()
+
+    def get_file_capacity(self):
+        """Get the number of records the file may hold before compacting."""
+        return self.size * len(MODES) * COMPACT_FACTOR
+
+    def push(self, record):
+        """
+        Keep a record in memory if its score makes its leaderboard.
+
+        Return True if it was kept.
+        """
+        heap = self.heaps[MODES[record[0]]]
+        # Later records sort lower on ties, so they are dropped first.
+        self.order += 1
+        item = (record[2], -self.order, record)
+        if len(heap) < self.size:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+        else:
+            return False
+        self.tops.pop(MODES[record[0]], None)
+        return True
+
+    def add(self, mode, name, score, ticks=0, seed=0, played=None):
+        """
+        Add the score of a finished game.
+
+        The player name is cut to fit the record. Scores that make the
+        leaderboard for the game mode are queued to be saved to the file.
+        Raise ValueError, leaving the leaderboards unchanged, if a value
+        does not fit the record, e.g. a negative seed.
+
+        Return True if the score made the leaderboard.
+        """
+        if played is None:
+            played = time.time()
+        record = (MODES.index(mode), name.encode()[:12], score, ticks, seed,
+                  played)
+        try:
+            packed = RECORD.pack(*record)
+        except struct.error as error:
+            raise ValueError('score does not fit a leaderboard record: '
+                             '{}'.format(error))
+        if not self.push(record):
+            return False
+        if self.path is not None:
+            self.pending.append(packed)
+        return True
+
+    def save(self):
+        """Append the queued records to the file, compacting it once full."""
+        if not self.pending:
+            return
+        if self.records + len(self.pending) > self.get_file_capacity():
+            self.compact()
+            return
+        self.records += len(self.pending)
+        self.submit(self.append_records, self.pending)
+        self.pending = []
+
+    def compact(self):
+        """Rewrite the file with only the records kept."""
+        items = [item for mode in MODES for item in self.heaps[mode]]
+        self.records = len(items)
+        self.pending = []
+        self.submit(self.write_records, items)
+
+    def submit(self, write, *args):
+        """Write to the file with the executor, or straight away."""
+        if self.executor is None:
+            write(*args)
+        else:
+            self.executor.submit(write, *args).add_done_callback(
+                report_error)
+
+    def append_records(self, packed):
+        """Append packed records to the file."""
+        with open(self.path, 'ab') as leaderboard_file:
+            if leaderboard_file.tell() == 0:
+                leaderboard_file.write(HEADER.pack(MAGIC, VERSION))
+            leaderboard_file.write(b''.join(packed))
+
+    def write_records(self, items):
+        """
+        Atomically replace the file with the records of heap items.
+
+        Records are written in the order they were added, so ties rank
+        the same once the file is loaded again.
+        """
+        items = sorted(items, key=lambda item: item[1], reverse=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as leaderboard_file:
+            leaderboard_file.write(HEADER.pack(MAGIC, VERSION))
+            leaderboard_file.write(b''.join(
+                RECORD.pack(*item[2]) for item in items))
+            leaderboard_file.flush()
+            os.fsync(leaderboard_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        """Save the queued records & wait for the file to be written."""
+        self.save()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def get_top(self, mode):
+        """
+        Get the leaderboard for a game mode, best score first.
+
+        Return a list of (name, score, ticks, seed, time played) tuples.
+        """
+        top = self.tops.get(mode)
+        if top is None:
+            top = [(record[1].rstrip(b'\0').decode(errors='replace'),
+                    record[2], record[3], record[4], record[5])
+                   for score, order, record in sorted(self.heaps[mode],
+                                                      reverse=True)]
+            self.tops[mode] = top
+        return top
+
+    def get_best(self, mode):
+        """Get the best score for a game mode, or 0 before any games."""
+        top = self.get_top(mode)
+        return top[0][1] if top else 0
+
+
+def report_error(future):
+    """Report a failed write to the leaderboard file."""
+    error = future.exception()
+    if error is not None:
+        print('Could not save the leaderboard: {}'.format(error),
+              file=sys.stderr)
+
+
+def main():
+    """Print the leaderboards in a file."""
+    path = sys.argv[1] if len(sys.argv) > 1 else LEADERBOARD_FILE
+    leaderboard = Leaderboard(path)
+    for mode in MODES:
+        print(mode.upper())
+        for rank, (name, score, ticks, seed, played) in enumerate(
+                leaderboard.get_top(mode), 1):
+            print('{:>3} {:>8} {:<12} {:>8} ticks  seed {:016x}  {}'.format(
+                rank, score, name, ticks, seed, time.strftime(
+                    '%Y-%m-%d %H:%M', time.localtime(played))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
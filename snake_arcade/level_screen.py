@@ -2,7 +2,10 @@
 
 import arcade
 
+import perf
 import settings
+import static_layer
+import text_cache
 
 
 class LevelScreen():
@@ -24,8 +27,11 @@ class LevelScreen():
         self.score_num_col = theme['score_num']
         # Font.
         self.font = 'prolamina_2_update'
-        # Level elements for drawing.
-        self.shape_list = self.create_shapes()
+        # Score text, laid out again only when the score changes.
+        self.score_label = None
+        self.score_label_key = None
+        # Level elements for drawing, rendered once into a cached layer.
+        self.background = self.create_background(theme)
 
     def update_theme(self, theme):
         """
@@ -39,7 +45,7 @@ class LevelScreen():
         self.scoreboard_col = theme['scoreboard']
         self.score_text_col = theme['score_text']
         self.score_num_col = theme['score_num']
-        self.shape_list = self.create_shapes()
+        self.background = self.create_background(theme)
 
     def create_border_wall(self, colour):
         """
@@ -178,18 +184,40 @@ class LevelScreen():
         shape_list.append(game_board_outline)
         return shape_list
 
+    @perf.startup.timed('backgrounds')
+    def create_background(self, theme):
+        """
+        Render the static shapes into a layer shared by this screen layout.
+
+        The shapes are only created & rendered again when the theme of
+        the shared layer changes.
+
+        Return a StaticLayer that can be drawn in a single call.
+        """
+        background = static_layer.get_layer(type(self).__name__)
+        background.update(theme, self.create_shapes)
+        return background
+
     def draw_score_text(self, colour):
         """Draw text for the score label."""
-        arcade.draw_text('SCORE:', 49.6, 564, colour,
-                         58, font_name=self.font)
+        text_cache.draw_text('SCORE:', 49.6, 564, colour,
+                             58, font_name=self.font)
 
     def draw_score_num(self, score, colour):
-        """Draw text for the score."""
-        arcade.draw_text(score, 200, 564, colour,
-                         58, font_name=self.font)
+        """
+        Draw text for the score.
+
+        Only look up the score text when the score or colour changes.
+        """
+        if (score, colour) != self.score_label_key:
+            self.score_label = text_cache.cache.get_label(
+                score, self.font, 58, colour)
+            self.score_label_key = (score, colour)
+        self.score_label.draw(200, 564)
 
+    @perf.timed('LevelScreen.draw')
     def draw(self, score):
         """Draw all the level objects."""
-        self.shape_list.draw()
+        self.background.draw()
         self.draw_score_text(self.score_text_col)
         self.draw_score_num(score, self.score_num_col)
@@ -4,6 +4,19 @@ import arcade
 
 import level_screen
 import settings
+import states
+import text_cache
+import track
+
+# Track the snake loops clockwise around the title, from its corners.
+TITLE_TRACK = track.Track(((4, 27), (4, 37), (22, 37), (22, 27)))
+
+# Left edge of the game mode text, centring it for each mode name.
+MODE_TEXT_X = {
+    states.GAME_MODES['easy']: 108,
+    states.GAME_MODES['normal']: 96,
+    states.GAME_MODES['hard']: 108
+}
 
 
 class MainMenuScreen(level_screen.LevelScreen):
@@ -17,8 +30,7 @@ class MainMenuScreen(level_screen.LevelScreen):
     def __init__(self, theme):
         """Initialize the main menu screen."""
         super().__init__(theme)
-        # Rectangular coords offset around title (top_l, top_r, bot_r, bot_l).
-        self.snake_track = ((4, 36), (21, 37), (22, 28), (5, 27))
+        self.snake_track = TITLE_TRACK
         # Colours.
         self.letter_s_col = theme['S']
         self.letter_n_col = theme['N']
@@ -45,7 +57,7 @@ class MainMenuScreen(level_screen.LevelScreen):
         self.letter_e_col = theme['E']
         self.arcade = theme['arcade']
         self.small_text_col = theme['small_text']
-        self.shape_list = self.create_shapes()
+        self.background = self.create_background(theme)
 
     def create_menu_board(self, colour):
         """
@@ -101,48 +113,57 @@ class MainMenuScreen(level_screen.LevelScreen):
 
     def draw_title(self, col_s, col_n, col_a, col_k, col_e, col_arc):
         """Draw text for the game title."""
-        arcade.draw_text('S', 76, 487, col_s,
-                         108, font_name=self.font)
-        arcade.draw_text('N', 126, 487, col_n,
-                         108, font_name=self.font)
-        arcade.draw_text('A', 176, 487, col_a,
-                         108, font_name=self.font)
-        arcade.draw_text('K', 226, 487, col_k,
-                         108, font_name=self.font)
-        arcade.draw_text('E', 276, 487, col_e,
-                         108, font_name=self.font)
-        arcade.draw_text('arcade', 108, 443, col_arc,
-                         70, font_name=self.font)
+        text_cache.draw_text('S', 76, 487, col_s,
+                             108, font_name=self.font)
+        text_cache.draw_text('N', 126, 487, col_n,
+                             108, font_name=self.font)
+        text_cache.draw_text('A', 176, 487, col_a,
+                             108, font_name=self.font)
+        text_cache.draw_text('K', 226, 487, col_k,
+                             108, font_name=self.font)
+        text_cache.draw_text('E', 276, 487, col_e,
+                             108, font_name=self.font)
+        text_cache.draw_text('arcade', 108, 443, col_arc,
+                             70, font_name=self.font)
 
     def draw_instructions(self, colour):
         """Draw text for the game instructions."""
-        arcade.draw_text('Eat the food!', 123, 335, colour,
-                         32, font_name=self.font)
+        text_cache.draw_text('Eat the food!', 123, 335, colour,
+                             32, font_name=self.font)
 
     def draw_controls(self, colour):
         """Draw text for the game controls."""
-        arcade.draw_text('[ENTER] Start', 139, 265, colour,
-                         24, font_name=self.font)
-        arcade.draw_text('[ARROWS] Turn', 131, 235, colour,
-                         24, font_name=self.font)
-        arcade.draw_text('[S] Speed Up', 140, 205, colour,
-                         24, font_name=self.font)
-        arcade.draw_text('[D] Speed Down', 128, 175, colour,
-                         24, font_name=self.font)
-        arcade.draw_text('[T] Theme', 152, 145, colour,
-                         24, font_name=self.font)
+        text_cache.draw_text('[ENTER] Start', 139, 265, colour,
+                             24, font_name=self.font)
+        text_cache.draw_text('[ARROWS] Turn', 131, 235, colour,
+                             24, font_name=self.font)
+        text_cache.draw_text('[S] Speed Up', 140, 205, colour,
+                             24, font_name=self.font)
+        text_cache.draw_text('[D] Speed Down', 128, 175, colour,
+                             24, font_name=self.font)
+        text_cache.draw_text('[T] Theme', 152, 145, colour,
+                             24, font_name=self.font)
+        text_cache.draw_text('[M] Mode', 156, 115, colour,
+                             24, font_name=self.font)
 
     def draw_version_num(self, colour):
         """Draw text for the game version number."""
-        arcade.draw_text(settings.VERSION, 178, 65, colour,
-                         18, font_name=self.font)
+        text_cache.draw_text(settings.VERSION, 178, 65, colour,
+                             18, font_name=self.font)
+
+    def draw_mode(self, colour, mode, best_score):
+        """Draw text for the game mode & its best score."""
+        text = '{} BEST {}'.format(mode.upper(), str(best_score).zfill(6))
+        text_cache.draw_text(text, MODE_TEXT_X[mode], 85, colour, 24,
+                             font_name=self.font)
 
-    def draw(self):
+    def draw(self, mode, best_score=0):
         """Draw all the main menu objects."""
-        self.shape_list.draw()
+        self.background.draw()
         self.draw_title(self.letter_s_col, self.letter_n_col,
                         self.letter_a_col, self.letter_k_col,
                         self.letter_e_col, self.arcade)
         self.draw_instructions(self.letter_s_col)
         self.draw_controls(self.small_text_col)
+        self.draw_mode(self.letter_s_col, mode, best_score)
         self.draw_version_num(self.small_text_col)
@@ -0,0 +1,77 @@
+"""Snake Arcade game mode rules."""
+
+import scoring
+import states
+
+
+class Rules():
+    """
+    Rules of a game mode.
+
+    Rules are compiled into the function an engine calls when the snake
+    eats, once at the start of each game, so engines never look up or
+    compare the mode as they step.
+    """
+
+    def __init__(self, mode, start_speed, min_speed, milestone_speed,
+                 food_points, milestone_amount):
+        """
+        Initialize the rules of a game mode.
+
+        Speeds are in game grid "cells" per second. Each piece of food
+        is worth food_points & every milestone_amount points is a
+        milestone score, or there are no milestones if it is None. The
+        snake speeds up & its minimum speed rises by milestone_speed at
+        each milestone score.
+        """
+        self.mode = mode
+        self.start_speed = start_speed
+        self.min_speed = min_speed
+        self.milestone_speed = milestone_speed
+        self.food_points = food_points
+        self.milestone_amount = milestone_amount
+
+    def create_score(self):
+        """Create the scoring system for a game in this mode."""
+        return scoring.Score(self.food_points, self.milestone_amount)
+
+    def compile_eat(self):
+        """
+        Compile the rules for eating food.
+
+        Return a function that eats the food under the snake head of a
+        GameEngine: it grows the snake, updates the score, speeds up on
+        milestone scores (in modes with milestones) & spawns the next
+        piece of food.
+        """
+        if self.milestone_amount is None or not self.milestone_speed:
+            def eat(game_engine):
+                game_engine.growing += 1
+                game_engine.food_eaten += 1
+                game_engine.score.add_food_points()
+                game_engine.spawn_food()
+            return eat
+        increment = self.milestone_speed
+
+        def eat_with_milestones(game_engine):
+            game_engine.growing += 1
+            game_engine.food_eaten += 1
+            game_engine.score.add_food_points()
+            # Increase snake speed (if below max) if a milestone is reached.
+            if game_engine.score.check_milestone():
+                game_engine.increase_speed(increment)
+                game_engine.raise_min_speed(increment)
+            game_engine.spawn_food()
+        return eat_with_milestones
+
+
+# Rules for each game mode. Every mode starts at the same speed; the
+# modes score food differently & only normal & hard games have milestones.
+MODE_RULES = {
+    states.GAME_MODES['easy']: Rules(states.GAME_MODES['easy'], 6, 6, 1,
+                                     50, None),
+    states.GAME_MODES['normal']: Rules(states.GAME_MODES['normal'], 6, 6, 1,
+                                       100, 500),
+    states.GAME_MODES['hard']: Rules(states.GAME_MODES['hard'], 6, 6, 1,
+                                     200, 600)
+}
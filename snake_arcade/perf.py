@@ -0,0 +1,190 @@
+"""Snake Arcade frame & startup timing & performance HUD."""
+
+import collections
+import csv
+import functools
+import json
+import time
+
+import settings
+
+# Timed sections, in the order they are shown & exported.
+SECTIONS = ('update', 'on_draw', 'Snake.create_snake', 'Food.create_food',
+            'LevelScreen.draw')
+
+# Values logged for each frame.
+COLUMNS = (['frame', 'time', 'frame_ms'] +
+           ['{}_ms'.format(section) for section in SECTIONS] +
+           ['snake_length', 'theme'])
+
+# Number of recent frames used for frame rate & percentiles.
+HISTORY = 240
+
+
+def timed(section):
+    """
+    Time every call of a function as a section of the frame.
+
+    The cost is two clock reads & one addition per call, cheap enough
+    to leave on all the time.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.sections[section] += time.perf_counter() - start
+        return wrapper
+    return decorator
+
+
+def get_percentile(ordered, percent):
+    """Get a percentile from a sorted list of values."""
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+
+class Profiler():
+    """
+    Per-frame timings for hot game paths.
+
+    Sections add up their time over a frame. Each frame is then kept for
+    the HUD & optionally streamed to a log file, along with the snake
+    length & theme, to tie slow frames to what the game was doing.
+    """
+
+    def __init__(self):
+        """Initialize the profiler with no frames recorded."""
+        self.sections = dict.fromkeys(SECTIONS, 0)
+        self.last_sections = dict(self.sections)
+        self.frame_times = collections.deque(maxlen=HISTORY)
+        self.frames = 0
+        self.start_time = time.perf_counter()
+        self.frame_start = self.start_time
+        self.log_file = None
+        self.writer = None
+
+    def open_log(self, path):
+        """
+        Stream frame timings to a file.
+
+        Write JSON Lines for .jsonl files, otherwise CSV.
+        """
+        self.close_log()
+        self.log_file = open(path, 'w', newline='')
+        if path.endswith('.jsonl'):
+            self.writer = None
+        else:
+            self.writer = csv.writer(self.log_file)
+            self.writer.writerow(COLUMNS)
+
+    def close_log(self):
+        """Stop streaming frame timings."""
+        if self.log_file is not None:
+            self.log_file.close()
+        self.log_file = None
+        self.writer = None
+
+    def end_frame(self, snake_length, theme):
+        """
+        Finish timing a frame.
+
+        Keep the frame time, log the frame & reset the section timers.
+        """
+        now = time.perf_counter()
+        frame_time = now - self.frame_start
+        self.frame_start = now
+        self.frames += 1
+        self.frame_times.append(frame_time)
+        if self.log_file is not None:
+            row = ([self.frames, round(now - self.start_time, 6),
+                    round(frame_time * 1000, 3)] +
+                   [round(self.sections[section] * 1000, 3)
+                    for section in SECTIONS] +
+                   [snake_length, theme])
+            if self.writer is not None:
+                self.writer.writerow(row)
+            else:
+                self.log_file.write(
+                    json.dumps(dict(zip(COLUMNS, row))) + '\n')
+        self.last_sections = self.sections
+        self.sections = dict.fromkeys(SECTIONS, 0)
+
+    def get_summary(self):
+        """
+        Get lines of text summarising recent frames.
+
+        Show the frame rate, frame time percentiles & the time spent in
+        each section during the last frame.
+        """
+        ordered = sorted(self.frame_times)
+        total = sum(ordered)
+        fps = len(ordered) / total if total else 0
+        lines = ['FPS {:.0f} (target {})'.format(fps, settings.FPS),
+                 'Frame p50 {:.1f} p95 {:.1f} p99 {:.1f} ms'.format(
+                     get_percentile(ordered, 50) * 1000,
+                     get_percentile(ordered, 95) * 1000,
+                     get_percentile(ordered, 99) * 1000)]
+        for section in SECTIONS:
+            lines.append('{} {:.2f} ms'.format(
+                section, self.last_sections[section] * 1000))
+        return lines
+
+
+# Shared by every timed function.
+profiler = Profiler()
+
+
+class StartupProfile():
+    """
+    Time spent starting the game, up to the first main menu frame.
+
+    Stages run one after another & are timed between marks. Work spread
+    over several stages, such as loading fonts, is also added up apart.
+    """
+
+    def __init__(self):
+        """Initialize an empty profile."""
+        self.last = None
+        self.stages = collections.OrderedDict()
+        self.parts = collections.Counter()
+
+    def begin(self, start):
+        """Start profiling from a perf_counter() time, e.g. process start."""
+        self.last = start
+
+    def mark(self, stage):
+        """End a stage, timed from the last mark."""
+        now = time.perf_counter()
+        self.stages[stage] = now - self.last
+        self.last = now
+
+    def timed(self, part):
+        """Time every call of a function as a part of the startup."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.parts[part] += time.perf_counter() - start
+            return wrapper
+        return decorator
+
+    def get_report(self):
+        """Get lines of text breaking down the startup time."""
+        lines = ['{:16} {:8.1f} ms'.format(stage, seconds * 1000)
+                 for stage, seconds in self.stages.items()]
+        lines.append('{:16} {:8.1f} ms'.format(
+            'total', sum(self.stages.values()) * 1000))
+        lines.extend('  {:14} {:8.1f} ms'.format(part, seconds * 1000)
+                     for part, seconds in sorted(self.parts.items()))
+        return lines
+
+
+# Shared by every part of the startup.
+startup = StartupProfile()
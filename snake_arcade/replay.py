@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+"""Snake Arcade game replays."""
+
+import struct
+import sys
+
+import board
+import engine
+import states
+
+# Player inputs that can be recorded, by input code.
+INPUTS = ('UP', 'DOWN', 'LEFT', 'RIGHT', 'FASTER', 'SLOWER')
+MODES = tuple(states.GAME_MODES.values())
+
+# Replay file layout: a header, then one record per input.
+MAGIC = b'SNRP'
+VERSION = 2
+# Magic, version, mode, seed, board width & height, number of inputs,
+# final ticks, final score.
+HEADER = struct.Struct('<4sBBQIIIIq')
+# Tick (engine steps taken before the input) & input code.
+INPUT = struct.Struct('<IB')
+
+
+def apply_input(game_engine, action):
+    """Apply a player input to a game engine."""
+    if action in states.DIRECTIONS:
+        game_engine.change_direction = action
+    elif action == 'FASTER':
+        game_engine.increase_speed(1)
+    elif action == 'SLOWER':
+        game_engine.decrease_speed(1)
+
+
+class Replay():
+    """
+    A recording of one game.
+
+    Engines are seeded, so a game is reproduced from its mode, seed,
+    board size & player inputs. Each input is stamped with the number of engine
+    steps (ticks) taken before it arrived, so replays do not depend on
+    frame timing.
+    """
+
+    def __init__(self, mode, seed, inputs=None, ticks=0, score=0,
+                 board_size=None):
+        """
+        Initialize a replay, empty unless inputs are given.
+
+        Games are played on the default board unless a board size
+        (width, height) in "cells" is given.
+        """
+        self.mode = mode
+        self.seed = seed
+        if board_size is None:
+            default_board = board.Board()
+            board_size = (default_board.width, default_board.height)
+        self.board_size = tuple(board_size)
+        # (tick, input code) pairs, in the order they arrived.
+        self.inputs = inputs if inputs is not None else []
+        # Result of the game, for checking the replay reproduces it.
+        self.ticks = ticks
+        self.score = score
+
+    def __len__(self):
+        """Get the number of recorded inputs."""
+        return len(self.inputs)
+
+    def record(self, tick, action):
+        """Record a player input at an engine tick."""
+        self.inputs.append((tick, INPUTS.index(action)))
+
+    def finish(self, game_engine):
+        """Record the result of the game."""
+        self.ticks = game_engine.ticks
+        self.score = game_engine.score.score
+
+    def to_bytes(self):
+        """Pack the replay into bytes."""
+        header = HEADER.pack(MAGIC, VERSION, MODES.index(self.mode),
+                             self.seed, self.board_size[0],
+                             self.board_size[1], len(self.inputs),
+                             self.ticks, self.score)
+        return header + b''.join(INPUT.pack(tick, code)
+                                 for tick, code in self.inputs)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Unpack a replay from bytes."""
+        magic, version, mode, seed, width, height, count, ticks, score = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a version {} replay'.format(VERSION))
+        inputs = [INPUT.unpack_from(data, HEADER.size + i * INPUT.size)
+                  for i in range(count)]
+        return cls(MODES[mode], seed, inputs, ticks, score, (width, height))
+
+    def save(self, path):
+        """Write the replay to a file."""
+        with open(path, 'wb') as replay_file:
+            replay_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay from a file."""
+        with open(path, 'rb') as replay_file:
+            return cls.from_bytes(replay_file.read())
+
+
+class ReplayPlayer():
+    """
+    Re-simulates a replay in a fresh game engine.
+
+    Recorded inputs are applied just before the engine step they
+    arrived ahead of, exactly as they were during the game.
+    """
+
+    def __init__(self, replay, game_board=None):
+        """
+        Initialize the player with a newly seeded engine.
+
+        Play on a board of the recorded size unless a Board is given.
+        """
+        self.replay = replay
+        if game_board is None:
+            game_board = board.Board(*replay.board_size)
+        self.engine = engine.GameEngine(replay.mode, replay.seed,
+                                        game_board)
+        # Index of the next input to apply.
+        self.next_input = 0
+
+    @property
+    def finished(self):
+        """Check if the replayed game has ended."""
+        return (self.engine.dead or self.engine.won or
+                (self.replay.ticks and
+                 self.engine.ticks >= self.replay.ticks))
+
+    def step(self):
+        """
+        Apply the inputs due, then advance the engine by one "cell".
+
+        Return the outcome of the step (see states.STEP_OUTCOMES).
+        """
+        inputs = self.replay.inputs
+        while self.next_input < len(inputs) and \
+                inputs[self.next_input][0] <= self.engine.ticks:
+            apply_input(self.engine, INPUTS[inputs[self.next_input][1]])
+            self.next_input += 1
+        return self.engine.step()
+
+    def run(self):
+        """
+        Re-simulate the rest of the game as fast as possible.
+
+        Return the engine, in its final state.
+        """
+        while not self.finished:
+            self.step()
+        return self.engine
+
+    def check(self):
+        """Check if the replay reproduced the recorded result."""
+        return (self.engine.ticks == self.replay.ticks and
+                self.engine.score.score == self.replay.score)
+
+
+def main(paths):
+    """
+    Re-simulate replay files headlessly & check their results.
+
+    Return the number of replays that did not reproduce their result.
+    """
+    failures = 0
+    for path in paths:
+        player = ReplayPlayer(Replay.load(path))
+        game_engine = player.run()
+        if player.check():
+            print('{}: ok ({} ticks, score {})'.format(
+                path, game_engine.ticks, game_engine.score.score))
+        else:
+            failures += 1
+            print('{}: MISMATCH ({} ticks, score {}, recorded {} ticks, '
+                  'score {})'.format(path, game_engine.ticks,
+                                     game_engine.score.score,
+                                     player.replay.ticks,
+                                     player.replay.score))
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main(sys.argv[1:]) else 0)
@@ -0,0 +1,71 @@
+"""Snake Arcade fixed timestep scheduler."""
+
+import settings
+
+# Microseconds in one second.
+SECOND = 1000000
+
+
+class TickScheduler():
+    """
+    Fixed timestep scheduler for the game simulation.
+
+    Real time is turned into a whole number of fixed "frames" (ticks of
+    1 / rate seconds), however often the window updates. Movement is
+    then counted in whole frames: a snake travelling at speed cells per
+    second is due speed steps every rate frames, spread evenly.
+
+    Both accumulators are integers, so the same frames & steps are
+    scheduled on any machine, with no rounding drift.
+    """
+
+    def __init__(self, rate=settings.FPS, max_frames=settings.MAX_FRAMES):
+        """
+        Initialize the scheduler.
+
+        Simulate at most max_frames frames in one update. Any time
+        beyond that is dropped, so the game slows down rather than
+        falling further & further behind on a machine that cannot keep
+        up.
+        """
+        self.rate = rate
+        self.max_frames = max_frames
+        # Time not yet simulated, in 1 / (rate * SECOND) seconds.
+        self.time = 0
+        # Progress towards the next step, in 1 / rate "cells".
+        self.distance = 0
+        # Total number of frames simulated.
+        self.frames = 0
+
+    def advance(self, delta_time):
+        """
+        Add real time passed since the last update.
+
+        Return the number of fixed frames to simulate.
+        """
+        self.time += int(delta_time * SECOND) * self.rate
+        frames = self.time // SECOND
+        self.time -= frames * SECOND
+        if frames > self.max_frames:
+            frames = self.max_frames
+        self.frames += frames
+        return frames
+
+    def tick(self, speed, divisor=1):
+        """
+        Advance movement by one frame at a speed in "cells" per second.
+
+        Fractional speeds are given as speed / divisor, keeping both
+        whole numbers. Use the same divisor until the distance is reset.
+
+        Return the number of "cell" steps due. Speeds above the frame
+        rate are due more than one step each frame.
+        """
+        self.distance += speed
+        steps = self.distance // (self.rate * divisor)
+        self.distance -= steps * self.rate * divisor
+        return steps
+
+    def reset_distance(self):
+        """Forget any progress towards the next step."""
+        self.distance = 0
@@ -0,0 +1,46 @@
+"""Snake Arcade scoring system."""
+
+
+class Score():
+    """Custom scoring system."""
+
+    def __init__(self, food_points, milestone_amount, score=0):
+        """Initialize the scoring system."""
+        self.score = score
+        self.food_points = food_points
+        self.milestone_amount = milestone_amount
+        self.milestone_checkpoint = 0
+        # Padded score string, kept until the score changes.
+        self.padded_score = None
+        self.padded_score_str = ''
+
+    def add_food_points(self):
+        """Add the value of one food item to the score."""
+        self.score += self.food_points
+
+    def check_milestone(self):
+        """
+        Check if a milestone score has been reached.
+
+        Once reached, update the milestone total so that the next check
+        can be made accurately.
+
+        Return a Boolean value.
+        """
+        if self.milestone_amount is not None:
+            if self.score - self.milestone_amount == self.milestone_checkpoint:
+                self.milestone_checkpoint += self.milestone_amount
+                return True
+            else:
+                return False
+
+    def get_padded_str(self):
+        """
+        Get a string for the score padded with leading zeros.
+
+        Only pad the score again after it has changed.
+        """
+        if self.score != self.padded_score:
+            self.padded_score = self.score
+            self.padded_score_str = str(self.score).zfill(6)
+        return self.padded_score_str
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+
+"""
+Snake Arcade network game server.
+
+The server runs every game itself, at a fixed tick, so the rules can't
+be bent by a client. Clients only send the directions they want to
+turn. After each step the server sends what changed, usually a few
+bytes: the new head, whether the tail was removed & any new food
+position, score or end of the game. Whole game states are only sent
+once, when a game starts.
+
+Every game is a session on one asyncio event loop, so one process can
+host hundreds of games at once.
+"""
+
+import argparse
+import asyncio
+import collections
+import math
+import statistics
+import struct
+import sys
+
+import board
+import engine
+import replay
+import scheduler
+import settings
+import states
+import tournament
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+# Directions sent by clients, one byte each, by input code.
+DIRECTIONS = tuple(states.DIRECTIONS)
+MODES = tuple(states.GAME_MODES.values())
+# Causes sent when a game ends, by code.
+END_CAUSES = ('wall', 'body', 'won')
+
+# Sent by clients on connecting: game mode code, board width & height
+# ((0, 0) for the default board).
+HELLO = struct.Struct('<BHH')
+
+# Server messages start with a message type byte.
+MESSAGE = struct.Struct('<B')
+START = 0
+STEP = 1
+# Start of a game: board width & height, the three body segments head
+# first, the food & the score.
+START_STATE = struct.Struct('<HH6HHHq')
+# Each step sends flags, then the fields they mark, in this order.
+STEP_FLAGS = struct.Struct('<B')
+HEAD_ADDED = 1
+TAIL_REMOVED = 2
+FOOD_MOVED = 4
+SCORE_CHANGED = 8
+GAME_OVER = 16
+POSITION = struct.Struct('<HH')
+SCORE = struct.Struct('<q')
+CAUSE = struct.Struct('<B')
+
+# Clients that fall further behind than this many unsent bytes are
+# dropped, rather than holding updates in memory for them.
+MAX_BUFFER = 64 * 1024
+
+
+def get_board(width, height):
+    """
+    Get a board of a size, or the default board for (0, 0).
+
+    Raise ValueError for sizes board.parse_size would not accept.
+    """
+    if not width and not height:
+        return board.Board()
+    board.check_size(width, height)
+    return board.Board(width, height)
+
+
+def pack_start(game_engine):
+    """Pack the whole state of a new game."""
+    return MESSAGE.pack(START) + START_STATE.pack(
+        game_engine.board.width, game_engine.board.height,
+        *[value for position in game_engine.body for value in position],
+        *game_engine.food_pos, game_engine.score.score)
+
+
+def pack_step(game_engine, head, length, food, score):
+    """
+    Pack the changes made by one step.
+
+    Compare the engine with its head, length, food & score before the
+    step.
+    """
+    flags = 0
+    fields = []
+    if game_engine.head_pos != head:
+        flags |= HEAD_ADDED
+        fields.append(POSITION.pack(*game_engine.head_pos))
+    # The body grows by one segment unless the tail was removed.
+    if len(game_engine.body) == length:
+        flags |= TAIL_REMOVED
+    if game_engine.food_pos != food and game_engine.food_pos is not None:
+        flags |= FOOD_MOVED
+        fields.append(POSITION.pack(*game_engine.food_pos))
+    if game_engine.score.score != score:
+        flags |= SCORE_CHANGED
+        fields.append(SCORE.pack(game_engine.score.score))
+    if game_engine.dead or game_engine.won:
+        flags |= GAME_OVER
+        cause = 'won' if game_engine.won else game_engine.death_cause
+        fields.append(CAUSE.pack(END_CAUSES.index(cause)))
+    return MESSAGE.pack(STEP) + STEP_FLAGS.pack(flags) + b''.join(fields)
+
+
+class Session():
+    """One client's game, run by the server."""
+
+    def __init__(self, writer, mode, game_board, rate):
+        """Start a new game for a client."""
+        self.writer = writer
+        self.engine = engine.GameEngine(mode, game_board=game_board)
+        self.scheduler = scheduler.TickScheduler(rate)
+        self.over = False
+        writer.write(pack_start(self.engine))
+
+    def update(self):
+        """
+        Simulate one fixed frame & send the steps taken.
+
+        Return False once the game is over or the client has fallen too
+        far behind, True otherwise.
+        """
+        game_engine = self.engine
+        for step in range(self.scheduler.tick(game_engine.speed)):
+            state = (game_engine.head_pos, len(game_engine.body),
+                     game_engine.food_pos, game_engine.score.score)
+            game_engine.step()
+            self.writer.write(pack_step(game_engine, *state))
+            if game_engine.dead or game_engine.won:
+                self.over = True
+                return False
+        return self.writer.transport.get_write_buffer_size() <= MAX_BUFFER
+
+
+class GameServer():
+    """
+    Authoritative game server.
+
+    Accepts clients & runs a session for each, stepping every session
+    on one fixed tick. The tick can be sped up by a time scale, e.g. to
+    play out test games faster than real time.
+    """
+
+    def __init__(self, rate=settings.FPS, time_scale=1):
+        """Initialize a server ticking rate times per second."""
+        self.rate = rate
+        self.time_scale = time_scale
+        # Catch up as many frames at once as the time scale needs.
+        self.clock = scheduler.TickScheduler(
+            rate, max(settings.MAX_FRAMES,
+                      math.ceil(settings.MAX_FRAMES * time_scale)))
+        self.sessions = set()
+        self.server = None
+        # Number of games started since the server started.
+        self.games = 0
+
+    async def start(self, host=HOST, port=PORT):
+        """
+        Start accepting clients & ticking.
+
+        Return the port listened on, useful when port 0 picks any free
+        port.
+        """
+        self.server = await asyncio.start_server(self.handle_client, host,
+                                                 port)
+        self.ticker = asyncio.ensure_future(self.run_ticks())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop accepting clients & ticking."""
+        self.ticker.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """
+        Run a client's session.
+
+        Read the hello, start the game, then apply the directions the
+        client sends until the client leaves.
+        """
+        session = None
+        try:
+            mode, width, height = HELLO.unpack(
+                await reader.readexactly(HELLO.size))
+            session = Session(writer, MODES[mode], get_board(width, height),
+                              self.rate)
+            self.sessions.add(session)
+            self.games += 1
+            # Wait for the client to leave once the game is over, so
+            # turns sent after the last step are not sent to a closed
+            # connection.
+            while True:
+                data = await reader.read(64)
+                if not data:
+                    break
+                # Only the last direction before a step counts, as in
+                # the game window.
+                for code in data:
+                    if code < len(DIRECTIONS) and not session.over:
+                        replay.apply_input(session.engine, DIRECTIONS[code])
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError,
+                ValueError, struct.error):
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    async def run_ticks(self):
+        """Step every session on a fixed tick, for as long as it runs."""
+        loop = asyncio.get_event_loop()
+        last = loop.time()
+        while True:
+            await asyncio.sleep(1 / self.rate)
+            now = loop.time()
+            frames = self.clock.advance((now - last) * self.time_scale)
+            last = now
+            for frame in range(frames):
+                for session in list(self.sessions):
+                    try:
+                        running = session.update()
+                    except Exception as error:
+                        # Drop a session that fails, rather than stopping
+                        # every game on the server.
+                        print('Dropped a game: {!r}'.format(error),
+                              file=sys.stderr)
+                        self.sessions.discard(session)
+                        session.writer.close()
+                        continue
+                    if not running:
+                        self.sessions.discard(session)
+                        # Drop clients too far behind.
+                        if not session.over:
+                            session.writer.close()
+
+
+class GameClient():
+    """
+    Network game client.
+
+    Mirrors the server's game from the changes sent each step. The
+    mirror has the same body, direction, food & wall checks as a
+    GameEngine, so computer players can steer it too.
+    """
+
+    def __init__(self):
+        """Initialize a client with no game."""
+        self.board = None
+        self.body = collections.deque()
+        self.occupied = collections.Counter()
+        self.direction = ''
+        self.food_pos = None
+        self.score = 0
+        self.ticks = 0
+        self.death_cause = None
+        self.over = False
+        # Bytes received, for measuring the cost of updates.
+        self.received = 0
+        self.reader = None
+        self.writer = None
+
+    @property
+    def head_pos(self):
+        """Get the position of the snake head."""
+        return self.body[0]
+
+    def check_wall_collisions(self, position):
+        """Check if a position is outside of the game board walls."""
+        return not self.board.contains(position)
+
+    async def connect(self, host=HOST, port=PORT,
+                      mode=states.GAME_MODES['normal'], board_size=(0, 0)):
+        """Connect to a server & start a game, waiting for its state."""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(HELLO.pack(MODES.index(mode), *board_size))
+        message = await self.read(MESSAGE)
+        if message[0] != START:
+            raise ValueError('Expected a game start, got message type '
+                             '{}'.format(message[0]))
+        state = await self.read(START_STATE)
+        self.board = get_board(*state[:2])
+        self.body = collections.deque(zip(state[2:8:2], state[3:8:2]))
+        self.occupied = collections.Counter(self.body)
+        self.direction = self.get_direction(self.body[1], self.body[0])
+        self.food_pos = state[8:10]
+        self.score = state[10]
+
+    async def read(self, layout):
+        """Read & unpack one struct from the server."""
+        data = await self.reader.readexactly(layout.size)
+        self.received += len(data)
+        return layout.unpack(data)
+
+    def get_direction(self, start, end):
+        """Get the direction moved from one cell to the next."""
+        vector = (end[0] - start[0], end[1] - start[1])
+        for direction, direction_vector in states.DIRECTIONS.items():
+            if direction_vector == vector:
+                return direction
+        return self.direction
+
+    async def read_step(self):
+        """Read one step from the server & apply its changes."""
+        message = await self.read(MESSAGE)
+        if message[0] != STEP:
+            raise ValueError('Expected a step, got message type '
+                             '{}'.format(message[0]))
+        flags = (await self.read(STEP_FLAGS))[0]
+        self.ticks += 1
+        if flags & TAIL_REMOVED:
+            tail = self.body.pop()
+            self.occupied[tail] -= 1
+            if not self.occupied[tail]:
+                del self.occupied[tail]
+        if flags & HEAD_ADDED:
+            head = await self.read(POSITION)
+            self.direction = self.get_direction(self.body[0], head)
+            self.body.appendleft(head)
+            self.occupied[head] += 1
+        if flags & FOOD_MOVED:
+            self.food_pos = await self.read(POSITION)
+        if flags & SCORE_CHANGED:
+            self.score = (await self.read(SCORE))[0]
+        if flags & GAME_OVER:
+            self.death_cause = END_CAUSES[(await self.read(CAUSE))[0]]
+            self.over = True
+
+    def send(self, direction):
+        """Send a direction for the snake to turn."""
+        self.writer.write(bytes((DIRECTIONS.index(direction),)))
+
+    async def play(self, policy=tournament.get_greedy_action):
+        """
+        Play a game to the end, steered by a policy.
+
+        Only turns are sent, after each step. Return the final score.
+        """
+        while not self.over:
+            await self.read_step()
+            if not self.over:
+                direction = policy(self)
+                if direction != self.direction:
+                    self.send(direction)
+        self.writer.close()
+        return self.score
+
+
+async def play_bots(num_bots, host, port, mode, board_size):
+    """
+    Play games with computer players as clients of a server.
+
+    Return the finished clients.
+    """
+    clients = [GameClient() for i in range(num_bots)]
+    await asyncio.gather(*[client.connect(host, port, mode, board_size)
+                           for client in clients])
+    await asyncio.gather(*[client.play() for client in clients])
+    return clients
+
+
+async def run_bots(args):
+    """
+    Play bot games, against a local server unless one is given.
+
+    Print a summary of the games & the size of their updates.
+    """
+    game_server = None
+    host, port = args.host, args.port
+    if not args.connect:
+        game_server = GameServer(args.tick_rate, args.time_scale)
+        port = await game_server.start(host, 0)
+    clients = await play_bots(args.bots, host, port,
+                              states.GAME_MODES[args.mode], args.board)
+    if game_server is not None:
+        await game_server.stop()
+    ticks = sum(client.ticks for client in clients)
+    received = sum(client.received for client in clients)
+    print('{} games, mean score {:.1f}, {} steps, {:.2f} bytes per '
+          'step'.format(len(clients),
+                        statistics.mean(client.score for client in clients),
+                        ticks, received / max(ticks, 1)))
+    print('deaths: {}'.format(dict(collections.Counter(
+        client.death_cause for client in clients))))
+
+
+async def serve(args):
+    """Run a server until interrupted."""
+    game_server = GameServer(args.tick_rate, args.time_scale)
+    port = await game_server.start(args.host, args.port)
+    print('Serving games on {}:{}'.format(args.host, port))
+    await asyncio.Event().wait()
+
+
+def main():
+    """Run a game server, or bot clients to test one."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default=HOST,
+                        help='address to serve on or connect to '
+                             '(default: %(default)s)')
+    parser.add_argument('--port', type=int, default=PORT,
+                        help='port to serve on or connect to '
+                             '(default: %(default)s)')
+    parser.add_argument('--tick-rate', type=int, default=settings.FPS,
+                        help='server ticks per second '
+                             '(default: %(default)s)')
+    parser.add_argument('--time-scale', type=float, default=1,
+                        help='run games faster than real time, e.g. for '
+                             'tests (default: %(default)s)')
+    parser.add_argument('--bots', type=int, metavar='N',
+                        help='play N computer players against a local '
+                             'server & report the results')
+    parser.add_argument('--connect', action='store_true',
+                        help='play the bots against the server at '
+                             '--host & --port instead')
+    parser.add_argument('--mode', choices=states.GAME_MODES,
+                        default='normal', help='game mode for the bots')
+    parser.add_argument('--board', type=board.parse_size, default=(0, 0),
+                        help='board size for the bots, e.g. 100x100')
+    args = parser.parse_args()
+    try:
+        if args.bots:
+            asyncio.get_event_loop().run_until_complete(run_bots(args))
+        else:
+            asyncio.get_event_loop().run_until_complete(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
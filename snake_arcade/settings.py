@@ -21,5 +21,40 @@ BOARD_RIGHT = COLUMNS - (PADDING['right'])
 BOARD_TOP = ROWS - (PADDING['top'])
 BOARD_BOTTOM = PADDING['bottom'] + 1
 
+# Fastest snake speed, in "cells" per second, for every engine.
+MAX_SPEED = 16
+
 # Frames per second.
 FPS = 60
+
+# Most fixed timestep frames simulated in one update, when catching up
+# after slow frames.
+MAX_FRAMES = 5
+
+# Time the autopilot may spend planning each frame, in seconds. A quarter
+# of the frame leaves the rest for game logic & drawing.
+AUTOPILOT_BUDGET = 0.25 / FPS
+
+# Most turns a player can queue ahead of the snake, one taken each step.
+MAX_QUEUED_TURNS = 3
+
+# How far a joystick must be pushed to turn, from 0 to 1.
+JOYSTICK_DEAD_ZONE = 0.5
+
+# Snakes in the arena, including the player's.
+ARENA_SNAKES = 8
+
+# Save a replay of every finished game to the replays directory.
+SAVE_REPLAYS = False
+
+# Show the number of draw calls made each frame in the window title.
+SHOW_DRAW_CALLS = False
+
+# Top scores kept for each game mode.
+LEADERBOARD_SIZE = 10
+
+# Gameplay events buffered for the background writer, the events that
+# wake it early, & the longest it waits between batches, in seconds.
+EVENT_BUFFER_SIZE = 4096
+EVENT_BATCH = 256
+EVENT_FLUSH_INTERVAL = 0.5
@@ -1,8 +1,11 @@
 """Snake Arcade playable character."""
 
-import arcade
+import collections
 
+import perf
 import settings
+import snake_buffer
+import states
 
 
 class Snake():
@@ -38,22 +41,24 @@ class Snake():
         self.last_direction = ''
         # Position. Coordinates/units are in game grid "cells".
         self.head_pos = head_pos
-        # Position used to get distance travelled by head between each 'move'.
-        self.previous_pos = [self.head_pos[0], self.head_pos[1]]
-        # List of body segment positions.
-        self.body_segment_list = self.align()
+        # Place of the head on a track being followed, as a cell number.
+        self.track_place = None
+        # Body segment positions, from head to tail.
+        self.body_segment_list = collections.deque(self.align())
         # Offset amount required to align snake objects to the game grid.
-        self.offset = settings.CELL / 2
+        self.offset = self.size / 2
         # Movement (in game "cells" per second).
         self.speed = speed
         self.min_speed = 6
-        self.max_speed = 16
+        self.max_speed = settings.MAX_SPEED
         # Health status.
         self.eating = False
         self.dead = False
         self.time_dead = 0
         # Prepare snake for drawing.
-        self.shape_list = self.create_snake()
+        self.buffer = snake_buffer.SnakeBuffer(size=self.size)
+        self.load_colours()
+        self.create_snake()
 
     def update_theme(self, theme):
         """
@@ -68,8 +73,7 @@ class Snake():
         self.border_colour = theme['snake_border']
         self.eye_colour = theme['eye']
         self.pupil_colour = theme['pupil']
-        # Rebuild snake (although called in update_body()) to avoid glitches.
-        self.shape_list = self.create_snake()
+        self.load_colours()
 
     def set_direction(self):
         """
@@ -116,50 +120,19 @@ class Snake():
                              [self.head_pos[0], self.head_pos[1] + 2]]
         return aligned_snake
 
-    def move(self, dt):
+    def step(self):
         """
-        Move the snake head cell around the board.
+        Move the snake head one game grid "cell" around the board.
 
-        Take delta time into account & make movements in game grid
-        "cell" sized increments.
+        Steps are scheduled at a fixed rate by the game, so no movement
+        is left over between steps.
         """
-        if not self.dead:
-            if self.direction == 'UP':
-                self.head_pos[1] += (self.speed * dt)
-                if self.get_distance_travelled()[1] >= 1:
-                    self.head_pos[1] = int(self.head_pos[1])
-                    self.previous_pos[1] += 1
-                    self.update_body()
-                    self.set_direction()
-            elif self.direction == 'DOWN':
-                self.head_pos[1] -= (self.speed * dt)
-                if self.get_distance_travelled()[1] >= 1:
-                    # Account for int() rounding down.
-                    self.head_pos[1] = int(self.head_pos[1] + 1)
-                    self.previous_pos[1] -= 1
-                    self.update_body()
-                    self.set_direction()
-            elif self.direction == 'LEFT':
-                self.head_pos[0] -= (self.speed * dt)
-                if self.get_distance_travelled()[0] >= 1:
-                    # Account for int() rounding down.
-                    self.head_pos[0] = int(self.head_pos[0] + 1)
-                    self.previous_pos[0] -= 1
-                    self.update_body()
-                    self.set_direction()
-            elif self.direction == 'RIGHT':
-                self.head_pos[0] += (self.speed * dt)
-                if self.get_distance_travelled()[0] >= 1:
-                    self.head_pos[0] = int(self.head_pos[0])
-                    self.previous_pos[0] += 1
-                    self.update_body()
-                    self.set_direction()
-
-    def get_distance_travelled(self):
-        """Measure the amount the snake has moved from the last position."""
-        x_dist = abs(self.previous_pos[0] - self.head_pos[0])
-        y_dist = abs(self.previous_pos[1] - self.head_pos[1])
-        return x_dist, y_dist
+        if not self.dead and self.direction in states.DIRECTIONS:
+            x, y = states.DIRECTIONS[self.direction]
+            self.head_pos[0] += x
+            self.head_pos[1] += y
+            self.update_body()
+            self.set_direction()
 
     def increase_speed(self, increment):
         """Increase the speed of the snake up to a maximum."""
@@ -183,26 +156,34 @@ class Snake():
             if not self.min_speed + increment > self.max_speed:
                 self.min_speed += increment
 
-    def loop(self, top_l, top_r, bot_r, bot_l):
+    def follow(self, track):
         """
-        Loop the snake clockwise around four rectangular coordinates.
+        Steer along a track before a step, turning where it turns.
 
-        Coordinates, or corner points of the "track", are required in
-        (x, y) format.
+        Keep the snake's place on the track, so each turn is found in
+        constant time. The place is found from the head position when
+        the snake joins the track, or has been moved off its place.
         """
-        if self.head_pos[0] == bot_l[0] and self.head_pos[1] == bot_l[1]:
-            self.change_direction = 'UP'
-        elif self.head_pos[0] == top_l[0] and self.head_pos[1] == top_l[1]:
-            self.change_direction = 'RIGHT'
-        elif self.head_pos[0] == top_r[0] and self.head_pos[1] == top_r[1]:
-            self.change_direction = 'DOWN'
-        elif self.head_pos[0] == bot_r[0] and self.head_pos[1] == bot_r[1]:
-            self.change_direction = 'LEFT'
-
-    def check_body_collisions(self):
-        """Check if the snake has collided with itself."""
-        if self.head_pos in self.body_segment_list[1:-1]:
-            self.dead = True
+        if self.track_place is None or \
+                track.get_cell(self.track_place) != tuple(self.head_pos):
+            self.track_place = track.find(self.head_pos)
+            if self.track_place is None:
+                return
+        self.direction = track.get_direction(self.track_place)
+        self.track_place += 1
+
+    def add_head_segment(self, position):
+        """Add a body segment in front of the head."""
+        self.body_segment_list.appendleft(list(position))
+        if len(self.body_segment_list) > self.buffer.capacity:
+            self.create_snake()
+        else:
+            self.buffer.push_head(self.get_segment_coords(position))
+
+    def remove_tail_segment(self):
+        """Remove the last body segment (the "tail")."""
+        self.body_segment_list.pop()
+        self.buffer.pop_tail()
 
     def grow_body(self):
         """
@@ -210,7 +191,7 @@ class Snake():
 
         Insert the "head" as the first segment to achieve growth.
         """
-        self.body_segment_list.insert(0, list(self.head_pos))
+        self.add_head_segment(self.head_pos)
 
     def update_body(self):
         """
@@ -221,10 +202,22 @@ class Snake():
         if self.eating:
             self.grow_body()
         else:
-            self.body_segment_list.insert(0, list(self.head_pos))
+            self.add_head_segment(self.head_pos)
             # Stop growth by removing the last body segment (the "tail").
-            self.body_segment_list.pop()
-            self.shape_list = self.create_snake()
+            self.remove_tail_segment()
+
+    def advance(self, head_pos, direction, grow=False):
+        """
+        Advance the snake body by one "cell" to a new head position.
+
+        Mirror a step taken by a headless game engine. Keep the tail
+        when the engine grew the snake.
+        """
+        self.direction = direction
+        self.head_pos = list(head_pos)
+        self.add_head_segment(head_pos)
+        if not grow:
+            self.remove_tail_segment()
 
     def flash_body(self, interval, theme):
         """
@@ -244,7 +237,7 @@ class Snake():
             self.border_colour = theme['bg']
             self.eye_colour = theme['bg']
             self.pupil_colour = theme['bg']
-            self.shape_list = self.create_snake()
+            self.load_colours()
         # Reload the snake colours into the snake body parts.
         elif self.time_dead > interval:
             # Reset the counter.
@@ -256,7 +249,7 @@ class Snake():
             self.border_colour = theme['snake_border']
             self.eye_colour = theme['eye']
             self.pupil_colour = theme['pupil']
-            self.shape_list = self.create_snake()
+            self.load_colours()
 
     def get_grid_coords(self):
         """
@@ -274,287 +267,44 @@ class Snake():
             grid_coords.append(offset_coords)
         return grid_coords
 
-    # *** BUFFERED DRAWING METHODS *** #
-
-    def get_segment_points(self, position, width=settings.CELL,
-                           height=settings.CELL):
-        """Get a list of four vertices for one segment of the snake."""
-        segment_points = arcade.get_rectangle_points(
-            position[0],
-            position[1],
-            width,
-            height,
-            )
-        return segment_points
-
-    def create_segment_border(self, position, colour, width=settings.CELL,
-                              height=settings.CELL):
-        """Create the colour border for one segment of the snake."""
-        segment_border = arcade.create_rectangle_outline(
-            position[0],
-            position[1],
-            width,
-            height,
-            colour,
-            2
-            )
-        return segment_border
-
-    def create_body_segment_fills(self, body_segments):
-        """
-        Create the snake body segments (including head/tail).
-
-        Return a list of vertex buffer objects (VBOs) that can be
-        rendered to the screen efficiently.
-        """
-        body_segment_point_list = []
-        body_segment_colour_list = []
-        # Add the head shape points & the head colour.
-        for segment_xy in body_segments[:1]:
-            segment_points = self.get_segment_points(segment_xy)
-            for point in segment_points:
-                body_segment_point_list.append(point)
-                body_segment_colour_list.append(self.head_colour)
-        # Add body segment shape points & the first body segment colour.
-        for segment_xy in body_segments[1::3]:
-            segment_points = self.get_segment_points(segment_xy)
-            for point in segment_points:
-                body_segment_point_list.append(point)
-                body_segment_colour_list.append(self.body_colour_1)
-        # Add body segment shape points & the second body segment colour.
-        for segment_xy in body_segments[2::3]:
-            segment_points = self.get_segment_points(segment_xy)
-            for point in segment_points:
-                body_segment_point_list.append(point)
-                body_segment_colour_list.append(self.body_colour_2)
-        # Add body segment shape points & the third body segment colour.
-        for segment_xy in body_segments[3::3]:
-            segment_points = self.get_segment_points(segment_xy)
-            for point in segment_points:
-                body_segment_point_list.append(point)
-                body_segment_colour_list.append(self.body_colour_3)
-        # Create the entire body VBO.
-        body_segment_fills = arcade.create_rectangles_filled_with_colors(
-            body_segment_point_list,
-            body_segment_colour_list
-            )
-        return body_segment_fills
-
-    def create_body_segment_borders(self, body_segments):
-        """
-        Create the snake body segments borders (including head/tail).
+    def get_segment_coords(self, position):
+        """Get cartesian coordinates for one body segment in pixels."""
+        x = (position[0] * self.size) - self.offset
+        y = (position[1] * self.size) - self.offset
+        return x, y
 
-        Return a list of objects that can be rendered to the screen
-        efficiently.
-        """
-        body_segments_border_list = []
-        for segment in body_segments:
-            body_segments_border_list.append(
-                self.create_segment_border(segment, self.border_colour))
-        return body_segments_border_list
+    # *** BUFFERED DRAWING METHODS *** #
 
-    def get_eye_points(self):
-        """
-        Get a list of eight vertices for two rectangular eye objects.
+    def load_colours(self):
+        """Load the snake body part colours into the vertex buffers."""
+        self.buffer.set_colours(self.head_colour, self.body_colour_1,
+                                self.body_colour_2, self.body_colour_3,
+                                self.border_colour, self.eye_colour,
+                                self.pupil_colour)
 
-        Return points for eyes facing in any direction the snake can travel.
-        """
-        eye_point_list = []
-        # Create the eyes, even when direction not set e.g. game is paused.
-        if self.direction == 'UP' or self.direction == '':
-            left_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 12,
-                width=self.size / 4,
-                height=self.size / 3,
-                 )
-            right_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 12,
-                width=self.size / 4,
-                height=self.size / 3
-                 )
-        elif self.direction == 'DOWN':
-            left_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 12,
-                width=self.size / 4,
-                height=self.size / 3
-                 )
-            right_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 12,
-                width=self.size / 4,
-                height=self.size / 3
-                 )
-        elif self.direction == 'LEFT':
-            left_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 3,
-                width=self.size / 3,
-                height=self.size / 4
-                 )
-            right_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 3,
-                width=self.size / 3,
-                height=self.size / 4
-                 )
-        elif self.direction == 'RIGHT':
-            left_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 3,
-                width=self.size / 3,
-                height=self.size / 4
-                 )
-            right_eye_fill = arcade.get_rectangle_points(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 3,
-                width=self.size / 3,
-                height=self.size / 4
-                 )
-        for point in left_eye_fill:
-            eye_point_list.append(point)
-        for point in right_eye_fill:
-            eye_point_list.append(point)
-        return eye_point_list
-
-    def create_eye_borders(self, colour):
+    @perf.timed('Snake.create_snake')
+    def create_snake(self):
         """
-        Create the snake eye borders.
+        Upload the whole snake to its vertex buffers.
 
-        Return a list of objects that can be rendered to the screen
-        efficiently.
-        """
-        eye_borders_list = []
-        # Create eye borders, even when direction not set e.g. game is paused.
-        if self.direction == 'UP' or self.direction == '':
-            left_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 12,
-                self.size / 4, self.size / 3, colour,
-                1
-                 )
-            right_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 12,
-                self.size / 4, self.size / 3, colour,
-                1
-                 )
-        elif self.direction == 'DOWN':
-            left_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 12,
-                self.size / 4, self.size / 3, colour,
-                1
-                 )
-            right_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 3,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 12,
-                self.size / 4, self.size / 3, colour,
-                1
-                 )
-        elif self.direction == 'LEFT':
-            left_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 3,
-                self.size / 3, self.size / 4, colour,
-                1
-                 )
-            right_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                - self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 3,
-                self.size / 3, self.size / 4, colour,
-                1
-                 )
-        elif self.direction == 'RIGHT':
-            left_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                + self.size / 3,
-                self.size / 3, self.size / 4, colour,
-                1
-                 )
-            right_eye_border = arcade.create_rectangle_outline(
-                ((self.body_segment_list[0][0] * settings.CELL) - self.offset)
-                + self.size / 10,
-                ((self.body_segment_list[0][1] * settings.CELL) - self.offset)
-                - self.size / 3,
-                self.size / 3, self.size / 4, colour,
-                1
-                 )
-        eye_borders_list.append(left_eye_border)
-        eye_borders_list.append(right_eye_border)
-        return eye_borders_list
-
-    def create_eye_fills(self, eye_point_list, colour):
-        """
-        Create the snake body segments (including head/tail).
+        Only needed when the snake is created or outgrows its buffers,
+        as moving the snake updates the buffers one segment at a time.
 
-        Return a list of vertex buffer objects (VBOs) that can be
-        rendered to the screen efficiently.
+        Return the SnakeBuffer to be drawn.
         """
-        eye_fill_point_list = []
-        eye_fill_colour_list = []
-        for point in eye_point_list:
-            eye_fill_point_list.append(point)
-            eye_fill_colour_list.append(colour)
-        # Create the eye group VBO.
-        eye_fills = arcade.create_rectangles_filled_with_colors(
-            eye_fill_point_list,
-            eye_fill_colour_list
-        )
-        return eye_fills
+        self.buffer.rebuild(self.get_grid_coords())
+        return self.buffer
 
-    def create_snake(self):
+    def draw(self, camera=None):
         """
-        Create buffered shapes for the snake object.
+        Draw the snake.
 
-        Return a ShapeElementList list containing the each part of the
-        snake object to be drawn.
+        Upload new eyes first if the snake has changed direction. Only
+        draw the body segments in view when a Camera is given.
         """
-        # Redefine the shape list to clear unneeded entries.
-        shape_list = arcade.ShapeElementList()
-        # Get all the snake objects.
-        body_fills = self.create_body_segment_fills(self.get_grid_coords())
-        body_borders = self.create_body_segment_borders(self.get_grid_coords())
-        eyes = self.create_eye_fills(self.get_eye_points(),
-                                     self.pupil_colour)
-        eye_borders = self.create_eye_borders(self.eye_colour)
-        # Populate the shape list.
-        shape_list.append(body_fills)
-        for border in body_borders:
-            shape_list.append(border)
-        shape_list.append(eyes)
-        for border in eye_borders:
-            shape_list.append(border)
-        return shape_list
+        if self.direction != self.buffer.eye_direction:
+            self.buffer.set_eyes(self.direction)
+        if camera is None:
+            self.buffer.draw()
+        else:
+            self.buffer.draw(camera.offset, camera.get_view_rect(self.size))
@@ -2,82 +2,258 @@
 
 """Snake Arcade - A 2D snake game by Nigel Maher."""
 
+import time
+
+# Time the game was started, before the other imports, for the startup
+# profile.
+if __name__ == "__main__":
+    started = time.perf_counter()
+
+import argparse
+import concurrent.futures
+import fractions
+import importlib
 import os
 import random
 
 import arcade
 
+import board
+import camera
 import colours
+import draw_calls
+import events
 import food
-import game_over_screen
-import level_screen
+import input_queue
+import leaderboard
 import main_menu_screen
+import perf
+import scheduler
 import settings
 import snake
 import states
-
-# Change working directory to the font directory.
+import text_cache
+
+# Gamepad directions, as the arrow keys they stand for.
+JOYSTICK_KEYS = {
+    (0, 1): arcade.key.UP,
+    (0, -1): arcade.key.DOWN,
+    (-1, 0): arcade.key.LEFT,
+    (1, 0): arcade.key.RIGHT
+}
+
+# Screens only needed once a game is played, imported & built on first use
+# or while the main menu is idle, as (module, class) by attribute name.
+DEFERRED_SCREENS = {
+    'level': ('level_screen', 'LevelScreen'),
+    'game_over_screen': ('game_over_screen', 'GameOverScreen')
+}
+
+# Directory the game was launched from, for paths given by the player.
+launch_dir = os.getcwd()
+
+# Font directory, made the working directory when the game runs.
 fonts_dir = os.path.join(os.path.split(
     os.path.dirname(os.path.abspath(__file__)))[0], 'fonts')
-os.chdir(fonts_dir)
+
+# Directory for saved replays.
+replays_dir = os.path.join(os.path.dirname(fonts_dir), 'replays')
 
 
 class Game(arcade.Window):
     """Main application."""
 
-    def __init__(self, width, height, title, fullscreen=True):
+    def __init__(self, width, height, title, fullscreen=True,
+                 game_board=None):
         """
         Initialize the application.
 
         Call the parent constructor & override default arcade
         properties where required.
 
-        Define the game state, difficulty & theme defaults.
+        Define the game state, difficulty, board & theme defaults.
         """
         super().__init__(width, height, title)
         super().set_update_rate(1 / settings.FPS)
         super().set_mouse_visible(False)
         self.game_state = states.GAME_STATES['main_menu']
         self.mode = states.GAME_MODES['normal']
+        self.engine = None
         self.score = None
+        # Many-snake arena & the buffer that draws it, while one is played.
+        self.arena = None
+        self.arena_buffer = None
+        # Logic for each frame of the game being played, chosen when the
+        # game is set up so frames never check the kind of game.
+        self.play_frame = None
+        self.arena_snakes = settings.ARENA_SNAKES
+        # Computer player steering the snake, & whether new games use one.
+        self.autopilot = None
+        self.use_autopilot = False
+        # Game board & the camera that scrolls it.
+        self.set_board(game_board or board.Board())
+        # Fixed timestep frames & snake steps.
+        self.scheduler = scheduler.TickScheduler()
+        # Recording of the current game, or the replay being played back
+        # & its speed multiplier.
+        self.replay = None
+        self.player = None
+        self.replay_speed = fractions.Fraction(1)
+        # Top scores of every game mode, kept between games.
+        # Scores are written to the file by a thread of their own.
+        self.leaderboard = leaderboard.Leaderboard(
+            leaderboard.LEADERBOARD_FILE,
+            executor=concurrent.futures.ThreadPoolExecutor(
+                1, thread_name_prefix='leaderboard'))
         self.themes = colours.themes
         self.theme = colours.jungle
         arcade.set_background_color(self.theme['bg'])
+        # Draw calls made in the last frame.
+        self.draw_calls = 0
+        # Performance overlay.
+        self.show_perf = False
+        self.perf_lines = []
+        if settings.SHOW_DRAW_CALLS:
+            draw_calls.counter.install()
+        # Player turns, taken one per step, & the gamepads & joysticks
+        # sending them along with the keyboard.
+        self.input_queue = input_queue.InputQueue()
+        self.stick_directions = {}
+        self.joysticks = self.open_joysticks()
+        # Deferred screens built so far, by attribute name.
+        self.screens = {}
+        # Print the startup profile after the first frame & quit.
+        self.profile_startup = False
+
+    def open_joysticks(self):
+        """Open every gamepad & joystick, sending their events here."""
+        joysticks = arcade.get_joysticks()
+        for joystick in joysticks:
+            joystick.open()
+            joystick.push_handlers(self)
+        return joysticks
+
+    def set_board(self, game_board):
+        """Play on a game board, seen through a camera."""
+        self.board = game_board
+        self.camera = camera.Camera(game_board)
 
     def setup_screens(self):
-        """Set up the game screens."""
-        self.level = level_screen.LevelScreen(self.theme)
+        """
+        Set up the main menu.
+
+        Other screens are deferred, to show the main menu sooner.
+        """
         self.main_menu = main_menu_screen.MainMenuScreen(self.theme)
         self.start_title_loop = False
         self.pause_title_loop = False
-        self.game_over_screen = game_over_screen.GameOverScreen(self.theme)
+        self.arena = None
         # Instantiate snake & food objects in position for the main menu.
         self.snake_p1 = snake.Snake(self.theme, size=settings.CELL,
                                     speed=12, head_pos=[12, 27],
                                     direction='')
         self.food = food.Food(self.theme, settings.CELL,
                               self.snake_p1, pos=[6, 27])
+        self.scheduler.reset_distance()
+
+    def get_screen(self, name):
+        """Get a deferred screen, building it with the theme if needed."""
+        if name not in self.screens:
+            module_name, class_name = DEFERRED_SCREENS[name]
+            screen_class = getattr(importlib.import_module(module_name),
+                                   class_name)
+            self.screens[name] = screen_class(self.theme)
+        return self.screens[name]
+
+    @property
+    def level(self):
+        """Get the level screen."""
+        return self.get_screen('level')
+
+    @property
+    def game_over_screen(self):
+        """Get the game over screen."""
+        return self.get_screen('game_over_screen')
+
+    def build_next_screen(self):
+        """
+        Build one deferred screen not built yet, if any.
+
+        Called while the main menu is idle, so that starting a game does
+        not have to wait for its screens.
+        """
+        for name in DEFERRED_SCREENS:
+            if name not in self.screens:
+                self.get_screen(name)
+                return
 
-    def setup_game(self):
-        """Set up the game."""
-        # Instantiate snake & food objects in random positions for gameplay.
+    def setup_game(self, player=None, speed=1):
+        """
+        Set up the game.
+
+        Record the game, or play back a replay at a speed multiplier
+        when a ReplayPlayer is given.
+        """
+        import engine
+        import replay
+        self.arena = None
+        # Start a seeded headless game, with the scoring system for the
+        # game mode.
+        if player is None:
+            self.engine = engine.GameEngine(self.mode,
+                                            game_board=self.board)
+            self.replay = replay.Replay(self.mode, self.engine.seed,
+                                        board_size=(self.board.width,
+                                                    self.board.height))
+        else:
+            self.engine = player.engine
+            self.replay = None
+        self.player = player
+        self.play_frame = self.solo_mode
+        self.input_queue.clear()
+        self.autopilot = None
+        if self.use_autopilot and player is None:
+            import autopilot
+            self.autopilot = autopilot.Autopilot(self.engine)
+        self.replay_speed = fractions.Fraction(speed).limit_denominator(1000)
+        self.score = self.engine.score
+        self.scheduler.reset_distance()
+        # Instantiate snake & food objects in the engine's positions.
         self.snake_p1 = snake.Snake(
-            self.theme, size=settings.CELL, speed=6,
-            head_pos=[self.get_random_board_coords(pad_left=2,
-                                                   pad_right=2)[0],
-                      self.get_random_board_coords(pad_bottom=5,
-                                                   pad_top=14)[1]]
+            self.theme, size=self.board.cell, speed=self.engine.speed,
+            head_pos=list(self.engine.head_pos),
+            direction=self.engine.direction
             )
-        self.spawn_food_randomly(self.snake_p1, self.food)
-        # Instantiate the appropriate scoring system.
-        if self.mode == states.GAME_MODES['easy']:
-            self.score = Score(50, None)
-        elif self.mode == states.GAME_MODES['normal']:
-            self.score = Score(100, 500)
-        elif self.mode == states.GAME_MODES['hard']:
-            self.score = Score(200, 600)
+        self.food = food.Food(self.theme, self.board.cell, self.snake_p1,
+                              pos=list(self.engine.food_pos))
+        # Speeds & milestone last streamed as events.
+        self.event_speeds = (self.engine.speed, self.engine.min_speed)
+        self.event_milestone = self.score.milestone_checkpoint
+        if self.replay is not None:
+            events.stream.emit('spawn', *self.engine.food_pos)
+
+    def setup_arena(self):
+        """
+        Set up a many-snake arena.
 
-    def menu_mode(self, delta_time):
+        The player controls the first snake & the computer steers the
+        rest. The score shown is the player's.
+        """
+        import arena
+        import arena_buffer
+        self.arena = arena.ArenaEngine(self.arena_snakes, self.mode,
+                                       game_board=self.board)
+        self.replay = None
+        self.player = None
+        self.play_frame = self.arena_mode
+        self.input_queue.clear()
+        self.autopilot = None
+        self.score = self.arena.snakes[0].score
+        self.scheduler.reset_distance()
+        self.arena_buffer = arena_buffer.ArenaBuffer(self.board.cell)
+        self.arena_buffer.set_colours(self.theme)
+
+    def menu_mode(self):
         """
         Logic for running the main menu.
 
@@ -100,6 +276,16 @@ class Game(arcade.Window):
                 self.main_menu.timer = 0
                 self.pause_title_loop = False
                 self.snake_p1.direction = self.snake_p1.last_direction
+        # Step the snake for each cell it is due to travel, checking for
+        # food in every cell along the way.
+        if self.snake_p1.direction != '':
+            for step in range(self.scheduler.tick(self.snake_p1.speed)):
+                self.snake_p1.follow(self.main_menu.snake_track)
+                self.snake_p1.step()
+                self.feed_menu_snake()
+
+    def feed_menu_snake(self):
+        """Grow the main menu snake & move the food when food is eaten."""
         # Check for collisions with food.
         self.check_food_collisions(self.snake_p1, self.food.position)
         # Grow the snake when food is eaten.
@@ -122,45 +308,163 @@ class Game(arcade.Window):
                 6
                 )
             self.food.shape_list = self.food.create_food()
-        self.snake_p1.loop(
-            self.main_menu.snake_track[0],
-            self.main_menu.snake_track[1],
-            self.main_menu.snake_track[2],
-            self.main_menu.snake_track[3],
-        )
-        self.snake_p1.move(delta_time)
 
-    def normal_mode(self, delta_time):
+    def solo_mode(self):
         """
-        Logic for a gameplay mode aimed at intermediate players.
+        Logic for a one snake game.
 
-        Features a snake that speeds up once it reaches a milestone score.
+        The engine plays by the rules of the game mode, compiled when the
+        game starts (see modes.Rules), so every mode shares this logic.
         """
-        # Check for collisions with food & border walls.
-        self.check_food_collisions(self.snake_p1, self.food.position)
-        self.check_wall_collisions(self.snake_p1)
-        # Check for a collision with the snake's own body.
-        self.snake_p1.check_body_collisions()
-        # Grow the snake & advance the game state when food is eaten.
-        if self.snake_p1.eating:
-            self.snake_p1.grow_body()
-            self.food.food_eaten += 1
-            self.snake_p1.eating = False
-            # Spawn food.
-            self.spawn_food_randomly(self.snake_p1, self.food)
-            # Update the score & score display string.
-            self.score.add_food_points()
-            self.score.get_padded_str()
-            # Increase snake speed (if below max) if a milestone is reached.
-            if self.score.check_milestone():
-                # if self.snake_p1.speed < self.snake_p1.max_speed:
-                self.snake_p1.increase_speed(1)
-                self.snake_p1.raise_min_speed(1)
+        # Step the engine for each cell the snake is due to travel. Every
+        # cell is checked for food & collisions, however many are due.
+        if not self.engine.dead:
+            # Plan the autopilot's moves within its share of the frame.
+            if self.autopilot is not None:
+                deadline = time.perf_counter() + self.autopilot.budget
+                self.autopilot.think(deadline)
+            for step in range(self.scheduler.tick(
+                    self.engine.speed * self.replay_speed.numerator,
+                    self.replay_speed.denominator)):
+                self.take_turn()
+                if self.autopilot is not None:
+                    self.steer(deadline)
+                outcome = self.step_engine()
+                if self.replay is not None and events.stream.subscribers:
+                    self.emit_step_events(outcome)
+                if outcome in (states.STEP_OUTCOMES['dead'],
+                               states.STEP_OUTCOMES['won']):
+                    break
         # Flash the snake body when dead.
-        if self.snake_p1.dead:
+        if self.engine.dead:
             self.snake_p1.flash_body(30, self.theme)
             self.game_state = states.GAME_STATES['game_over']
-        self.snake_p1.move(delta_time)
+        # End the game once the snake fills the game board.
+        elif self.engine.won:
+            self.game_state = states.GAME_STATES['game_over']
+
+    def emit_step_events(self, outcome):
+        """
+        Raise gameplay events for the outcome of an engine step.
+
+        Only called for the game being played, not for replays played
+        back.
+        """
+        if outcome in (states.STEP_OUTCOMES['ate'],
+                       states.STEP_OUTCOMES['won']):
+            events.stream.emit('eat', self.score.score,
+                               *self.engine.head_pos)
+            if self.score.milestone_checkpoint != self.event_milestone:
+                self.event_milestone = self.score.milestone_checkpoint
+                events.stream.emit('milestone', self.score.score)
+            self.emit_speed_event()
+        if outcome == states.STEP_OUTCOMES['ate']:
+            events.stream.emit('spawn', *self.engine.food_pos)
+        elif outcome == states.STEP_OUTCOMES['won']:
+            events.stream.emit('won', self.score.score, self.engine.ticks)
+        elif outcome == states.STEP_OUTCOMES['dead']:
+            import engine
+            events.stream.emit(
+                'death', self.score.score, self.engine.ticks,
+                engine.DEATH_CAUSES.index(self.engine.death_cause))
+
+    def emit_speed_event(self):
+        """Raise a speed event if the snake's speeds have changed."""
+        speeds = (self.engine.speed, self.engine.min_speed)
+        if speeds != self.event_speeds:
+            self.event_speeds = speeds
+            events.stream.emit('speed', *speeds)
+
+    def arena_mode(self):
+        """
+        Logic for the many-snake arena.
+
+        Step every snake for each cell they are due to travel, ending
+        the game once the player's snake dies. The other snakes play on
+        behind the game over screen.
+        """
+        for step in range(self.scheduler.tick(self.arena.speed)):
+            self.take_turn()
+            actions = self.arena.get_greedy_actions(skip=(0,))
+            self.arena.step(actions)
+        if self.arena.snakes[0].dead:
+            self.game_state = states.GAME_STATES['game_over']
+
+    def steer(self, deadline):
+        """
+        Let the autopilot choose the next direction.
+
+        Turns are sent as player inputs, so they are recorded in the
+        replay like any other.
+        """
+        direction = self.autopilot.decide(deadline)
+        if direction != self.engine.direction:
+            self.apply_input(direction)
+
+    def take_turn(self):
+        """Apply the player's next queued turn, if any, before a step."""
+        direction = self.input_queue.pop()
+        if direction is not None:
+            self.apply_input(direction)
+
+    def get_player_direction(self):
+        """Get the direction the player's snake is travelling."""
+        if self.arena is not None:
+            return self.arena.snakes[0].direction
+        return self.engine.direction
+
+    def step_engine(self):
+        """
+        Advance the game engine by one "cell".
+
+        Mirror the engine state in the snake & food objects for drawing.
+        """
+        if self.player is not None:
+            outcome = self.player.step()
+        else:
+            outcome = self.engine.step()
+        grow = len(self.engine.body) > len(self.snake_p1.body_segment_list)
+        self.snake_p1.advance(self.engine.head_pos, self.engine.direction,
+                              grow)
+        self.snake_p1.dead = self.engine.dead
+        # No food is left when the board is full.
+        if outcome == states.STEP_OUTCOMES['ate']:
+            self.food.position = list(self.engine.food_pos)
+            self.food.shape_list = self.food.create_food()
+        elif self.replay is not None and \
+                outcome in (states.STEP_OUTCOMES['dead'],
+                            states.STEP_OUTCOMES['won']):
+            self.save_replay()
+            self.record_score()
+        return outcome
+
+    def record_score(self):
+        """Add the score of the finished game to the leaderboard."""
+        name = 'player' if self.autopilot is None else 'autopilot'
+        self.leaderboard.add(self.mode, name, self.score.score,
+                             self.engine.ticks, self.engine.seed)
+        self.leaderboard.save()
+
+    def save_replay(self):
+        """Finish the replay of the game & save it, when enabled."""
+        self.replay.finish(self.engine)
+        if settings.SAVE_REPLAYS:
+            os.makedirs(replays_dir, exist_ok=True)
+            self.replay.save(os.path.join(
+                replays_dir, '{:016x}.replay'.format(self.engine.seed)))
+
+    def play_replay(self, recording, speed=1):
+        """
+        Play back a replay in its game mode, at a speed multiplier.
+
+        Keep the cell size, but play on a board of the recorded size.
+        """
+        self.mode = recording.mode
+        width, height = recording.board_size
+        self.set_board(board.Board(width, height, self.board.cell))
+        import replay
+        self.setup_game(replay.ReplayPlayer(recording, self.board), speed)
+        self.game_state = states.GAME_STATES['running']
 
     def get_next_theme(self):
         """Cycle through application colour themes."""
@@ -171,6 +475,11 @@ class Game(arcade.Window):
         next_theme = self.themes[theme_index]
         return next_theme
 
+    def get_next_mode(self):
+        """Cycle through game modes."""
+        modes = list(states.GAME_MODES.values())
+        return modes[(modes.index(self.mode) + 1) % len(modes)]
+
     def get_random_theme(self):
         """Choose a random theme which is not in use."""
         random_theme = random.choice(self.themes)
@@ -181,91 +490,22 @@ class Game(arcade.Window):
     def switch_theme(self, theme):
         """Change object colours to match the current application theme."""
         self.theme = theme
+        events.stream.emit('theme', self.themes.index(theme))
         self.main_menu.update_theme(theme)
-        self.level.update_theme(theme)
+        for screen in self.screens.values():
+            screen.update_theme(theme)
         self.snake_p1.update_theme(theme)
         self.food.update_theme(theme)
-        self.game_over_screen.update_theme(theme)
+        if self.arena_buffer is not None:
+            self.arena_buffer.set_colours(theme)
 
-    def get_random_board_coords(self, pad_left=0, pad_right=0,
-                                pad_bottom=0, pad_top=0):
-        """
-        Get random coordinates on the game board.
-
-        Allow for padding from the game board edges.
-        """
-        x = random.randint((settings.BOARD_LEFT + pad_left),
-                           (settings.BOARD_RIGHT - pad_right))
-        y = random.randint((settings.BOARD_BOTTOM + pad_bottom),
-                           (settings.BOARD_TOP - pad_top))
-        return x, y
-
-    def spawn_food_randomly(self, snake, food):
-        """
-        Spawn a food object on the game board in a random position.
-
-        Respawn if food is placed inside the snake.
+    def place_food_along_track(self, p1_snake, track, distance):
         """
-        new_pos_xy = [self.get_random_board_coords()[0],
-                      self.get_random_board_coords()[1]]
-        food.position = new_pos_xy
-        # Respawn if food position is inside of the snake.
-        while food.position in snake.body_segment_list:
-            self.spawn_food_randomly(snake, food)
-        food.shape_list = food.create_food()
-        food.food_spawned += 1
-        return new_pos_xy
+        Place food ahead of a snake following a track.
 
-    def place_food_along_track(self, p1_snake, track, distance):
+        Placement distance in game grid "cells" along the track.
         """
-        Place food ahead of the snake as it loops clockwise around a "track".
-
-        Track coordinates (four rectangular points) are required as a
-        tuple containing four (x, y) tuples.
-
-        Placement distance in game grid "cells".
-        """
-        global new_pos_x
-        global new_pos_y
-        top_l = (track[0])
-        top_r = (track[1])
-        bot_r = (track[2])
-        bot_l = (track[3])
-        if p1_snake.direction == 'LEFT':
-            # Place food ahead of the snake along the axis it travels.
-            new_pos_x = p1_snake.head_pos[0] - distance
-            new_pos_y = p1_snake.head_pos[1]
-            # If the new postion is past the bottom left corner point.
-            if new_pos_x < bot_l[0]:
-                # Get the amount of overshoot.
-                overshoot = abs(new_pos_x - bot_l[0])
-                # Turn the corner by going up along the y-axis.
-                new_pos_y = bot_l[1] + overshoot
-                # Limit travel along the x-axis to the course corner point.
-                new_pos_x = bot_l[0] - 1
-        elif p1_snake.direction == 'RIGHT':
-            new_pos_x = p1_snake.head_pos[0] + distance
-            new_pos_y = p1_snake.head_pos[1]
-            if new_pos_x > top_r[0]:
-                overshoot = abs(new_pos_x - top_r[0])
-                new_pos_y = top_r[1] - overshoot
-                new_pos_x = top_r[0] + 1
-        elif p1_snake.direction == 'UP':
-            new_pos_y = p1_snake.head_pos[1] + distance
-            new_pos_x = p1_snake.head_pos[0]
-            if new_pos_y > top_l[1]:
-                overshoot = abs(new_pos_y - top_l[1])
-                new_pos_x = top_l[0] + overshoot
-                new_pos_y = top_l[1] + 1
-        elif p1_snake.direction == 'DOWN':
-            new_pos_y = p1_snake.head_pos[1] - distance
-            new_pos_x = p1_snake.head_pos[0]
-            if new_pos_y < bot_r[1]:
-                overshoot = abs(new_pos_y - bot_r[1])
-                new_pos_x = bot_r[0] - overshoot
-                new_pos_y = bot_r[1] - 1
-        new_food_pos = [new_pos_x, new_pos_y]
-        return new_food_pos
+        return list(track.get_cell(p1_snake.track_place + distance))
 
     def check_food_collisions(self, snake, food):
         """Check if the snake has collided with a piece of food."""
@@ -273,38 +513,74 @@ class Game(arcade.Window):
                 snake.head_pos[1] == food[1]:
             snake.eating = True
 
-    def check_wall_collisions(self, snake):
-        """Check if the snake has collided with a wall."""
-        if snake.head_pos[0] < settings.BOARD_LEFT:
-            snake.dead = True
-        elif snake.head_pos[0] > settings.BOARD_RIGHT:
-            snake.dead = True
-        elif snake.head_pos[1] > settings.BOARD_TOP:
-            snake.dead = True
-        elif snake.head_pos[1] < settings.BOARD_BOTTOM:
-            snake.dead = True
-
     def draw_game(self):
-        """Draw all in game objects."""
+        """
+        Draw all in game objects.
+
+        Scroll the board to follow the snake head & leave out objects
+        that are out of view.
+        """
         arcade.set_background_color(self.theme['bg'])
         self.level.draw(self.score.get_padded_str())
-        self.snake_p1.shape_list.draw()
-        self.food.shape_list.draw()
+        if self.arena is not None:
+            self.draw_arena()
+            return
+        self.camera.follow(self.engine.head_pos)
+        self.camera.use()
+        self.snake_p1.draw(self.camera)
+        if self.engine.food_pos is not None and \
+                self.camera.is_visible(self.engine.food_pos):
+            self.food.shape_list.center_x = -self.camera.offset[0]
+            self.food.shape_list.center_y = -self.camera.offset[1]
+            self.food.shape_list.draw()
+        self.camera.release()
+
+    def draw_arena(self):
+        """
+        Draw every arena snake & piece of food in one draw call.
+
+        Follow the player's snake while it is alive.
+        """
+        player_snake = self.arena.snakes[0]
+        if not player_snake.dead:
+            self.camera.follow(player_snake.head_pos)
+        self.camera.use()
+        self.arena_buffer.draw(self.arena, self.camera.offset,
+                               self.camera.get_view_rect(self.board.cell))
+        self.camera.release()
 
     def draw_main_menu(self):
         """Draw all main menu objects."""
         arcade.set_background_color(self.theme['bg'])
-        self.main_menu.draw()
-        self.snake_p1.shape_list.draw()
+        self.main_menu.draw(self.mode, self.leaderboard.get_best(self.mode))
+        self.snake_p1.draw()
         self.food.shape_list.draw()
 
     def draw_game_over_screen(self):
         """Draw game over objects as an overlay on top of gameplay."""
         self.draw_game()
-        self.game_over_screen.draw()
+        self.game_over_screen.draw(
+            self.leaderboard.get_best(self.mode))
 
     def on_draw(self):
-        """Python Arcade Library method to render the screen."""
+        """
+        Python Arcade Library method to render the screen.
+
+        Time the frame, leaving the performance overlay out.
+        """
+        self.draw_frame()
+        if self.show_perf:
+            self.draw_perf()
+        perf.profiler.end_frame(len(self.snake_p1.body_segment_list),
+                                self.themes.index(self.theme))
+        if self.profile_startup and perf.profiler.frames == 1:
+            perf.startup.mark('first frame')
+            print('\n'.join(perf.startup.get_report()))
+            arcade.close_window()
+
+    @perf.timed('on_draw')
+    def draw_frame(self):
+        """Render all objects for the current game state."""
         arcade.start_render()
 
         # Draw the main menu screen.
@@ -320,25 +596,63 @@ class Game(arcade.Window):
         elif self.game_state == 'game_over':
             self.draw_game_over_screen()
 
+        if settings.SHOW_DRAW_CALLS:
+            self.show_draw_calls()
+
+    def draw_perf(self):
+        """
+        Draw the performance overlay.
+
+        Refresh the text four times a second, so it can be read. Show
+        the input to move latency below the frame timings.
+        """
+        if not self.perf_lines or \
+                perf.profiler.frames % (settings.FPS // 4) == 0:
+            self.perf_lines = perf.profiler.get_summary() + [
+                self.input_queue.get_summary()]
+        for i, line in enumerate(self.perf_lines):
+            text_cache.draw_text(line, 8, settings.WINDOW_HEIGHT - 16 - i * 14,
+                                 self.theme['small_text'], 10,
+                                 font_name=self.main_menu.font)
+
+    def show_draw_calls(self):
+        """Show the number of draw calls made this frame in the title."""
+        frame_draw_calls = draw_calls.counter.end_frame()
+        if frame_draw_calls != self.draw_calls:
+            self.draw_calls = frame_draw_calls
+            self.set_caption('{} - {} draw calls'.format(
+                settings.WINDOW_TITLE, frame_draw_calls))
+
+    @perf.timed('update')
     def update(self, delta_time):
-        """Python Arcade Library method to handle game logic."""
+        """
+        Python Arcade Library method to handle game logic.
+
+        Run the game logic once for each fixed timestep frame due, so
+        gameplay does not depend on the rate the window updates at.
+        """
+        for frame in range(self.scheduler.advance(delta_time)):
+            self.update_frame()
+        # Build deferred screens once the main menu is showing.
+        if self.game_state == 'main_menu' and perf.profiler.frames:
+            self.build_next_screen()
+
+    def update_frame(self):
+        """Handle game logic for one fixed timestep frame."""
         if self.game_state == 'main_menu':
-            self.menu_mode(delta_time)
-        elif self.game_state == 'running':
-            if self.mode == 'normal':
-                self.normal_mode(delta_time)
-        elif self.game_state == 'paused':
-            if self.mode == 'normal':
-                self.normal_mode(delta_time)
-        elif self.game_state == 'game_over':
-            if self.mode == 'normal':
-                self.normal_mode(delta_time)
+            self.menu_mode()
+        # Games play on behind the game over screen.
+        elif self.game_state != 'paused':
+            self.play_frame()
 
     def handle_main_menu_input(self, key):
         """Handle input when the main menu is running."""
         if key == arcade.key.ENTER:
             self.setup_game()
             self.game_state = states.GAME_STATES['running']
+        elif key == arcade.key.A:
+            self.setup_arena()
+            self.game_state = states.GAME_STATES['running']
         elif key == arcade.key.T and not self.pause_title_loop:
             self.snake_p1.last_direction = self.snake_p1.direction
             self.snake_p1.direction = ''
@@ -349,38 +663,75 @@ class Game(arcade.Window):
             self.snake_p1.increase_speed(1)
         elif key == arcade.key.D:
             self.snake_p1.decrease_speed(1)
+        elif key == arcade.key.M:
+            self.mode = self.get_next_mode()
 
     def handle_gameplay_input(self, key):
         """Handle input when the game is running."""
-        # Get player's desired direction:
+        # Get player's desired direction & speed:
         if key == arcade.key.UP:
-            self.snake_p1.change_direction = 'UP'
+            self.send_input('UP')
         elif key == arcade.key.DOWN:
-            self.snake_p1.change_direction = 'DOWN'
+            self.send_input('DOWN')
         elif key == arcade.key.LEFT:
-            self.snake_p1.change_direction = 'LEFT'
+            self.send_input('LEFT')
         elif key == arcade.key.RIGHT:
-            self.snake_p1.change_direction = 'RIGHT'
+            self.send_input('RIGHT')
         elif key == arcade.key.S:
-            self.snake_p1.increase_speed(1)
+            self.send_input('FASTER')
         elif key == arcade.key.D:
-            self.snake_p1.decrease_speed(1)
-        # Pause the game.
+            self.send_input('SLOWER')
+        # Pause the game. The engine only steps while the game is running.
         elif key == arcade.key.P:
-            # Store the current direction.
-            self.snake_p1.last_direction = self.snake_p1.direction
-            # Stop the snake moving.
-            self.snake_p1.direction = ''
             self.game_state = 'paused'
+            events.stream.emit('pause', 1)
         elif key == arcade.key.T:
             self.switch_theme(self.get_next_theme())
+        # Hand the snake over to the autopilot & back.
+        elif key == arcade.key.O and self.arena is None and \
+                self.player is None:
+            if self.autopilot is None:
+                import autopilot
+                self.autopilot = autopilot.Autopilot(self.engine)
+            else:
+                self.autopilot = None
+
+    def send_input(self, action):
+        """
+        Send a player input.
+
+        Turns are queued & taken one per step. Other inputs are applied
+        straight away.
+        """
+        if action in states.DIRECTIONS:
+            self.input_queue.push(action, self.get_player_direction())
+        else:
+            self.apply_input(action)
+
+    def apply_input(self, action):
+        """
+        Apply a player input to the engine & record it in the replay.
+
+        Inputs are ignored while a replay is played back. Arena games
+        are not recorded.
+        """
+        import replay
+        if self.arena is not None:
+            if action in states.DIRECTIONS:
+                self.arena.snakes[0].change_direction = action
+            else:
+                replay.apply_input(self.arena, action)
+        elif self.player is None:
+            replay.apply_input(self.engine, action)
+            self.replay.record(self.engine.ticks, action)
+            if events.stream.subscribers:
+                self.emit_speed_event()
 
     def handle_pause_input(self, key):
         """Handle input when the game is paused."""
         if key == arcade.key.P:
-            # Continue the snake moving in the current direction.
-            self.snake_p1.direction = self.snake_p1.last_direction
             self.game_state = states.GAME_STATES['running']
+            events.stream.emit('pause', 0)
         elif key == arcade.key.T:
             self.switch_theme(self.get_next_theme())
 
@@ -388,7 +739,10 @@ class Game(arcade.Window):
         """Handle input when the game is over."""
         if key == arcade.key.Y:
             # Restart the game.
-            self.setup_game()
+            if self.arena is not None:
+                self.setup_arena()
+            else:
+                self.setup_game()
             self.game_state = states.GAME_STATES['running']
         elif key == arcade.key.N:
             self.setup_screens()
@@ -396,9 +750,52 @@ class Game(arcade.Window):
         elif key == arcade.key.T:
             self.switch_theme(self.get_next_theme())
 
+    def on_joyhat_motion(self, joystick, hat_x, hat_y):
+        """Turn with a gamepad's direction pad, like the arrow keys."""
+        key = JOYSTICK_KEYS.get((hat_x, hat_y))
+        if key is not None:
+            self.on_key_press(key, 0)
+
+    def on_joyaxis_motion(self, joystick, axis, value):
+        """
+        Turn with a joystick, like the arrow keys.
+
+        Turn once when the stick is pushed past the dead zone, along the
+        axis it is pushed furthest. Joystick y axes point down.
+        """
+        if axis not in ('x', 'y'):
+            return
+        x, y = joystick.x, -joystick.y
+        direction = (0, 0)
+        if max(abs(x), abs(y)) >= settings.JOYSTICK_DEAD_ZONE:
+            if abs(x) > abs(y):
+                direction = (1 if x > 0 else -1, 0)
+            else:
+                direction = (0, 1 if y > 0 else -1)
+        if direction != self.stick_directions.get(joystick):
+            self.stick_directions[joystick] = direction
+            self.on_joyhat_motion(joystick, *direction)
+
+    def on_joybutton_press(self, joystick, button):
+        """
+        Use gamepad buttons as keys.
+
+        The first button starts & restarts games, the second pauses &
+        resumes them.
+        """
+        if button == 0:
+            self.on_key_press(arcade.key.ENTER
+                              if self.game_state == 'main_menu'
+                              else arcade.key.Y, 0)
+        elif button == 1:
+            self.on_key_press(arcade.key.P, 0)
+
     def on_key_press(self, key, key_modifiers):
         """Python Arcade Library method to handle keyboard input."""
-        if self.game_state == 'main_menu':
+        # Toggle the performance overlay anywhere in the application.
+        if key == arcade.key.F1:
+            self.show_perf = not self.show_perf
+        elif self.game_state == 'main_menu':
             self.handle_main_menu_input(key)
         elif self.game_state == 'running':
             self.handle_gameplay_input(key)
@@ -408,48 +805,64 @@ class Game(arcade.Window):
             self.handle_game_over_input(key)
 
 
-class Score():
-    """Custom scoring system."""
-
-    def __init__(self, food_points, milestone_amount, score=0):
-        """Initialize the scoring system."""
-        self.score = score
-        self.food_points = food_points
-        self.milestone_amount = milestone_amount
-        self.milestone_checkpoint = 0
-
-    def add_food_points(self):
-        """Add the value of one food item to the score."""
-        self.score += self.food_points
-
-    def check_milestone(self):
-        """
-        Check if a milestone score has been reached.
-
-        Once reached, update the milestone total so that the next check
-        can be made accurately.
-
-        Return a Boolean value.
-        """
-        if self.milestone_amount is not None:
-            if self.score - self.milestone_amount == self.milestone_checkpoint:
-                self.milestone_checkpoint += self.milestone_amount
-                return True
-            else:
-                return False
-
-    def get_padded_str(self):
-        """Get a string for the score padded with leading zeros."""
-        padded_score_str = str(self.score).zfill(6)
-        return padded_score_str
-
-
 def main():
     """Run the application."""
+    parser = argparse.ArgumentParser(description=settings.WINDOW_TITLE)
+    parser.add_argument('--replay', help='play back a saved replay file')
+    parser.add_argument('--replay-speed', type=float, default=1,
+                        help='replay speed multiplier (default: 1)')
+    parser.add_argument('--perf-log',
+                        help='stream frame timings to a CSV or JSONL file')
+    parser.add_argument('--event-log',
+                        help='stream gameplay events to a binary or JSONL '
+                             'file')
+    parser.add_argument('--board', type=board.parse_size,
+                        help='game board size in cells, e.g. 1000x1000')
+    parser.add_argument('--cell', type=int, default=settings.CELL,
+                        help='cell size in pixels (default: %(default)s)')
+    parser.add_argument('--mode', choices=states.GAME_MODES,
+                        default=states.GAME_MODES['normal'],
+                        help='game mode, also chosen with M on the main menu '
+                             '(default: %(default)s)')
+    parser.add_argument('--autopilot', action='store_true',
+                        help='let the computer play every game, e.g. for '
+                             'demos')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print the time taken by each stage of '
+                             'starting up, then quit')
+    parser.add_argument('--arena', type=int, metavar='N',
+                        default=settings.ARENA_SNAKES,
+                        help='number of snakes in the arena, started with A '
+                             'on the main menu (default: %(default)s)')
+    args = parser.parse_args()
+    perf.startup.begin(started)
+    perf.startup.mark('imports')
+    os.chdir(fonts_dir)
+    width, height = args.board or (None, None)
+    if args.perf_log:
+        perf.profiler.open_log(os.path.join(launch_dir, args.perf_log))
+    if args.event_log:
+        events.stream.subscribe(
+            events.EventLog(os.path.join(launch_dir, args.event_log)))
     game = Game(settings.WINDOW_WIDTH, settings.WINDOW_HEIGHT,
-                settings.WINDOW_TITLE)
+                settings.WINDOW_TITLE,
+                game_board=board.Board(width, height, args.cell))
+    game.arena_snakes = args.arena
+    game.use_autopilot = args.autopilot
+    game.mode = states.GAME_MODES[args.mode]
+    game.profile_startup = args.profile_startup
+    perf.startup.mark('window')
     game.setup_screens()
+    perf.startup.mark('main menu')
+    if args.replay:
+        import replay
+        game.play_replay(
+            replay.Replay.load(os.path.join(launch_dir, args.replay)),
+            args.replay_speed)
     arcade.run()
+    game.leaderboard.close()
+    perf.profiler.close_log()
+    events.stream.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,333 @@
+"""Snake Arcade persistent vertex buffers for drawing snakes."""
+
+import arcade
+from arcade import shader
+import numpy as np
+import pyglet.gl as gl
+
+import board
+import settings
+
+# Vertex kinds, telling the shader which colour to use for each vertex.
+KIND_FILL = 0
+KIND_BORDER = 1
+KIND_PUPIL = 2
+KIND_EYE = 3
+
+# Vertex layout: position (x, y), (ring buffer slot, vertex kind), then
+# the centre of the body segment the vertex belongs to, for culling.
+VERTEX_FORMAT = '2f 2f 2f'
+VERTEX_ATTRIBUTES = ('in_vert', 'in_info', 'in_center')
+VERTEX_DTYPE = np.dtype([('vertex', 'f4', 2), ('info', 'f4', 2),
+                         ('center', 'f4', 2)])
+
+# Longest snake the buffers are first sized for. Buffers grow to fit
+# longer snakes, so huge boards do not allocate for a full board.
+MAX_INITIAL_CAPACITY = 4096
+
+# Everything is visible when no view is given.
+NO_VIEW = (-1e9, -1e9, 1e9, 1e9)
+
+# Vertices per body segment for the fill (two triangles) & the border
+# (a rectangle outline split into eight triangles).
+FILL_VERTICES = 6
+BORDER_VERTICES = 24
+
+VERTEX_SHADER = '''
+    #version 330
+    #define KIND_BORDER 1
+    #define KIND_PUPIL 2
+    uniform mat4 Projection;
+    uniform vec2 HeadPosition;
+    uniform int HeadSlot;
+    uniform int Length;
+    uniform int Capacity;
+    uniform vec4 HeadColour;
+    uniform vec4 BodyColour1;
+    uniform vec4 BodyColour2;
+    uniform vec4 BodyColour3;
+    uniform vec4 BorderColour;
+    uniform vec4 EyeColour;
+    uniform vec4 PupilColour;
+    uniform vec2 Offset;
+    uniform vec4 ViewRect;
+    in vec2 in_vert;
+    in vec2 in_info;
+    in vec2 in_center;
+    out vec4 v_color;
+    void main() {
+        int slot = int(in_info.x);
+        int kind = int(in_info.y);
+        vec2 position = in_vert;
+        if (kind >= KIND_PUPIL) {
+            // Eyes are stored relative to the head.
+            position += HeadPosition;
+            v_color = kind == KIND_PUPIL ? PupilColour : EyeColour;
+        } else {
+            // Count segments from the head around the ring buffer.
+            int index = (slot - HeadSlot + Capacity) % Capacity;
+            if (index >= Length || in_center.x < ViewRect.x ||
+                    in_center.y < ViewRect.y || in_center.x > ViewRect.z ||
+                    in_center.y > ViewRect.w) {
+                // Collapse segments retired from the tail or out of view.
+                gl_Position = vec4(2.0, 2.0, 2.0, 1.0);
+                v_color = vec4(0.0);
+                return;
+            }
+            if (kind == KIND_BORDER) {
+                v_color = BorderColour;
+            } else if (index == 0) {
+                v_color = HeadColour;
+            } else if (index % 3 == 1) {
+                v_color = BodyColour1;
+            } else if (index % 3 == 2) {
+                v_color = BodyColour2;
+            } else {
+                v_color = BodyColour3;
+            }
+        }
+        gl_Position = Projection * vec4(position - Offset, 0.0, 1.0);
+    }
+'''
+
+FRAGMENT_SHADER = '''
+    #version 330
+    in vec4 v_color;
+    out vec4 f_color;
+    void main() {
+        f_color = v_color;
+    }
+'''
+
+# Compiled once & shared by every snake buffer.
+_program = None
+
+
+def get_program():
+    """Get the shader program used to draw snakes."""
+    global _program
+    if _program is None:
+        _program = shader.program(vertex_shader=VERTEX_SHADER,
+                                  fragment_shader=FRAGMENT_SHADER)
+    return _program
+
+
+def get_board_capacity(game_board):
+    """
+    Get the longest snake the game board can hold.
+
+    Allow for a head that has moved into a wall.
+    """
+    return game_board.size + 1
+
+
+def get_rectangle_triangles(center_x, center_y, width, height):
+    """Get six vertices for a filled rectangle as two triangles."""
+    left = center_x - width / 2
+    right = center_x + width / 2
+    bottom = center_y - height / 2
+    top = center_y + height / 2
+    return [(left, bottom), (left, top), (right, bottom),
+            (left, top), (right, bottom), (right, top)]
+
+
+def get_outline_triangles(center_x, center_y, width, height, border_width):
+    """
+    Get twenty four vertices for a rectangle outline as triangles.
+
+    Match the outline drawn by arcade.create_rectangle_outline().
+    """
+    outer_x = width / 2 + border_width / 2
+    outer_y = height / 2 + border_width / 2
+    inner_x = width / 2 - border_width / 2
+    inner_y = height / 2 - border_width / 2
+    strip = [(-outer_x, outer_y), (-inner_x, inner_y),
+             (outer_x, outer_y), (inner_x, inner_y),
+             (outer_x, -outer_y), (inner_x, -inner_y),
+             (-outer_x, -outer_y), (-inner_x, -inner_y),
+             (-outer_x, outer_y), (-inner_x, inner_y)]
+    triangles = []
+    for i in range(len(strip) - 2):
+        triangles.extend(strip[i:i + 3])
+    return [(center_x + x, center_y + y) for x, y in triangles]
+
+
+def get_eye_rectangles(direction, size):
+    """
+    Get two eye rectangles relative to the centre of the head.
+
+    Return (x, y, width, height) for eyes facing in any direction the
+    snake can travel, even when no direction is set.
+    """
+    if direction == 'DOWN':
+        return [(-size / 3, -size / 12, size / 4, size / 3),
+                (size / 3, -size / 12, size / 4, size / 3)]
+    elif direction == 'LEFT':
+        return [(-size / 10, size / 3, size / 3, size / 4),
+                (-size / 10, -size / 3, size / 3, size / 4)]
+    elif direction == 'RIGHT':
+        return [(size / 10, size / 3, size / 3, size / 4),
+                (size / 10, -size / 3, size / 3, size / 4)]
+    # Facing up, or stationary e.g. the game is paused.
+    return [(-size / 3, size / 12, size / 4, size / 3),
+            (size / 3, size / 12, size / 4, size / 3)]
+
+
+def create_vertices(points, slot, kind, center=(0, 0)):
+    """Pack a list of points into vertex data for the shader."""
+    vertices = np.zeros(len(points), dtype=VERTEX_DTYPE)
+    vertices['vertex'] = points
+    vertices['info'] = (slot, kind)
+    vertices['center'] = center
+    return vertices
+
+
+class SnakeBuffer():
+    """
+    A persistent vertex buffer for drawing one snake.
+
+    Body segments live in a ring buffer on the GPU, sized for the
+    longest snake. Moving the snake writes only the new head, while
+    the tail is retired by shortening the length the shader draws, so
+    the cost of a step does not depend on the snake length. Eyes are
+    stored relative to the head & re-uploaded only when the snake
+    changes direction.
+
+    Segment fills, segment borders & eyes share one buffer, laid out in
+    that (stacking) order, so the whole snake is one draw call.
+
+    Segments outside the view given to draw() are collapsed by the
+    shader, so long snakes on large boards only fill what is on screen.
+    """
+
+    def __init__(self, capacity=None, size=settings.CELL):
+        """
+        Initialize the buffers.
+
+        Size them to hold the longest snake on the default game board,
+        up to MAX_INITIAL_CAPACITY segments.
+        """
+        self.size = size
+        self.program = get_program()
+        self.colours = {}
+        self.eye_direction = None
+        self.head_position = (0, 0)
+        self.create_buffers(capacity or min(
+            get_board_capacity(board.Board()), MAX_INITIAL_CAPACITY))
+
+    def create_buffers(self, capacity):
+        """Allocate a GPU buffer for a snake of up to capacity segments."""
+        self.capacity = capacity
+        self.head_slot = 0
+        self.length = 0
+        stride = VERTEX_DTYPE.itemsize
+        # Byte offsets of the border & eye regions.
+        self.border_offset = capacity * FILL_VERTICES * stride
+        self.eye_offset = self.border_offset + (
+            capacity * BORDER_VERTICES * stride)
+        eye_size = (FILL_VERTICES + BORDER_VERTICES) * 2 * stride
+        # Zeroed vertices make empty slots collapse to nothing.
+        self.vbo = shader.Buffer(bytes(self.eye_offset + eye_size),
+                                 usage='dynamic')
+        self.vao = shader.vertex_array(
+            self.program,
+            [shader.BufferDescription(self.vbo, VERTEX_FORMAT,
+                                      VERTEX_ATTRIBUTES)])
+        self.eye_direction = None
+
+    def set_colours(self, head, body_1, body_2, body_3, border, eye, pupil):
+        """Set the snake colours. Only shader uniforms change."""
+        self.colours = {
+            'HeadColour': head,
+            'BodyColour1': body_1,
+            'BodyColour2': body_2,
+            'BodyColour3': body_3,
+            'BorderColour': border,
+            'EyeColour': eye,
+            'PupilColour': pupil
+        }
+
+    def write_segment(self, slot, position):
+        """Write the fill & border vertices of one body segment."""
+        fill = create_vertices(
+            get_rectangle_triangles(position[0], position[1],
+                                    self.size, self.size),
+            slot, KIND_FILL, position)
+        border = create_vertices(
+            get_outline_triangles(position[0], position[1],
+                                  self.size, self.size, 2),
+            slot, KIND_BORDER, position)
+        self.vbo.write(fill.tobytes(), slot * fill.nbytes)
+        self.vbo.write(border.tobytes(),
+                       self.border_offset + slot * border.nbytes)
+
+    def rebuild(self, grid_coords):
+        """
+        Upload every body segment, head first.
+
+        Grow the buffers when the snake no longer fits.
+        """
+        if len(grid_coords) > self.capacity:
+            self.create_buffers(max(len(grid_coords), self.capacity * 2))
+        fills = [create_vertices(
+                    get_rectangle_triangles(x, y, self.size, self.size),
+                    slot, KIND_FILL, (x, y))
+                 for slot, (x, y) in enumerate(grid_coords)]
+        borders = [create_vertices(
+                      get_outline_triangles(x, y, self.size, self.size, 2),
+                      slot, KIND_BORDER, (x, y))
+                   for slot, (x, y) in enumerate(grid_coords)]
+        if fills:
+            self.vbo.write(np.concatenate(fills).tobytes())
+            self.vbo.write(np.concatenate(borders).tobytes(),
+                           self.border_offset)
+        self.head_slot = 0
+        self.length = len(grid_coords)
+        if grid_coords:
+            self.head_position = grid_coords[0]
+
+    def push_head(self, position):
+        """Add a new head segment in front of the current head."""
+        self.head_slot = (self.head_slot - 1) % self.capacity
+        self.length += 1
+        self.head_position = position
+        self.write_segment(self.head_slot, position)
+
+    def pop_tail(self):
+        """Retire the last body segment (the "tail")."""
+        self.length -= 1
+
+    def set_eyes(self, direction):
+        """Upload eye geometry for the direction the snake faces."""
+        pupils = []
+        borders = []
+        for x, y, width, height in get_eye_rectangles(direction, self.size):
+            pupils.extend(get_rectangle_triangles(x, y, width, height))
+            borders.extend(get_outline_triangles(x, y, width, height, 1))
+        eyes = np.concatenate([create_vertices(pupils, 0, KIND_PUPIL),
+                               create_vertices(borders, 0, KIND_EYE)])
+        self.vbo.write(eyes.tobytes(), self.eye_offset)
+        self.eye_direction = direction
+
+    def draw(self, offset=(0, 0), view=NO_VIEW):
+        """
+        Draw the whole snake in a single draw call.
+
+        Shift the snake by an offset in pixels, e.g. to scroll a large
+        board. Only draw body segments centred inside the view, given as
+        (left, bottom, right, top) in pixels before the offset.
+        """
+        with self.program:
+            self.program['Projection'] = arcade.get_projection().flatten()
+            self.program['Offset'] = offset
+            self.program['ViewRect'] = view
+            self.program['HeadPosition'] = self.head_position
+            self.program['HeadSlot'] = self.head_slot
+            self.program['Length'] = self.length
+            self.program['Capacity'] = self.capacity
+            for name, colour in self.colours.items():
+                self.program[name] = arcade.get_four_float_color(colour)
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        with self.vao:
+            self.vao.render(gl.GL_TRIANGLES)
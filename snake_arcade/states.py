@@ -12,3 +12,26 @@ GAME_MODES = {
     'normal': 'normal',
     'hard': 'hard'
 }
+
+# Game grid "cell" movement for each direction the snake can travel.
+DIRECTIONS = {
+    'UP': (0, 1),
+    'DOWN': (0, -1),
+    'LEFT': (-1, 0),
+    'RIGHT': (1, 0)
+}
+
+OPPOSITE_DIRECTIONS = {
+    'UP': 'DOWN',
+    'DOWN': 'UP',
+    'LEFT': 'RIGHT',
+    'RIGHT': 'LEFT'
+}
+
+# Results of a single game engine step.
+STEP_OUTCOMES = {
+    'moved': 'moved',
+    'ate': 'ate',
+    'dead': 'dead',
+    'won': 'won'
+}
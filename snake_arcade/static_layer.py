@@ -0,0 +1,155 @@
+"""Snake Arcade cached static screen layers."""
+
+from ctypes import byref
+
+import arcade
+from arcade import shader
+import numpy as np
+import pyglet.gl as gl
+
+import settings
+
+VERTEX_SHADER = '''
+    #version 330
+    in vec2 in_vert;
+    in vec2 in_uv;
+    out vec2 v_uv;
+    void main() {
+        gl_Position = vec4(in_vert, 0.0, 1.0);
+        v_uv = in_uv;
+    }
+'''
+
+FRAGMENT_SHADER = '''
+    #version 330
+    uniform sampler2D Texture;
+    in vec2 v_uv;
+    out vec4 f_color;
+    void main() {
+        f_color = texture(Texture, v_uv);
+    }
+'''
+
+# Full window quad as a triangle strip: (x, y) in clip space, then (u, v).
+QUAD_VERTICES = np.array([-1.0, -1.0, 0.0, 0.0,
+                          1.0, -1.0, 1.0, 0.0,
+                          -1.0, 1.0, 0.0, 1.0,
+                          1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+
+# Compiled once & shared by every static layer.
+_program = None
+_quad = None
+
+# Rendered layers, shared by screens with the same layout.
+_layers = {}
+
+
+def get_layer(layout):
+    """Get the static layer shared by every screen with a layout."""
+    if layout not in _layers:
+        _layers[layout] = StaticLayer()
+    return _layers[layout]
+
+
+def get_quad():
+    """Get the shader program & vertex array used to draw layers."""
+    global _program, _quad
+    if _quad is None:
+        _program = shader.program(vertex_shader=VERTEX_SHADER,
+                                  fragment_shader=FRAGMENT_SHADER)
+        vbo = shader.buffer(QUAD_VERTICES.tobytes())
+        _quad = shader.vertex_array(
+            _program,
+            [shader.BufferDescription(vbo, '2f 2f', ('in_vert', 'in_uv'))])
+    return _program, _quad
+
+
+def get_framebuffer_size():
+    """Get the size of the window framebuffer in pixels."""
+    window = arcade.get_window()
+    if hasattr(window, 'get_framebuffer_size'):
+        return window.get_framebuffer_size()
+    return settings.WINDOW_WIDTH, settings.WINDOW_HEIGHT
+
+
+class StaticLayer():
+    """
+    Shapes that never move, rendered once into an offscreen texture.
+
+    The texture is drawn to the screen as a single quad each frame &
+    only rendered again when the colour theme changes. Colours are kept
+    premultiplied by alpha, so layers with transparent shapes (e.g. an
+    overlay) blend over the frame exactly as the shapes would.
+    """
+
+    def __init__(self):
+        """Initialize an empty layer."""
+        self.theme = None
+        self.texture = None
+        self.framebuffer = None
+
+    def create_framebuffer(self):
+        """Create a framebuffer that renders into the layer texture."""
+        width, height = get_framebuffer_size()
+        self.texture = shader.texture(
+            (width, height), 4, np.zeros((height, width, 4), dtype=np.uint8))
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER,
+                           gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER,
+                           gl.GL_NEAREST)
+        self.framebuffer = gl.GLuint()
+        gl.glGenFramebuffers(1, byref(self.framebuffer))
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.framebuffer)
+        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0,
+                                  gl.GL_TEXTURE_2D, self.texture.texture_id,
+                                  0)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+
+    def update(self, theme, create_shapes):
+        """
+        Render the layer for a colour theme.
+
+        Shapes are only created & rendered when the theme differs from
+        the one already in the layer.
+        """
+        if theme is self.theme:
+            return
+        self.render(create_shapes())
+        self.theme = theme
+
+    def render(self, shape_list):
+        """Render a ShapeElementList into the layer texture."""
+        if self.framebuffer is None:
+            self.create_framebuffer()
+        # Remember the window viewport & clear colour.
+        viewport = (gl.GLint * 4)()
+        gl.glGetIntegerv(gl.GL_VIEWPORT, viewport)
+        clear_colour = (gl.GLfloat * 4)()
+        gl.glGetFloatv(gl.GL_COLOR_CLEAR_VALUE, clear_colour)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.framebuffer)
+        gl.glViewport(0, 0, self.texture.width, self.texture.height)
+        gl.glClearColor(0, 0, 0, 0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        # Premultiply colours by alpha as the shapes are drawn.
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFuncSeparate(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA,
+                               gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+        for shape in shape_list:
+            with shape.vao:
+                shape.vao.render(shape.mode)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        gl.glViewport(*viewport)
+        gl.glClearColor(*clear_colour)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+    def draw(self):
+        """Draw the layer over the whole window."""
+        program, quad = get_quad()
+        self.texture.use(0)
+        with program:
+            program['Texture'] = 0
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+        with quad:
+            quad.render(gl.GL_TRIANGLE_STRIP)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
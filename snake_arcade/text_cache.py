@@ -0,0 +1,180 @@
+"""Snake Arcade cached text rendering."""
+
+import collections
+
+import arcade
+from arcade import shader
+from arcade import sprite_list
+import PIL.Image
+import PIL.ImageDraw
+import PIL.ImageFont
+
+import perf
+
+# Match the text size & anti-aliasing of arcade.draw_text(), which draws
+# text at a larger size, then shrinks it.
+FONT_SCALE = 1.25
+SUPERSAMPLE = 5
+
+# Number of text labels to keep before evicting the least recently used.
+MAX_LABELS = 128
+
+# Compiled once & shared by every label.
+_program = None
+
+
+def get_program():
+    """Get the shader program used to draw labels."""
+    global _program
+    if _program is None:
+        _program = shader.program(vertex_shader=sprite_list.VERTEX_SHADER,
+                                  fragment_shader=sprite_list.FRAGMENT_SHADER)
+    return _program
+
+
+@perf.startup.timed('fonts')
+def load_font(font_name, font_size):
+    """
+    Load a TrueType font, as arcade.draw_text() would.
+
+    Fonts are looked up by name, then by file name.
+    """
+    try:
+        return PIL.ImageFont.truetype(font_name, font_size)
+    except OSError:
+        return PIL.ImageFont.truetype('{}.ttf'.format(font_name), font_size)
+
+
+class GlyphAtlas():
+    """
+    Rendered glyphs for one font at one size.
+
+    Each character is rendered once, in white, & tinted to the text
+    colour when drawn. Labels in any colour share the same glyphs.
+    """
+
+    def __init__(self, font_name, font_size):
+        """Initialize an empty atlas for a font."""
+        self.font_name = font_name
+        self.font_size = font_size
+        self.font = load_font(font_name,
+                              int(font_size * FONT_SCALE * SUPERSAMPLE))
+        self.ascent, self.descent = self.font.getmetrics()
+        # Glyph textures by character. None for blank characters.
+        self.glyphs = {}
+
+    def get_glyph(self, character):
+        """Get the texture for a character, rendering it if needed."""
+        if character not in self.glyphs:
+            self.glyphs[character] = self.render_glyph(character)
+        return self.glyphs[character]
+
+    @perf.startup.timed('glyphs')
+    def render_glyph(self, character):
+        """Render a character into a texture."""
+        left, top, right, bottom = self.font.getbbox(character)
+        if right <= 0 or bottom <= top:
+            return None
+        width = right + SUPERSAMPLE - right % SUPERSAMPLE
+        height = self.ascent + self.descent
+        height += SUPERSAMPLE - height % SUPERSAMPLE
+        image = PIL.Image.new('RGBA', (width, height))
+        draw = PIL.ImageDraw.Draw(image)
+        draw.text((0, 0), character, (255, 255, 255), font=self.font)
+        image = image.resize((width // SUPERSAMPLE, height // SUPERSAMPLE),
+                             resample=PIL.Image.LANCZOS)
+        name = 'glyph-{}-{}-{}'.format(self.font_name, self.font_size,
+                                       ord(character))
+        return arcade.Texture(name, image)
+
+    def get_offset(self, text, index):
+        """Get the distance from the start of text to a character."""
+        return self.font.getlength(text[:index]) / SUPERSAMPLE
+
+
+class Label():
+    """
+    A line of text, laid out once from glyphs in an atlas.
+
+    The glyphs are drawn as one batch of sprites.
+    """
+
+    def __init__(self, text, atlas, colour):
+        """Lay out the text with its baseline at (0, 0)."""
+        self.text = text
+        self.position = (0, 0)
+        self.sprites = arcade.SpriteList(is_static=True)
+        self.sprites.program = get_program()
+        alpha = colour[3] if len(colour) > 3 else 255
+        # Sit the baseline where arcade.draw_text() puts it for capitals.
+        bottom = -atlas.descent / SUPERSAMPLE
+        for i, character in enumerate(text):
+            glyph = atlas.get_glyph(character)
+            if glyph is None:
+                continue
+            left = round(atlas.get_offset(text, i))
+            sprite = arcade.Sprite()
+            sprite.texture = glyph
+            sprite.center_x = left + glyph.width / 2
+            sprite.center_y = round(bottom) + glyph.height / 2
+            sprite.color = tuple(colour[:3])
+            sprite.alpha = alpha
+            self.sprites.append(sprite)
+
+    def draw(self, start_x, start_y):
+        """Draw the text starting from a position on the baseline."""
+        if (start_x, start_y) != self.position:
+            self.sprites.move(start_x - self.position[0],
+                              start_y - self.position[1])
+            self.position = (start_x, start_y)
+            self.sprites.vao = None
+        self.sprites.draw()
+
+
+class TextCache():
+    """
+    Laid out text labels, evicted least recently used first.
+
+    Labels are keyed by text, font, size & colour. Glyphs are kept per
+    font & size, so a new label only needs to render characters that
+    have not been seen before.
+    """
+
+    def __init__(self, max_labels=MAX_LABELS):
+        """Initialize an empty cache."""
+        self.max_labels = max_labels
+        self.labels = collections.OrderedDict()
+        self.atlases = {}
+
+    def __len__(self):
+        """Get the number of cached labels."""
+        return len(self.labels)
+
+    def get_atlas(self, font_name, font_size):
+        """Get the glyph atlas for a font at a size."""
+        key = (font_name, font_size)
+        if key not in self.atlases:
+            self.atlases[key] = GlyphAtlas(font_name, font_size)
+        return self.atlases[key]
+
+    def get_label(self, text, font_name, font_size, colour):
+        """Get a label, laying it out if it is not in the cache."""
+        key = (text, font_name, font_size, tuple(colour))
+        label = self.labels.get(key)
+        if label is not None:
+            self.labels.move_to_end(key)
+            return label
+        label = Label(text, self.get_atlas(font_name, font_size), colour)
+        self.labels[key] = label
+        if len(self.labels) > self.max_labels:
+            self.labels.popitem(last=False)
+        return label
+
+
+# Shared by every screen.
+cache = TextCache()
+
+
+def draw_text(text, start_x, start_y, colour, font_size, font_name):
+    """Draw a line of text from the cache, as arcade would draw it."""
+    cache.get_label(text, font_name, font_size, colour).draw(start_x, start_y)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""
+Snake Arcade self-play tournaments.
+
+Play many seeded headless games with a computer player, spread across
+every CPU core, & report the distributions of the results. Each game
+is played by one bot policy under the rules & scoring of one game mode.
+"""
+
+import argparse
+import collections
+import json
+import multiprocessing
+import random
+import statistics
+import sys
+
+import autopilot
+import board
+import engine
+import leaderboard
+import perf
+import states
+
+# Results reported for each game, as distributions.
+METRICS = ('score', 'length', 'ticks')
+# Percentiles shown for each distribution.
+PERCENTILES = (10, 50, 90)
+
+
+def get_greedy_action(game_engine):
+    """Choose a safe direction towards the food."""
+    head = game_engine.head_pos
+    food = game_engine.food_pos
+    choices = []
+    for direction, (dx, dy) in states.DIRECTIONS.items():
+        if direction == states.OPPOSITE_DIRECTIONS[game_engine.direction]:
+            continue
+        position = (head[0] + dx, head[1] + dy)
+        safe = not (game_engine.check_wall_collisions(position) or
+                    game_engine.occupied[position])
+        distance = abs(food[0] - position[0]) + abs(food[1] - position[1])
+        choices.append((not safe, distance, direction))
+    return min(choices)[2]
+
+
+def create_autopilot(game_engine):
+    """Create a policy planning every move in full with the autopilot."""
+    pilot = autopilot.Autopilot(game_engine)
+    return lambda: pilot.decide(float('inf'))
+
+
+def create_greedy(game_engine):
+    """Create a policy turning towards the food, avoiding collisions."""
+    return lambda: get_greedy_action(game_engine)
+
+
+def create_random(game_engine):
+    """
+    Create a policy turning at random, seeded by the game.
+
+    Use a separate random number generator, so the food is placed as
+    for other policies.
+    """
+    rng = random.Random(game_engine.seed)
+    directions = tuple(states.DIRECTIONS)
+    return lambda: rng.choice(directions)
+
+
+# Bot policies by name. Each creates a function choosing the next
+# direction for a game engine.
+POLICIES = {
+    'autopilot': create_autopilot,
+    'greedy': create_greedy,
+    'random': create_random
+}
+
+
+def play_game(game):
+    """
+    Play one headless game to the end.
+
+    The game is (policy, mode, seed, board size, maximum ticks). Games
+    where the snake goes as many ticks as there are board cells without
+    eating, or still going after the maximum ticks, end with the death
+    cause 'timeout', & won games with 'won'. A snake following a cycle
+    of the board reaches any free cell within that many ticks, so only
+    stalled games end early, without holding up a worker for long.
+
+    Return the result of the game as a dict.
+    """
+    policy, mode, seed, board_size, max_ticks = game
+    game_engine = engine.GameEngine(mode, seed, board.Board(*board_size))
+    choose = POLICIES[policy](game_engine)
+    # Tick the snake last ate on.
+    ate_ticks = 0
+    while not (game_engine.dead or game_engine.won):
+        if game_engine.step(choose()) == states.STEP_OUTCOMES['ate']:
+            ate_ticks = game_engine.ticks
+        elif game_engine.ticks - ate_ticks > game_engine.board.size:
+            break
+        if max_ticks is not None and game_engine.ticks >= max_ticks:
+            break
+    if game_engine.won:
+        death_cause = 'won'
+    elif game_engine.dead:
+        death_cause = game_engine.death_cause
+    else:
+        death_cause = 'timeout'
+    return {
+        'policy': policy,
+        'mode': mode,
+        'seed': seed,
+        'score': game_engine.score.score,
+        'length': len(game_engine.body),
+        'ticks': game_engine.ticks,
+        'death_cause': death_cause
+    }
+
+
+class Results():
+    """
+    Aggregate game results as they stream in.
+
+    Results are grouped by policy & game mode. Only the values needed
+    for the distributions are kept, not whole games.
+    """
+
+    def __init__(self):
+        """Initialize empty results."""
+        self.values = collections.defaultdict(
+            lambda: {metric: [] for metric in METRICS})
+        self.death_causes = collections.defaultdict(collections.Counter)
+
+    def add(self, result):
+        """Add the result of one game."""
+        group = (result['policy'], result['mode'])
+        for metric in METRICS:
+            self.values[group][metric].append(result[metric])
+        self.death_causes[group][result['death_cause']] += 1
+
+    def report(self):
+        """Get a report of the distributions for each group, as lines."""
+        lines = []
+        for group in sorted(self.values):
+            values = self.values[group]
+            lines.append('{} / {}: {} games'.format(
+                group[0], group[1], len(values[METRICS[0]])))
+            lines.append('  {:8} {:>10} {:>10} {:>8} {}'.format(
+                'metric', 'mean', 'stdev', 'min',
+                ' '.join('{:>8}'.format('p{}'.format(percent))
+                         for percent in PERCENTILES + (100,))))
+            for metric in METRICS:
+                ordered = sorted(values[metric])
+                stdev = statistics.pstdev(ordered)
+                lines.append('  {:8} {:10.1f} {:10.1f} {:8} {}'.format(
+                    metric, statistics.mean(ordered), stdev, ordered[0],
+                    ' '.join('{:8}'.format(
+                        perf.get_percentile(ordered, percent))
+                        for percent in PERCENTILES + (100,))))
+            lines.append('  deaths   {}'.format(', '.join(
+                '{} {:.1%}'.format(cause, count / len(values[METRICS[0]]))
+                for cause, count in self.death_causes[group].most_common())))
+        return lines
+
+
+def get_games(policies, modes, games, seed, board_size, max_ticks):
+    """
+    Get every game to play, for each policy & mode.
+
+    Games are seeded from a starting seed, so each policy & mode meets
+    the same food placements & a tournament can be repeated exactly.
+    """
+    for i in range(games):
+        for policy in policies:
+            for mode in modes:
+                yield policy, mode, seed + i, board_size, max_ticks
+
+
+def main():
+    """Run a tournament & report the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=1000,
+                        help='games per policy & mode (default: %(default)s)')
+    parser.add_argument('--policy', action='append', choices=POLICIES,
+                        help='bot policy, may be repeated (default: all)')
+    parser.add_argument('--mode', action='append',
+                        choices=states.GAME_MODES,
+                        help='game mode, may be repeated (default: all)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first game (default: %(default)s)')
+    parser.add_argument('--board', type=board.parse_size,
+                        help='board size in cells, e.g. 100x100')
+    parser.add_argument('--max-ticks', type=int,
+                        help='end games after this many steps '
+                             '(default: no limit)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--output',
+                        help='save each game result to a JSON lines file')
+    parser.add_argument('--leaderboard', metavar='FILE',
+                        help='add each game score to a leaderboard file')
+    args = parser.parse_args()
+    policies = args.policy or list(POLICIES)
+    modes = [states.GAME_MODES[mode]
+             for mode in args.mode or states.GAME_MODES]
+    games = get_games(policies, modes, args.games, args.seed,
+                      args.board or (None, None), args.max_ticks)
+    total = args.games * len(policies) * len(modes)
+    results = Results()
+    output_file = open(args.output, 'w') if args.output else None
+    scores = None
+    # Scores left off the leaderboard as they do not fit its records.
+    skipped = 0
+    if args.leaderboard:
+        scores = leaderboard.Leaderboard(args.leaderboard)
+    try:
+        with multiprocessing.Pool(args.jobs) as pool:
+            # Stream results back in small chunks, in any order.
+            for played, result in enumerate(pool.imap_unordered(
+                    play_game, games, chunksize=16), 1):
+                results.add(result)
+                if output_file:
+                    output_file.write(json.dumps(result) + '\n')
+                if scores is not None:
+                    # Seeds outside 0 to 2 ** 64 - 1 do not fit a record.
+                    try:
+                        scores.add(result['mode'], result['policy'],
+                                   result['score'], result['ticks'],
+                                   result['seed'])
+                    except ValueError:
+                        skipped += 1
+                if played % 100 == 0 or played == total:
+                    print('\r{}/{} games'.format(played, total), end='',
+                          file=sys.stderr, flush=True)
+    finally:
+        if output_file:
+            output_file.close()
+        if scores is not None:
+            scores.save()
+    print(file=sys.stderr)
+    if skipped:
+        print('{} scores left off the leaderboard, their seeds do not fit '
+              'its records'.format(skipped), file=sys.stderr)
+    print('\n'.join(results.report()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Snake Arcade tracks for computer steered snakes."""
+
+import states
+
+
+class Track():
+    """
+    A closed path of game grid "cells", for snakes to follow.
+
+    Compiled once from the corners of a polyline into a list of cells,
+    each with the direction to the next. Snakes keep their place on the
+    track as a cell number, so turning & finding the cell any number of
+    cells ahead are list lookups, whatever the shape of the track. Tracks
+    may cross themselves.
+    """
+
+    def __init__(self, corners):
+        """
+        Compile a track from its corners, in the order they are visited.
+
+        Each corner must be in line with the next, along the x or y axis.
+        The track returns from the last corner to the first.
+        """
+        self.cells = []
+        self.directions = []
+        vectors = {vector: name for name, vector in states.DIRECTIONS.items()}
+        for i, start in enumerate(corners):
+            end = corners[(i + 1) % len(corners)]
+            dx, dy = end[0] - start[0], end[1] - start[1]
+            if (dx and dy) or not (dx or dy):
+                raise ValueError('Track corners {} & {} are not in line'
+                                 .format(start, end))
+            length = abs(dx + dy)
+            vector = (dx // length, dy // length)
+            for step in range(length):
+                self.cells.append((start[0] + vector[0] * step,
+                                   start[1] + vector[1] * step))
+                self.directions.append(vectors[vector])
+        # Number of the first visit to each cell.
+        self.places = {}
+        for place, cell in enumerate(self.cells):
+            self.places.setdefault(cell, place)
+
+    def __len__(self):
+        """Get the number of cells around the track."""
+        return len(self.cells)
+
+    def find(self, position):
+        """Get the number of a cell on the track, or None if it is off it."""
+        return self.places.get(tuple(position))
+
+    def get_cell(self, place):
+        """Get a cell by number, counting on round the track."""
+        return self.cells[place % len(self.cells)]
+
+    def get_direction(self, place):
+        """Get the direction to travel from a cell to the next, by number."""
+        return self.directions[place % len(self.directions)]
@@ -0,0 +1,8 @@
+"""Shared test setup for Snake Arcade."""
+
+import os
+import sys
+
+# Game modules import each other by name, as when run from their folder.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'snake_arcade'))
@@ -0,0 +1,64 @@
+"""Tests for the headless many-snake arena engine."""
+
+import collections
+import itertools
+
+import pytest
+
+import arena
+import board
+import modes
+import states
+
+
+def check_occupancy(arena_engine):
+    """Check the occupancy grid & free cells match the snakes & food."""
+    bodies = collections.Counter(
+        position for snake in arena_engine.snakes for position in snake.body)
+    assert arena_engine.occupied == bodies
+    game_board = arena_engine.board
+    for position in itertools.product(
+            range(game_board.left, game_board.right + 1),
+            range(game_board.bottom, game_board.top + 1)):
+        free = position not in bodies and position not in arena_engine.food
+        assert (position in arena_engine.free_cells) == free
+
+
+@pytest.mark.parametrize('mode', list(states.GAME_MODES.values()))
+def test_speeds_come_from_the_mode_rules(mode):
+    arena_engine = arena.ArenaEngine(4, mode, seed=0)
+    rules = modes.MODE_RULES[mode]
+    assert arena_engine.speed == rules.start_speed
+    assert arena_engine.min_speed == rules.min_speed
+    arena_engine.decrease_speed(10)
+    assert arena_engine.speed == rules.min_speed
+
+
+def test_occupancy_stays_in_step_with_the_snakes():
+    arena_engine = arena.ArenaEngine(8, seed=1,
+                                     game_board=board.Board(20, 20))
+    check_occupancy(arena_engine)
+    for tick in range(300):
+        arena_engine.step(arena_engine.get_greedy_actions())
+        check_occupancy(arena_engine)
+    assert len(arena_engine.food) == arena_engine.num_food
+
+
+def test_heads_that_meet_both_die():
+    arena_engine = arena.ArenaEngine(2, seed=0,
+                                     game_board=board.Board(20, 20))
+    for snake in arena_engine.snakes:
+        for position in snake.body:
+            arena_engine.uncover(position)
+    for snake, body, direction in (
+            (arena_engine.snakes[0], [(5, 10), (4, 10), (3, 10)], 'RIGHT'),
+            (arena_engine.snakes[1], [(7, 10), (8, 10), (9, 10)], 'LEFT')):
+        snake.body = collections.deque(body)
+        snake.direction = direction
+        for position in body:
+            arena_engine.cover(position)
+    arena_engine.food.clear()
+    assert arena_engine.step() == [states.STEP_OUTCOMES['dead']] * 2
+    assert [snake.death_cause for snake in arena_engine.snakes] == \
+        ['head', 'head']
+    assert not arena_engine.occupied
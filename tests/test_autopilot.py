@@ -0,0 +1,73 @@
+"""Tests for the autopilot player."""
+
+import autopilot
+import board
+import engine
+import states
+
+
+def play(game_engine, max_ticks):
+    """Let the autopilot play a game until it ends or runs out of ticks."""
+    pilot = autopilot.Autopilot(game_engine)
+    while not (game_engine.dead or game_engine.won) and \
+            game_engine.ticks < max_ticks:
+        game_engine.step(pilot.decide(float('inf')))
+    return game_engine
+
+
+def check_cycle(game_board, cycle):
+    """Check that a cycle is made of steps to a neighbouring cell."""
+    assert len(set(cycle)) == len(cycle)
+    assert all(game_board.contains(cell) for cell in cycle)
+    for i, cell in enumerate(cycle):
+        after = cycle[(i + 1) % len(cycle)]
+        assert abs(after[0] - cell[0]) + abs(after[1] - cell[1]) == 1
+
+
+def test_board_cycle_visits_every_cell():
+    for width, height in ((10, 20), (11, 20), (10, 21)):
+        game_board = board.Board(width, height)
+        cycle = autopilot.get_board_cycle(game_board)
+        check_cycle(game_board, cycle)
+        assert len(cycle) == game_board.size
+        assert autopilot.get_cycle_gap(game_board, cycle) == {}
+
+
+def test_board_cycle_detours_through_the_cell_left_out():
+    game_board = board.Board(11, 21)
+    cycle = autopilot.get_board_cycle(game_board)
+    check_cycle(game_board, cycle)
+    assert len(cycle) == game_board.size - 1
+    gap = autopilot.get_cycle_gap(game_board, cycle)
+    before, gap_cell = sorted(gap, key=lambda cell: cell not in cycle)
+    assert gap_cell not in cycle
+    dx, dy = states.DIRECTIONS[gap[before]]
+    assert (before[0] + dx, before[1] + dy) == gap_cell
+    dx, dy = states.DIRECTIONS[gap[gap_cell]]
+    assert (gap_cell[0] + dx, gap_cell[1] + dy) == \
+        cycle[(cycle.index(before) + 2) % len(cycle)]
+
+
+def test_autopilot_wins_on_an_even_board():
+    game_engine = play(engine.GameEngine(seed=1,
+                                         game_board=board.Board(10, 20)),
+                       50000)
+    assert game_engine.won
+    assert len(game_engine.body) == game_engine.board.size
+
+
+def test_autopilot_keeps_eating_on_the_default_board():
+    # This game once stopped eating at tick 7677 & went round for good.
+    game_engine = play(engine.GameEngine(seed=2), 200000)
+    assert game_engine.dead or game_engine.won
+    assert game_engine.food_eaten >= game_engine.board.size - 5
+
+
+def test_autopilot_plays_on_after_a_reset():
+    game_engine = engine.GameEngine(seed=3, game_board=board.Board(10, 20))
+    pilot = autopilot.Autopilot(game_engine)
+    for game in range(2):
+        while not (game_engine.dead or game_engine.won):
+            game_engine.step(pilot.decide(float('inf')))
+        assert game_engine.won
+        game_engine.reset()
@@ -0,0 +1,92 @@
+"""Tests for the vectorized batch game engine."""
+
+import numpy as np
+import pytest
+
+import batch_engine
+import board
+import modes
+import states
+
+
+def get_body(batch, game):
+    """Get the body of a game in a batch, head first."""
+    return [tuple(batch.body[game, (batch.head_index[game] + segment) %
+                             batch.capacity])
+            for segment in range(batch.length[game])]
+
+
+def check_game(batch, game):
+    """Check the occupancy grid & food of a game match its body."""
+    grid = np.zeros_like(batch.grid[game])
+    for x, y in get_body(batch, game):
+        grid[x - batch.board.left, y - batch.board.bottom] += 1
+    assert (batch.grid[game] == grid).all()
+    food_x, food_y = batch.food[game]
+    assert grid[food_x - batch.board.left, food_y - batch.board.bottom] == 0
+
+
+def place(batch, game, body, direction, food):
+    """Put the snake of a game in a batch in a known position."""
+    batch.grid[game] = 0
+    batch.head_index[game] = 0
+    batch.length[game] = len(body)
+    for segment, (x, y) in enumerate(body):
+        batch.body[game, segment] = (x, y)
+        batch.grid[game, x - batch.board.left, y - batch.board.bottom] += 1
+    batch.direction[game] = batch_engine.ACTIONS.index(direction)
+    batch.food[game] = food
+
+
+def test_games_stay_consistent_as_they_play():
+    batch = batch_engine.BatchEngine(16, seed=0,
+                                     game_board=board.Board(12, 24))
+    rng = np.random.default_rng(1)
+    for tick in range(500):
+        batch.step(rng.integers(-1, 4, batch.num_games))
+        for game in range(batch.num_games):
+            check_game(batch, game)
+    # Random play dies often, & every finished game is started again.
+    assert batch.games_finished > 0
+    assert (batch.length >= 3).all()
+
+
+def test_eating_grows_and_scores_by_the_mode_rules():
+    mode = states.GAME_MODES['hard']
+    batch = batch_engine.BatchEngine(2, mode, seed=0)
+    place(batch, 0, [(10, 10), (10, 9), (10, 8)], 'UP', (10, 11))
+    place(batch, 1, [(20, 10), (20, 9), (20, 8)], 'UP', (25, 25))
+    outcomes = batch.step()
+    assert list(outcomes) == [batch_engine.ATE, batch_engine.MOVED]
+    assert batch.score[0] == modes.MODE_RULES[mode].food_points
+    assert batch.score[1] == 0
+    batch.step()
+    assert list(batch.length) == [4, 3]
+    check_game(batch, 0)
+
+
+def test_opposing_turns_are_ignored():
+    batch = batch_engine.BatchEngine(1, seed=0)
+    place(batch, 0, [(10, 10), (10, 9), (10, 8)], 'UP', (25, 25))
+    batch.step([batch_engine.ACTIONS.index('DOWN')])
+    assert get_body(batch, 0)[0] == (10, 11)
+
+
+@pytest.mark.parametrize('body, direction, cause', [
+    ([(board.Board().left, 10), (board.Board().left + 1, 10),
+      (board.Board().left + 2, 10)], 'LEFT', 'wall'),
+    ([(10, 10), (11, 10), (11, 11), (10, 11), (9, 11), (8, 11)], 'UP',
+     'body')])
+def test_finished_games_are_recorded_and_reset(body, direction, cause):
+    batch = batch_engine.BatchEngine(1, seed=0)
+    place(batch, 0, body, direction, (25, 25))
+    batch.score[0] = 300
+    assert list(batch.step()) == [batch_engine.DEAD]
+    assert batch_engine.DEATH_CAUSES[batch.death_cause[0]] == cause
+    assert batch.games_finished == 1
+    assert batch.final_score[0] == 300
+    assert batch.final_length[0] == len(body)
+    # The slot holds a new game.
+    assert batch.length[0] == 3
+    assert batch.score[0] == 0
+    check_game(batch, 0)
@@ -0,0 +1,107 @@
+"""Tests for the headless game engine."""
+
+import pytest
+
+import board
+import engine
+import states
+
+
+def play(game_engine, steps):
+    """Step a game engine round a square, so the snake stays alive."""
+    for i in range(steps):
+        game_engine.step(('UP', 'RIGHT', 'DOWN', 'LEFT')[i // 3 % 4])
+
+
+def test_snake_moves_one_cell_per_step():
+    game_engine = engine.GameEngine(seed=0)
+    game_engine.reset(head_pos=(10, 10), direction='UP')
+    game_engine.food_pos = None
+    assert game_engine.step() == states.STEP_OUTCOMES['moved']
+    assert list(game_engine.body) == [(10, 11), (10, 10), (10, 9)]
+    # Opposing turns are ignored.
+    game_engine.step('DOWN')
+    assert game_engine.head_pos == (10, 12)
+
+
+def test_snake_eats_grows_and_scores():
+    game_engine = engine.GameEngine(seed=0)
+    game_engine.reset(head_pos=(10, 10), direction='UP')
+    game_engine.food_pos = (10, 11)
+    assert game_engine.step() == states.STEP_OUTCOMES['ate']
+    assert game_engine.score.score == 100
+    assert game_engine.food_pos not in game_engine.body
+    game_engine.step()
+    assert len(game_engine.body) == 4
+
+
+def test_snake_dies_on_walls_and_its_body():
+    game_engine = engine.GameEngine(seed=0)
+    game_engine.reset(head_pos=(game_engine.board.left, 10),
+                      direction='LEFT')
+    assert game_engine.step() == states.STEP_OUTCOMES['dead']
+    assert game_engine.death_cause == 'wall'
+    game_engine.reset(head_pos=(10, 10), direction='UP')
+    game_engine.growing = 3
+    game_engine.food_pos = None
+    for action in ('UP', 'RIGHT', 'DOWN', 'LEFT'):
+        outcome = game_engine.step(action)
+    assert outcome == states.STEP_OUTCOMES['dead']
+    assert game_engine.death_cause == 'body'
+
+
+def test_same_seed_spawns_the_same_food():
+    first = engine.GameEngine(seed=7)
+    second = engine.GameEngine(seed=7)
+    assert first.head_pos == second.head_pos
+    assert first.food_pos == second.food_pos
+
+
+@pytest.mark.parametrize('seed', [0, 2 ** 64 + 3, -5])
+def test_snapshot_round_trip(seed):
+    game_engine = engine.GameEngine(seed=seed,
+                                    game_board=board.Board(30, 40, 8))
+    play(game_engine, 50)
+    data = game_engine.snapshot()
+    restored = engine.GameEngine(seed=1)
+    restored.restore(data)
+    assert restored.snapshot() == data
+    assert restored.seed == seed
+    assert (restored.board.width, restored.board.height,
+            restored.board.cell) == (30, 40, 8)
+    assert list(restored.body) == list(game_engine.body)
+    assert restored.score.score == game_engine.score.score
+    # The restored game plays on exactly as the original.
+    play(game_engine, 100)
+    play(restored, 100)
+    assert restored.snapshot() == game_engine.snapshot()
+
+
+def test_snapshot_round_trip_on_a_sampled_board():
+    game_engine = engine.GameEngine(seed=3, game_board=board.Board(300, 300))
+    play(game_engine, 50)
+    restored = engine.GameEngine(seed=1)
+    restored.restore(game_engine.snapshot())
+    assert [restored.spawn_food() for _ in range(5)] == \
+        [game_engine.spawn_food() for _ in range(5)]
+
+
+def test_clone_is_independent():
+    game_engine = engine.GameEngine(seed=4)
+    play(game_engine, 20)
+    game_clone = game_engine.clone()
+    data = game_engine.snapshot()
+    play(game_clone, 30)
+    assert game_engine.snapshot() == data
+    play(game_engine, 30)
+    assert game_clone.snapshot() == game_engine.snapshot()
+
+
+def test_parse_size_limits():
+    assert board.parse_size('100X200') == (100, 200)
+    with pytest.raises(ValueError):
+        board.parse_size('4x20')
+    with pytest.raises(ValueError):
+        board.parse_size('{}x20'.format(board.MAX_SIDE + 1))
+    with pytest.raises(ValueError):
+        board.parse_size('big')
@@ -0,0 +1,91 @@
+"""Tests for the gameplay event stream."""
+
+import engine
+import events
+
+
+class Sink():
+    """Subscriber keeping every batch of events it is given."""
+
+    def __init__(self):
+        """Initialize an empty sink."""
+        self.batches = []
+        self.closed = False
+
+    def write(self, batch):
+        """Keep a batch of events."""
+        self.batches.append(batch)
+
+    def close(self):
+        """Note the sink was closed."""
+        self.closed = True
+
+    def get_events(self):
+        """Get every event written, decoded, without the times."""
+        return [{key: value for key, value in event.items()
+                 if key != 'time'}
+                for event in events.decode(b''.join(self.batches))]
+
+
+def attach(stream):
+    """Attach a sink without the writer thread, flushed by the test."""
+    sink = Sink()
+    stream.subscribers.append(sink)
+    return sink
+
+
+def test_nothing_is_recorded_without_subscribers():
+    stream = events.EventStream(capacity=4)
+    stream.emit('pause', 1)
+    assert stream.head == 0
+
+
+def test_events_wrap_around_the_buffer():
+    stream = events.EventStream(capacity=4)
+    sink = attach(stream)
+    for x in range(3):
+        stream.emit('spawn', x, 0)
+    stream.flush()
+    # The next events run past the end of the buffer, back to the start.
+    for x in range(3, 6):
+        stream.emit('spawn', x, 0)
+    stream.flush()
+    assert [event['x'] for event in sink.get_events()] == list(range(6))
+    assert stream.dropped == 0
+
+
+def test_events_are_dropped_when_the_buffer_is_full():
+    stream = events.EventStream(capacity=4)
+    sink = attach(stream)
+    for x in range(6):
+        stream.emit('spawn', x, 0)
+    assert stream.dropped == 2
+    stream.flush()
+    assert [event['x'] for event in sink.get_events()] == list(range(4))
+
+
+def test_close_flushes_the_writer_thread():
+    stream = events.EventStream()
+    sink = Sink()
+    stream.subscribe(sink)
+    stream.emit('eat', 300, 4, 5)
+    stream.emit('won', 300, 99)
+    stream.close()
+    assert sink.closed
+    assert sink.get_events() == [
+        {'event': 'eat', 'score': 300, 'x': 4, 'y': 5},
+        {'event': 'won', 'score': 300, 'ticks': 99}]
+
+
+def test_engines_do_not_emit_events():
+    stream = events.stream
+    sink = attach(stream)
+    try:
+        game_engine = engine.GameEngine(seed=0)
+        game_engine.increase_speed(1)
+        for i in range(20):
+            game_engine.step(('UP', 'RIGHT', 'DOWN', 'LEFT')[i // 3 % 4])
+        stream.flush()
+    finally:
+        stream.subscribers.remove(sink)
+    assert sink.batches == []
@@ -0,0 +1,108 @@
+"""Tests for the free game board cell indexes."""
+
+import random
+
+import board
+import free_cells
+
+
+def get_cells(left, bottom, right, top):
+    """Get every cell of a board, by its edges."""
+    return [(x, y) for x in range(left, right + 1)
+            for y in range(bottom, top + 1)]
+
+
+def test_index_starts_with_every_cell_free():
+    index = free_cells.FreeCellIndex(2, 2, 5, 4)
+    assert len(index) == 12
+    assert all(cell in index for cell in get_cells(2, 2, 5, 4))
+    assert (1, 2) not in index
+
+
+def test_index_add_and_remove():
+    index = free_cells.FreeCellIndex(2, 2, 5, 4)
+    index.remove((3, 3))
+    index.remove((3, 3))
+    index.remove((0, 0))
+    assert len(index) == 11
+    assert (3, 3) not in index
+    index.add((3, 3))
+    index.add((3, 3))
+    assert len(index) == 12
+    assert (3, 3) in index
+
+
+def test_index_choice_is_a_free_cell():
+    index = free_cells.FreeCellIndex(2, 2, 5, 4)
+    rng = random.Random(0)
+    covered = get_cells(2, 2, 5, 4)[:-1]
+    for cell in covered:
+        index.remove(cell)
+    assert index.choice(rng) == (5, 4)
+    index.remove((5, 4))
+    assert index.choice(rng) is None
+
+
+def test_index_copy_is_independent():
+    index = free_cells.FreeCellIndex(2, 2, 5, 4)
+    index_copy = index.copy()
+    index_copy.remove((2, 2))
+    assert (2, 2) in index
+    assert len(index) == 12
+
+
+def test_create_index_suits_the_board_size():
+    assert isinstance(free_cells.create_index(board.Board()),
+                      free_cells.FreeCellIndex)
+    assert isinstance(free_cells.create_index(board.Board(300, 300)),
+                      free_cells.SampledFreeCells)
+
+
+def test_sampled_lists_free_cells_once_mostly_covered():
+    index = free_cells.SampledFreeCells(0, 0, 99, 99)
+    cells = get_cells(0, 0, 99, 99)
+    random.Random(0).shuffle(cells)
+    for cell in cells[:index.dense_cells - 1]:
+        index.remove(cell)
+    assert index.free is None
+    index.remove(cells[index.dense_cells - 1])
+    assert len(index.free) == len(index) == 1000
+    # Choices come from the list, never from a search of the board.
+    rng = random.Random(0)
+    free = set(cells[index.dense_cells:])
+    assert all(index.choice(rng) in free for _ in range(100))
+
+
+def test_sampled_drops_the_list_once_mostly_free():
+    index = free_cells.SampledFreeCells(0, 0, 99, 99)
+    cells = get_cells(0, 0, 99, 99)
+    for cell in cells[:index.dense_cells]:
+        index.remove(cell)
+    for cell in cells[index.sparse_cells:index.dense_cells]:
+        index.add(cell)
+    assert index.free is not None
+    index.add(cells[index.sparse_cells - 1])
+    assert index.free is None
+    assert len(index) == 10000 - index.sparse_cells + 1
+
+
+def test_sampled_choice_when_full():
+    index = free_cells.SampledFreeCells(0, 0, 9, 9)
+    for cell in get_cells(0, 0, 9, 9):
+        index.remove(cell)
+    assert index.choice(random.Random(0)) is None
+
+
+def test_sampled_state_round_trip_keeps_choices():
+    index = free_cells.SampledFreeCells(0, 0, 99, 99)
+    cells = get_cells(0, 0, 99, 99)
+    random.Random(1).shuffle(cells)
+    for cell in cells[:9500]:
+        index.remove(cell)
+    restored = free_cells.SampledFreeCells(0, 0, 99, 99)
+    restored.set_state(*index.get_state())
+    assert restored.covered == index.covered
+    rng = random.Random(2)
+    restored_rng = random.Random(2)
+    assert [index.choice(rng) for _ in range(20)] == \
+        [restored.choice(restored_rng) for _ in range(20)]
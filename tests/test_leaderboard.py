@@ -0,0 +1,92 @@
+"""Tests for the high score leaderboards."""
+
+import concurrent.futures
+
+import pytest
+
+import leaderboard
+import states
+
+NORMAL = states.GAME_MODES['normal']
+
+
+def test_keeps_the_best_scores_in_order():
+    scores = leaderboard.Leaderboard(size=3)
+    for score in (10, 50, 30, 20, 40):
+        scores.add(NORMAL, 'p{}'.format(score), score)
+    assert [top[1] for top in scores.get_top(NORMAL)] == [50, 40, 30]
+    assert not scores.add(NORMAL, 'late', 30)
+    assert scores.get_best(NORMAL) == 50
+    assert scores.get_best(states.GAME_MODES['easy']) == 0
+
+
+def test_scores_are_saved_and_loaded(tmp_path):
+    path = str(tmp_path / 'leaderboard.dat')
+    scores = leaderboard.Leaderboard(path)
+    scores.add(NORMAL, 'ann', 300, 40, 2 ** 64 - 1, played=1.5)
+    assert not (tmp_path / 'leaderboard.dat').exists()
+    scores.save()
+    loaded = leaderboard.Leaderboard(path)
+    assert loaded.get_top(NORMAL) == [('ann', 300, 40, 2 ** 64 - 1, 1.5)]
+
+
+def test_ties_keep_their_order_once_compacted(tmp_path):
+    path = str(tmp_path / 'leaderboard.dat')
+    scores = leaderboard.Leaderboard(path, size=5)
+    for i in range(40):
+        scores.add(NORMAL, 'p{}'.format(i), 100 + i % 2)
+        scores.save()
+    scores.compact()
+    loaded = leaderboard.Leaderboard(path, size=5)
+    assert loaded.get_top(NORMAL) == scores.get_top(NORMAL)
+    assert [top[0] for top in loaded.get_top(NORMAL)] == \
+        ['p1', 'p3', 'p5', 'p7', 'p9']
+
+
+def test_an_executor_writes_the_file(tmp_path):
+    path = str(tmp_path / 'leaderboard.dat')
+    scores = leaderboard.Leaderboard(
+        path, size=2, executor=concurrent.futures.ThreadPoolExecutor(1))
+    # Enough scores to compact the file as well as append to it.
+    for i in range(30):
+        scores.add(NORMAL, 'p{}'.format(i), i)
+        scores.save()
+    scores.close()
+    loaded = leaderboard.Leaderboard(path, size=2)
+    assert loaded.get_top(NORMAL) == scores.get_top(NORMAL)
+    assert loaded.records == scores.records < 30
+
+
+def test_a_record_cut_short_is_ignored(tmp_path):
+    path = str(tmp_path / 'leaderboard.dat')
+    scores = leaderboard.Leaderboard(path)
+    scores.add(NORMAL, 'ann', 300)
+    scores.save()
+    with open(path, 'ab') as leaderboard_file:
+        leaderboard_file.write(b'\1\2\3')
+    loaded = leaderboard.Leaderboard(path)
+    assert loaded.get_best(NORMAL) == 300
+    assert (tmp_path / 'leaderboard.dat').stat().st_size == \
+        leaderboard.HEADER.size + leaderboard.RECORD.size
+
+
+@pytest.mark.parametrize('data', [b'', b'SNL', b'JUNK\1' + b'\0' * 60,
+                                  leaderboard.HEADER.pack(b'SNLB', 1) +
+                                  b'\xff' * leaderboard.RECORD.size])
+def test_a_damaged_file_is_moved_aside(tmp_path, data, capsys):
+    path = tmp_path / 'leaderboard.dat'
+    path.write_bytes(data)
+    scores = leaderboard.Leaderboard(str(path))
+    assert scores.get_top(NORMAL) == []
+    assert (tmp_path / 'leaderboard.dat.bad').read_bytes() == data
+    assert not path.exists()
+    assert 'not a leaderboard file' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('seed', [-1, 2 ** 64])
+def test_scores_that_do_not_fit_change_nothing(tmp_path, seed):
+    scores = leaderboard.Leaderboard(str(tmp_path / 'leaderboard.dat'))
+    with pytest.raises(ValueError):
+        scores.add(NORMAL, 'ann', 300, seed=seed)
+    assert scores.get_top(NORMAL) == []
+    assert scores.pending == []
@@ -0,0 +1,43 @@
+"""Tests for the game mode rules."""
+
+import pytest
+
+import engine
+import modes
+import states
+
+
+def eat(game_engine, times):
+    """Make a game engine eat food, as if the snake had reached it."""
+    for i in range(times):
+        game_engine.eat_food(game_engine)
+
+
+@pytest.mark.parametrize('mode', list(states.GAME_MODES.values()))
+def test_every_mode_starts_at_the_same_speed(mode):
+    game_engine = engine.GameEngine(mode, seed=0)
+    assert (game_engine.speed, game_engine.min_speed) == (6, 6)
+
+
+@pytest.mark.parametrize('mode', list(states.GAME_MODES.values()))
+def test_score_comes_from_the_mode_rules(mode):
+    rules = modes.MODE_RULES[mode]
+    game_engine = engine.GameEngine(mode, seed=0)
+    eat(game_engine, 3)
+    assert game_engine.score.score == 3 * rules.food_points
+    assert game_engine.food_eaten == 3
+    assert game_engine.growing == 3
+
+
+def test_normal_mode_speeds_up_at_milestones():
+    game_engine = engine.GameEngine(states.GAME_MODES['normal'], seed=0)
+    eat(game_engine, 4)
+    assert game_engine.speed == 6
+    eat(game_engine, 1)
+    assert (game_engine.speed, game_engine.min_speed) == (7, 7)
+
+
+def test_easy_mode_never_speeds_up():
+    game_engine = engine.GameEngine(states.GAME_MODES['easy'], seed=0)
+    eat(game_engine, 50)
+    assert (game_engine.speed, game_engine.min_speed) == (6, 6)
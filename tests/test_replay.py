@@ -0,0 +1,82 @@
+"""Tests for recording & playing back replays."""
+
+import random
+
+import pytest
+
+import board
+import engine
+import replay
+import states
+
+
+def get_inputs(game_engine, rng):
+    """
+    Choose random inputs for the next step.
+
+    Sometimes change speed, & turn at random where the snake survives,
+    always when it would die going straight on.
+    """
+    inputs = []
+    if rng.random() < 0.1:
+        inputs.append(rng.choice(('FASTER', 'SLOWER')))
+    body = set(game_engine.body)
+    head_x, head_y = game_engine.head_pos
+    safe = [direction for direction, (dx, dy) in states.DIRECTIONS.items()
+            if game_engine.board.contains((head_x + dx, head_y + dy)) and
+            (head_x + dx, head_y + dy) not in body]
+    if safe and (game_engine.direction not in safe or rng.random() < 0.2):
+        inputs.append(rng.choice(safe))
+    return inputs
+
+
+def record_game(mode, seed, game_board):
+    """
+    Play a game with random inputs, recording it as the game does.
+
+    Return the replay & the engine, in its final state.
+    """
+    game_engine = engine.GameEngine(mode, seed, game_board)
+    recording = replay.Replay(mode, seed, board_size=(game_board.width,
+                                                      game_board.height))
+    rng = random.Random(seed)
+    while not (game_engine.dead or game_engine.won) and \
+            game_engine.ticks < 2000:
+        for action in get_inputs(game_engine, rng):
+            replay.apply_input(game_engine, action)
+            recording.record(game_engine.ticks, action)
+        game_engine.step()
+    recording.finish(game_engine)
+    return recording, game_engine
+
+
+@pytest.mark.parametrize('mode', list(states.GAME_MODES.values()))
+@pytest.mark.parametrize('seed', [1, 2 ** 64 - 1])
+def test_replays_reproduce_their_game(mode, seed):
+    game_board = board.Board(16, 20)
+    recording, game_engine = record_game(mode, seed, game_board)
+    loaded = replay.Replay.from_bytes(recording.to_bytes())
+    assert loaded.board_size == (16, 20)
+    player = replay.ReplayPlayer(loaded)
+    played = player.run()
+    assert player.check()
+    assert played.snapshot() == game_engine.snapshot()
+
+
+def test_replays_are_saved_and_loaded(tmp_path):
+    recording, game_engine = record_game(states.GAME_MODES['normal'], 5,
+                                         board.Board())
+    path = str(tmp_path / 'game.replay')
+    recording.save(path)
+    loaded = replay.Replay.load(path)
+    assert (loaded.mode, loaded.seed, loaded.inputs, loaded.ticks,
+            loaded.score) == (recording.mode, recording.seed,
+                              recording.inputs, recording.ticks,
+                              recording.score)
+
+
+def test_other_files_are_not_replays():
+    data = bytearray(replay.Replay(states.GAME_MODES['easy'], 0).to_bytes())
+    data[:4] = b'JUNK'
+    with pytest.raises(ValueError):
+        replay.Replay.from_bytes(bytes(data))
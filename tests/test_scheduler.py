@@ -0,0 +1,24 @@
+"""Tests for the fixed timestep scheduler."""
+
+import scheduler
+
+
+def test_frames_follow_real_time():
+    clock = scheduler.TickScheduler(60)
+    assert clock.advance(0.75 / 60) == 0
+    assert clock.advance(0.75 / 60) == 1
+    # Time beyond the most frames simulated in one update is dropped.
+    assert clock.advance(1) == clock.max_frames
+    assert clock.advance(0) == 0
+
+
+def test_speeds_above_the_frame_rate_step_several_cells():
+    clock = scheduler.TickScheduler(60)
+    assert [clock.tick(150) for frame in range(4)] == [2, 3, 2, 3]
+
+
+def test_fractional_speeds_spread_steps_evenly():
+    clock = scheduler.TickScheduler(60)
+    steps = [clock.tick(3, 2) for frame in range(80)]
+    assert sum(steps) == 2
+    assert steps.index(1) == 39
@@ -0,0 +1,78 @@
+"""Tests for the network game server & client, over localhost."""
+
+import asyncio
+
+import pytest
+
+import server
+import states
+
+
+def run_server(coroutine_function, monkeypatch):
+    """
+    Run a coroutine function against a fast server on any free port.
+
+    It is called with the server's port & a list of the sessions
+    started. Return its result.
+    """
+    sessions = []
+
+    class RecordedSession(server.Session):
+        """Session kept for checking once its game is over."""
+
+        def __init__(self, *args):
+            """Start a new game & keep the session."""
+            super().__init__(*args)
+            sessions.append(self)
+
+    monkeypatch.setattr(server, 'Session', RecordedSession)
+
+    async def run():
+        game_server = server.GameServer(time_scale=20)
+        port = await game_server.start(server.HOST, 0)
+        try:
+            return await asyncio.wait_for(
+                coroutine_function(port, sessions), 30)
+        finally:
+            await game_server.stop()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('mode', list(states.GAME_MODES.values()))
+def test_clients_mirror_the_server_games(mode, monkeypatch):
+    async def play(port, sessions):
+        clients = await server.play_bots(3, server.HOST, port, mode,
+                                         (10, 20))
+        return clients, sessions
+    clients, sessions = run_server(play, monkeypatch)
+    assert len(sessions) == len(clients)
+    # Match each client to its session by the client's address.
+    games = {session.writer.get_extra_info('peername'): session.engine
+             for session in sessions}
+    for client in clients:
+        game_engine = games[client.writer.get_extra_info('sockname')]
+        assert client.ticks == game_engine.ticks
+        assert list(client.body) == list(game_engine.body)
+        assert client.score == game_engine.score.score
+        if game_engine.won:
+            assert client.death_cause == 'won'
+        else:
+            assert client.death_cause == game_engine.death_cause
+            assert tuple(client.food_pos) == game_engine.food_pos
+
+
+@pytest.mark.parametrize('hello', [
+    server.HELLO.pack(len(server.MODES), 0, 0),
+    server.HELLO.pack(0, 0xFFFF, 0xFFFF),
+    server.HELLO.pack(0, 4, 20),
+    server.HELLO.pack(0, 0, 40)])
+def test_bad_hellos_are_rejected(hello, monkeypatch):
+    async def connect(port, sessions):
+        reader, writer = await asyncio.open_connection(server.HOST, port)
+        writer.write(hello)
+        data = await reader.read()
+        writer.close()
+        return data, sessions
+    data, sessions = run_server(connect, monkeypatch)
+    assert data == b''
+    assert sessions == []
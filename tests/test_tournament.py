@@ -0,0 +1,54 @@
+"""Tests for self-play tournaments."""
+
+import itertools
+
+import leaderboard
+import tournament
+
+
+def create_circler(game_engine):
+    """Create a policy going round a square of four cells for good."""
+    turns = itertools.cycle(('RIGHT', 'DOWN', 'LEFT', 'UP'))
+    return lambda: next(turns)
+
+
+def test_play_game_reports_a_win():
+    result = tournament.play_game(('autopilot', 'normal', 1, (10, 20), None))
+    assert result['death_cause'] == 'won'
+    assert result['length'] == 200
+
+
+def test_play_game_ends_a_stalled_game(monkeypatch):
+    monkeypatch.setitem(tournament.POLICIES, 'circler', create_circler)
+    result = tournament.play_game(('circler', 'normal', 0, (10, 20), None))
+    assert result['death_cause'] == 'timeout'
+    assert result['ticks'] == 201
+
+
+def test_play_game_stops_at_the_maximum_ticks():
+    result = tournament.play_game(('autopilot', 'normal', 1, (10, 20), 50))
+    assert result['death_cause'] == 'timeout'
+    assert result['ticks'] == 50
+
+
+def test_results_report_each_group():
+    results = tournament.Results()
+    for seed in range(3):
+        results.add(tournament.play_game(('greedy', 'easy', seed,
+                                          (10, 20), None)))
+    lines = results.report()
+    assert lines[0] == 'greedy / easy: 3 games'
+    assert any(line.startswith('  deaths') for line in lines)
+
+
+def test_scores_that_do_not_fit_the_leaderboard_are_skipped(
+        tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / 'leaderboard.dat')
+    monkeypatch.setattr('sys.argv', [
+        'tournament.py', '--games', '2', '--seed', '-1', '--policy',
+        'greedy', '--mode', 'easy', '--board', '10x20', '--jobs', '1',
+        '--leaderboard', path])
+    assert tournament.main() == 0
+    assert '1 scores left off the leaderboard' in capsys.readouterr().err
+    scores = leaderboard.Leaderboard(path)
+    assert [top[3] for top in scores.get_top('easy')] == [0]